@@ -0,0 +1,27 @@
+"""Batched NumPy engine games per second at B = 1, 64 and 1024
+
+The object Simulator playing the same random agents one game at a time
+is timed alongside for reference.
+
+Run with: python -m benchmarks.bench_batch
+"""
+import random
+
+from ttr_ga.agents.agent import RandomAgent
+from ttr_ga.batch import play_batch, random_policy
+from ttr_ga.simulator import Simulator
+
+
+def main(sizes=(1, 64, 1024), players=2, sequential_games=20):
+    agents = [RandomAgent(i, f"Random {i + 1}", rng=random.Random(i)) for i in range(players)]
+    report = Simulator(agents, seed=0).run(sequential_games)
+    print(f"{'Simulator':>10}: {report['games_per_second']:8.1f} games/s")
+
+    for size in sizes:
+        result = play_batch(size, random_policy(0), players=players, seed=0)
+        print(f"{f'B={size}':>10}: {result['games_per_second']:8.1f} games/s, "
+              f"{result['turns'].mean():.0f} turns/game, {result['finished'].mean():.0%} finished")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Throughput of the networkx Board versus CompactBoard
+
+Run with: python -m benchmarks.bench_board
+"""
+import functools
+import time
+
+from ttr_ga.board import Board, CompactBoard, RouteTable
+from ttr_ga.common import COLORS, GRAY_COLORS, ROUTES
+from ttr_ga.player import Player
+
+
+def claims_for_round():
+    """One claim per city pair, each with a fresh hand that pays for it"""
+    claims = []
+    seen = set()
+    table = RouteTable.standard()
+    for city1, city2, length, color, *_ in ROUTES:
+        if (city1, city2) not in seen:
+            seen.add((city1, city2))
+            card = 'red' if color in GRAY_COLORS else color
+            route_id = table.pair_routes[(city1, city2)][0]
+            claims.append((city1, city2, route_id, COLORS.index(card), [card] * length))
+    return claims
+
+
+def bench_claims(factory, rounds=500, by_id=False):
+    """
+    Claims per second on fresh boards; setup happens outside the timer
+    by_id claims with claim_route_id instead of claim_route, as the
+    simulator does for integer actions.
+    """
+    work = [(factory(sink=None), claims_for_round()) for _ in range(rounds)]
+    player = Player("Bench")
+    player.trains = 10 ** 9
+    claims = 0
+    start = time.perf_counter()
+    for board, round_claims in work:
+        for city1, city2, route_id, color_id, hand in round_claims:
+            player.hand = hand
+            if by_id:
+                claimed = board.claim_route_id(player, route_id, color_id, player_count=4)
+            else:
+                claimed = board.claim_route(player, city1, city2, COLORS[color_id], player_count=4)
+            if claimed:
+                claims += 1
+    elapsed = time.perf_counter() - start
+    return claims / elapsed
+
+
+def bench_double_lookups(board, rounds=200):
+    """is_double_route lookups per second over every route on the map"""
+    pairs = [(city1, city2) for city1, city2, *_ in ROUTES]
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for city1, city2 in pairs:
+            board.is_double_route(city1, city2)
+    return rounds * len(pairs) / (time.perf_counter() - start)
+
+
+def bench_new_board(factory, rounds=500):
+    """Fresh boards per second, as needed once per simulated game"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        factory()
+    return rounds / (time.perf_counter() - start)
+
+
+def main():
+    by_id = functools.partial(bench_claims, by_id=True)
+    for label, board_run, compact_run in [
+        ("claim_route", lambda: bench_claims(Board.create_standard_board), lambda: bench_claims(CompactBoard.create_standard_board)),
+        ("claim by route id", lambda: bench_claims(Board.create_standard_board), lambda: by_id(CompactBoard.create_standard_board)),
+        ("new board", lambda: bench_new_board(Board.create_standard_board),
+         lambda: bench_new_board(CompactBoard.create_standard_board)),
+        ("is_double_route", lambda: bench_double_lookups(Board.create_standard_board()),
+         lambda: bench_double_lookups(CompactBoard())),
+    ]:
+        board_rate = board_run()
+        compact_rate = compact_run()
+        print(f"{label}:")
+        print(f"  Board:        {board_rate:12,.0f} /s")
+        print(f"  CompactBoard: {compact_rate:12,.0f} /s")
+        print(f"  Speedup:      {compact_rate / board_rate:12.2f}x")
+
+
+if __name__ == "__main__":
+    main()
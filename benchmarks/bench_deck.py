@@ -0,0 +1,112 @@
+"""Deck draws, face-up refills and copies per second
+
+The list-of-strings deck the compact Deck replaced is kept here for
+comparison. Draws are timed both bare and the way search code makes
+them, on a copy of the deck taken for every turn.
+
+Run with: python -m benchmarks.bench_deck
+"""
+import random
+import time
+
+from ttr_ga.player import TRAIN_CARDS, Deck
+
+
+class ListDeck:
+    """The previous deck: a list of color names, reshuffled on 3 wilds"""
+    def __init__(self):
+        self.train_cards = list(TRAIN_CARDS)
+        random.shuffle(self.train_cards)
+        self.ticket_cards = list(range(30))
+        self.face_up_cards = [self.train_cards.pop() for _ in range(5)]
+
+    def copy(self):
+        deck = ListDeck.__new__(ListDeck)
+        deck.train_cards = list(self.train_cards)
+        deck.ticket_cards = list(self.ticket_cards)
+        deck.face_up_cards = list(self.face_up_cards)
+        return deck
+
+    def draw_train_card(self):
+        return self.train_cards.pop()
+
+    def replace_face_up_card(self, index):
+        if self.train_cards:
+            self.face_up_cards[index] = self.draw_train_card()
+            self.check_and_replace_wilds()
+        else:
+            self.face_up_cards.pop(index)
+
+    def check_and_replace_wilds(self):
+        if self.face_up_cards.count('wild') >= 3:
+            pool = self.train_cards + self.face_up_cards
+            if len(pool) - pool.count('wild') < min(5, len(pool)) - 2:
+                return
+            self.train_cards.extend(self.face_up_cards)
+            random.shuffle(self.train_cards)
+            self.face_up_cards = []
+            for _ in range(5):
+                if self.train_cards:
+                    self.face_up_cards.append(self.draw_train_card())
+            self.check_and_replace_wilds()
+
+
+def rate(fn, count, repeat=5):
+    """Best operations per second of fn(), which performs count operations"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return count / best
+
+
+def bare_draws(deck, rounds=200):
+    def run():
+        for _ in range(rounds):
+            d = deck.copy()
+            for _ in range(100):
+                d.draw_train_card()
+    return run, rounds * 100
+
+
+def face_up_refills(deck, rounds=200):
+    def run():
+        for _ in range(rounds):
+            d = deck.copy()
+            for i in range(90):
+                d.replace_face_up_card(i % 5)
+    return run, rounds * 90
+
+
+def turn_draws(deck, turns=200):
+    """A chain of cloned states, each drawing two cards, as apply_action does"""
+    def run():
+        for _ in range(turns):
+            d = deck
+            for _ in range(50):
+                d = d.copy()
+                d.draw_train_card()
+                d.draw_train_card()
+    return run, turns * 100
+
+
+def copies(deck, count=50000):
+    def run():
+        for _ in range(count):
+            deck.copy()
+    return run, count
+
+
+def main():
+    random.seed(0)
+    decks = {"list": ListDeck(), "compact": Deck(sink=None, rng=random.Random(0))}
+    for label, case in [("bare draws", bare_draws), ("face-up refills", face_up_refills),
+                        ("copy + 2 draws", turn_draws), ("copies", copies)]:
+        rates = {name: rate(*case(deck)) for name, deck in decks.items()}
+        print(f"{label:>16}: list {rates['list'] / 1e6:.2f}M/s, compact {rates['compact'] / 1e6:.2f}M/s "
+              f"({rates['compact'] / rates['list']:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""GA fitness evaluation speedup from 1 to N worker processes
+
+Run with: python -m benchmarks.bench_ga_parallel
+"""
+import os
+import time
+
+import numpy as np
+
+from ttr_ga.agents.ga import FitnessEvaluator, random_genome
+
+
+def main(population=32, games=4, max_workers=None):
+    max_workers = max_workers or os.cpu_count() or 1
+    rng = np.random.default_rng(0)
+    genomes = [random_genome(rng) for _ in range(population)]
+
+    baseline = None
+    reference = None
+    print(f"{population} genomes x {games} games, {os.cpu_count()} CPUs")
+    for workers in sorted({1, 2, max_workers} | {w for w in (4, 8, 16) if w < max_workers}):
+        with FitnessEvaluator(games=games, workers=workers) as evaluator:
+            evaluator.evaluate(genomes[:workers])  # start the pool outside the timing
+            start = time.perf_counter()
+            fitness = evaluator.evaluate(genomes)
+            elapsed = time.perf_counter() - start
+        if baseline is None:
+            baseline, reference = elapsed, fitness
+        same = "same fitness" if np.array_equal(fitness, reference) else "FITNESS DIFFERS"
+        print(f"{workers:>3} workers: {elapsed:.2f}s, {population * games / elapsed:.1f} games/s, "
+              f"speedup {baseline / elapsed:.2f}x ({same})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Longest trail solver on a worst-case 45-train network
+
+The network is grown from a hub by always adding the shortest adjacent
+route, which packs as many routes and cycles as possible into 45 trains.
+
+Run with: python -m benchmarks.bench_longest_path
+"""
+import time
+
+import networkx as nx
+
+from ttr_ga.board import CompactBoard
+from ttr_ga.common import ROUTES
+from ttr_ga.game import longest_continuous_path
+from ttr_ga.player import Player
+from ttr_ga.scoring import longest_trail, trail_cache
+
+
+def dense_network(hub="Chicago", trains=45):
+    """Route ids of a connected, short-route-heavy network around a hub"""
+    chosen = []
+    cities = {hub}
+    used = 0
+    remaining = list(range(len(ROUTES)))
+    while True:
+        candidates = [r for r in remaining
+                      if (ROUTES[r][0] in cities or ROUTES[r][1] in cities) and used + ROUTES[r][2] <= trains]
+        if not candidates:
+            return chosen
+        route_id = min(candidates, key=lambda r: (ROUTES[r][2], not (ROUTES[r][0] in cities and ROUTES[r][1] in cities)))
+        remaining.remove(route_id)
+        chosen.append(route_id)
+        used += ROUTES[route_id][2]
+        cities.update(ROUTES[route_id][:2])
+
+
+def all_simple_paths_longest(routes):
+    """The previous brute force: longest simple path in edges, parallel routes merged"""
+    graph = nx.Graph()
+    for city1, city2, _ in routes:
+        graph.add_edge(city1, city2)
+    best = 0
+    for source in graph.nodes():
+        for target in graph.nodes():
+            if source != target:
+                for path in nx.all_simple_paths(graph, source, target):
+                    best = max(best, len(path) - 1)
+    return best
+
+
+def timed(fn, *args, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(*args)
+    return result, (time.perf_counter() - start) / repeat
+
+
+def main():
+    route_ids = dense_network()
+    routes = [ROUTES[r][:3] for r in route_ids]
+    print(f"{len(routes)} routes, {sum(r[2] for r in routes)} trains")
+
+    board = CompactBoard(sink=None)
+    player = Player("P1")
+    for route_id in route_ids:
+        board.owner[route_id] = board.seat(player.name)
+
+    length, solve = timed(longest_trail, routes, repeat=20)
+    print(f"trail solver:         {solve * 1e3:10.3f} ms  (length {length})")
+
+    trail_cache(board.table).results.clear()
+    longest_continuous_path(player, board)
+    _, cached = timed(longest_continuous_path, player, board, repeat=10000)
+    print(f"cached by route mask: {cached * 1e3:10.3f} ms")
+
+    edges, brute = timed(all_simple_paths_longest, routes)
+    print(f"all_simple_paths:     {brute * 1e3:10.3f} ms  ({edges} edges)")
+
+
+if __name__ == "__main__":
+    main()
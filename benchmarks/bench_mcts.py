@@ -0,0 +1,33 @@
+"""MCTS playouts per second, in process and with root parallelization
+
+Run with: python -m benchmarks.bench_mcts
+"""
+import os
+import random
+
+from benchmarks.bench_state import mid_game_state
+from ttr_ga.agents.agent import RandomAgent
+from ttr_ga.agents.mcts import MCTSAgent
+from ttr_ga.simulator import Simulator
+
+
+def main(iterations=200, games=2):
+    state = mid_game_state()
+    for workers in sorted({1, os.cpu_count() or 1}):
+        with MCTSAgent(state.current_player_idx, "MCTS", iterations=iterations, workers=workers,
+                       rng=random.Random(0)) as agent:
+            agent.choose_action(state)  # start the pool
+            agent.choose_action(state)
+            print(f"workers={workers}: {agent.last_search['playouts_per_second']:8.0f} playouts/s")
+
+    agent = MCTSAgent(0, "MCTS", iterations=50, rng=random.Random(0))
+    margins = []
+    for game in range(games):
+        result = Simulator([agent, RandomAgent(1, "Random", rng=random.Random(game))]).play_game(game)
+        margins.append(result["scores"][0] - result["scores"][1])
+    print(f"50 iterations/move vs RandomAgent: margins {margins}, "
+          f"{agent.playouts_per_second:.0f} playouts/s over {agent.playouts} playouts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Observation encodings per second, one state at a time and batched
+
+Run with: python -m benchmarks.bench_observation
+"""
+import random
+import time
+
+import numpy as np
+
+from ttr_ga.agents.agent import RandomAgent
+from ttr_ga.observation import ObservationEncoder
+from ttr_ga.simulator import Simulator
+
+
+def sample_states(count, seed=0):
+    """States from random games at every stage, a few per game"""
+    rng = random.Random(seed)
+    states = []
+    while len(states) < count:
+        agents = [RandomAgent(i, f"P{i + 1}", rng=random.Random(rng.random())) for i in range(3)]
+        state = Simulator(agents).new_game(rng.getrandbits(32))
+        while not state.game_over and len(states) < count:
+            actions = state.get_valid_actions()
+            if not actions:
+                break
+            state = state.apply_action(rng.choice(actions))
+            if rng.random() < 0.2:
+                states.append(state)
+    return states
+
+
+def main(count=2048, repeats=5):
+    encoder = ObservationEncoder()
+    states = sample_states(count)
+    out = np.empty((count, encoder.size), dtype=np.float32)
+    print(f"{encoder.size} features")
+
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for i, state in enumerate(states):
+            encoder.encode(state, out=out[i])
+        best = min(best, time.perf_counter() - start)
+    print(f"encode:        {count / best:10,.0f} encodings/s")
+
+    for batch in (16, 256, count):
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for first in range(0, count, batch):
+                encoder.encode_batch(states[first:first + batch], out=out[first:first + batch])
+            best = min(best, time.perf_counter() - start)
+        print(f"batch of {batch:5}: {count / best:10,.0f} encodings/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Games saved by racing, and whether it selects the same genomes
+
+Run with: python -m benchmarks.bench_racing
+"""
+import time
+
+import numpy as np
+
+from ttr_ga.agents.ga import FitnessEvaluator, next_generation, random_genome
+from ttr_ga.utils.eval import RacingEvaluator
+
+
+def population(size, seed, generations=0):
+    """Random genomes, optionally bred for a few generations against a fixed score so they are closer"""
+    rng = np.random.default_rng(seed)
+    genomes = np.stack([random_genome(rng) for _ in range(size)])
+    for _ in range(generations):
+        genomes = next_generation(genomes, genomes.sum(axis=1), rng)
+    return genomes
+
+
+def main(size=16, games=32, top=8, seeds=(0, 1)):
+    for seed in seeds:
+        for label, generations in (("random", 0), ("bred", 10)):
+            genomes = population(size, seed, generations)
+            start = time.perf_counter()
+            with FitnessEvaluator(games=games, seed=seed) as evaluator:
+                full = evaluator.evaluate(genomes)
+            full_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            with RacingEvaluator(max_games=games, top=top, seed=seed) as evaluator:
+                raced = evaluator.evaluate(genomes)
+                played = int(evaluator.last_games.sum())
+            raced_seconds = time.perf_counter() - start
+
+            same = len(set(np.argsort(-full)[:top]) & set(np.argsort(-raced)[:top]))
+            print(f"seed {seed} {label:6}: {size * games} games in {full_seconds:5.1f} s vs "
+                  f"{played} in {raced_seconds:5.1f} s ({size * games / played:.1f}x fewer), "
+                  f"top {top} agree on {same}")
+
+
+if __name__ == "__main__":
+    main()
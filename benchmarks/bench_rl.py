@@ -0,0 +1,38 @@
+"""Vector environment throughput: learner steps per second by backend
+
+Run with: python -m benchmarks.bench_rl
+"""
+import os
+import time
+
+import numpy as np
+
+from ttr_ga.agents.rl import make_vector_env
+
+
+def random_actions(masks, rng):
+    """A uniformly random legal action per env"""
+    scores = rng.random(masks.shape)
+    scores[~masks] = -1
+    return scores.argmax(axis=1)
+
+
+def throughput(backend, num_envs, steps, workers=None):
+    rng = np.random.default_rng(0)
+    with make_vector_env(num_envs, backend=backend, workers=workers) as env:
+        _, masks = env.reset()
+        start = time.perf_counter()
+        for _ in range(steps):
+            _, _, _, masks, _ = env.step(random_actions(masks, rng))
+        return num_envs * steps / (time.perf_counter() - start)
+
+
+def main(num_envs=32, steps=100):
+    print(f"sync:              {throughput('sync', num_envs, steps):8.0f} steps/s")
+    cores = os.cpu_count() or 1
+    for workers in sorted({2, cores}):
+        print(f"subprocess x{workers:<4}: {throughput('subprocess', num_envs, steps, workers):8.0f} steps/s")
+
+
+if __name__ == "__main__":
+    main()
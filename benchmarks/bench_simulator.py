@@ -0,0 +1,20 @@
+"""Headless random-agent games per second
+
+Run with: python -m benchmarks.bench_simulator
+"""
+import random
+
+from ttr_ga.agents.agent import RandomAgent
+from ttr_ga.simulator import Simulator
+
+
+def main(games=20, players=2):
+    agents = [RandomAgent(i, f"Random {i + 1}", rng=random.Random(i)) for i in range(players)]
+    report = Simulator(agents, seed=0).run(games)
+    turns = sum(result["turns"] for result in report["results"]) / games
+    print(f"{games} games, {players} players, {turns:.0f} turns/game on average")
+    print(f"{report['games_per_second']:.1f} games/s")
+
+
+if __name__ == "__main__":
+    main()
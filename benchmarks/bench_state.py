@@ -0,0 +1,50 @@
+"""GameState.clone and clone+apply_action throughput
+
+Run with: python -m benchmarks.bench_state
+"""
+import copy
+import random
+import time
+
+from ttr_ga.actions import action_space, encode
+from ttr_ga.agents.agent import RandomAgent
+from ttr_ga.simulator import Simulator
+
+
+def mid_game_state(turns=20, seed=0):
+    """A two player game some turns in, so hands and the board are filled"""
+    random.seed(seed)
+    state = Simulator([RandomAgent(0, "P1"), RandomAgent(1, "P2")]).new_game()
+    for _ in range(turns):
+        state = state.apply_action(random.choice(state.get_valid_actions()))
+    return state
+
+
+def rate(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = time.perf_counter() - start
+    return repeat / elapsed, elapsed / repeat * 1e6
+
+
+def main():
+    state = mid_game_state()
+    draw = {"action_type": "draw_train_cards", "method": "blind", "count": 2}
+    draw_id = encode(draw)
+    space = action_space()
+
+    for label, fn, repeat in [
+        ("clone", state.clone, 20000),
+        ("clone + apply_action", lambda: state.apply_action(draw), 20000),
+        ("clone + apply(id)", lambda: state.apply_action(draw_id), 20000),
+        ("legal actions (dicts)", state.get_valid_actions, 5000),
+        ("legal actions (mask)", lambda: space.mask(state), 5000),
+        ("copy.deepcopy", lambda: copy.deepcopy(state), 200),
+    ]:
+        per_second, micros = rate(fn, repeat)
+        print(f"{label:22} {per_second:12,.0f} /s {micros:10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
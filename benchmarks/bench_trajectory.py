@@ -0,0 +1,40 @@
+"""Trajectory log throughput: writing, scanning and sampling records
+
+Run with: python -m benchmarks.bench_trajectory
+"""
+import tempfile
+import time
+
+import numpy as np
+
+from ttr_ga.trajectory import TrajectoryReader, TrajectoryWriter
+
+
+def main(records=1_000_000, features=142, batch=256, batches=2000):
+    rng = np.random.default_rng(0)
+    rows = rng.standard_normal((1000, features)).astype(np.float32)
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        with TrajectoryWriter(directory) as writer:
+            for i in range(records):
+                writer.record(i // 100, i % 100, i % 2, rows[i % 1000], i % 495, 1.0)
+        elapsed = time.perf_counter() - start
+        reader = TrajectoryReader(directory)
+        size = len(reader) * reader.dtype.itemsize
+        print(f"write:  {records / elapsed:12,.0f} records/s ({size / elapsed / 1e6:.0f} MB/s)")
+
+        start = time.perf_counter()
+        total = sum(float(chunk.sum(dtype=np.float64)) for chunk in reader.field("features"))
+        elapsed = time.perf_counter() - start
+        print(f"scan:   {len(reader) / elapsed:12,.0f} records/s ({size / elapsed / 1e6:.0f} MB/s), checksum {total:.1f}")
+
+        start = time.perf_counter()
+        for seed in range(batches):
+            reader.sample(batch, rng=seed)
+        elapsed = time.perf_counter() - start
+        print(f"sample: {batch * batches / elapsed:12,.0f} records/s in batches of {batch}")
+        reader.close()
+
+
+if __name__ == "__main__":
+    main()
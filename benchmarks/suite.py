@@ -0,0 +1,337 @@
+"""Benchmark suite for the simulation hot paths, with baseline comparison
+
+Every target times one hot path over several rounds and reports seconds
+per operation. A run is written as JSON, so it can be kept as a baseline
+and later runs checked against it before starting a long GA run:
+
+    python -m benchmarks.suite run --output baseline.json
+    python -m benchmarks.suite run --output current.json
+    python -m benchmarks.suite compare baseline.json current.json
+
+compare (or run --compare BASELINE) exits with status 1 when a target's
+median got slower than the threshold, 10% by default. -k SUBSTRING
+selects targets by name, like pytest -k.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+
+import numpy as np
+
+from benchmarks.bench_board import claims_for_round
+from benchmarks.bench_longest_path import dense_network
+from benchmarks.bench_state import mid_game_state
+from ttr_ga.agents.agent import RandomAgent
+from ttr_ga.agents.ga import FEATURES, GeneticAgent
+from ttr_ga.agents.mcts import search
+from ttr_ga.board import Board, CompactBoard
+from ttr_ga.game import check_tickets, longest_continuous_path
+from ttr_ga.observation import ObservationEncoder
+from ttr_ga.player import TICKETS, Deck, Player
+from ttr_ga.scoring import longest_trail, trail_cache
+from ttr_ga.simulator import Simulator
+
+RESULTS_VERSION = 1
+MIN_ROUND_TIME = 0.05  # seconds; cheap operations are repeated until a round takes this long
+NETWORKS = {"small": 10, "medium": 25, "worst": 45}  # trains spent on the network
+
+TARGETS = {}
+
+
+def target(name):
+    """Register a benchmark: a function of rounds returning seconds per operation for each round"""
+    def register(bench):
+        TARGETS[name] = bench
+        return bench
+    return register
+
+
+def repeat(fn, rounds, ops=1):
+    """Seconds per operation of fn(), which performs ops operations, over rounds calibrated rounds"""
+    fn()  # warm caches and lazy tables
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_ROUND_TIME:
+            break
+        number *= 2 if elapsed * 4 < MIN_ROUND_TIME else 1 + int(MIN_ROUND_TIME / max(elapsed, 1e-9))
+    samples = [elapsed / (number * ops)]
+    for _ in range(rounds - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / (number * ops))
+    return samples
+
+
+@target("simulator.random_game")
+def bench_random_game(rounds):
+    """One full two player game between seeded random agents"""
+    seeds = iter(range(10 ** 9))
+
+    def play():
+        seed = next(seeds)
+        agents = [RandomAgent(i, f"Random {i + 1}", rng=random.Random(seed * 2 + i)) for i in range(2)]
+        Simulator(agents).play_game(seed)
+    return repeat(play, rounds)
+
+
+def _claim_rounds(factory, rounds):
+    """Claims per round on fresh boards, built outside the timer"""
+    player = Player("Bench")
+    player.trains = 10 ** 9
+    claims = claims_for_round()
+    samples = []
+    with redirect_stdout(StringIO()):
+        for _ in range(rounds):
+            boards = [factory(sink=None) for _ in range(20)]
+            start = time.perf_counter()
+            for board in boards:
+                for city1, city2, hand in claims:
+                    player.hand = list(hand)
+                    board.claim_route(player, city1, city2, player_count=4)
+            samples.append((time.perf_counter() - start) / (len(boards) * len(claims)))
+    return samples
+
+
+@target("board.claim_route")
+def bench_board_claim(rounds):
+    return _claim_rounds(Board.create_standard_board, rounds)
+
+
+@target("compact_board.claim_route")
+def bench_compact_claim(rounds):
+    return _claim_rounds(CompactBoard.create_standard_board, rounds)
+
+
+@target("state.get_valid_actions")
+def bench_valid_actions(rounds):
+    return repeat(mid_game_state().get_valid_actions, rounds)
+
+
+@target("ga.choose_action")
+def bench_ga_choose_action(rounds):
+    state = mid_game_state()
+    agent = GeneticAgent(state.current_player_idx, "GA", np.random.default_rng(0).standard_normal(len(FEATURES)))
+    return repeat(lambda: agent.choose_action(state), rounds)
+
+
+@target("observation.encode")
+def bench_observation_encode(rounds):
+    state = mid_game_state()
+    encoder = ObservationEncoder()
+    out = np.empty(encoder.size, dtype=np.float32)
+    return repeat(lambda: encoder.encode(state, out=out), rounds)
+
+
+@target("observation.encode_batch")
+def bench_observation_encode_batch(rounds):
+    states = [mid_game_state()] * 256
+    encoder = ObservationEncoder()
+    out = np.empty((len(states), encoder.size), dtype=np.float32)
+    return repeat(lambda: encoder.encode_batch(states, out=out), rounds)
+
+
+@target("state.clone")
+def bench_clone(rounds):
+    return repeat(mid_game_state().clone, rounds)
+
+
+@target("deck.draw_train_card")
+def bench_deck_draw(rounds):
+    deck = Deck(sink=None, rng=random.Random(0))
+
+    def draw():
+        copy = deck.copy()
+        for _ in range(100):
+            copy.draw_train_card()
+    return repeat(draw, rounds, ops=100)
+
+
+@target("deck.copy")
+def bench_deck_copy(rounds):
+    return repeat(Deck(sink=None, rng=random.Random(0)).copy, rounds)
+
+
+@target("mcts.playout")
+def bench_mcts_playout(rounds):
+    """One ISMCTS iteration: determinize, select, expand, roll out and score"""
+    state = mid_game_state()
+    seeds = iter(range(10 ** 9))
+    return repeat(lambda: search(state, state.current_player_idx, iterations=20, seed=next(seeds)), rounds, ops=20)
+
+
+def _network(size):
+    """A CompactBoard where one player holds a network of the given size and every ticket"""
+    board = CompactBoard(sink=None)
+    player = Player("P1")
+    player.tickets = list(TICKETS)
+    for route_id in dense_network(trains=NETWORKS[size]):
+        board.owner[route_id] = board.seat(player.name)
+    return board, player
+
+
+def _network_targets(size):
+    @target(f"check_tickets[{size}]")
+    def bench_check_tickets(rounds):
+        board, player = _network(size)
+        return repeat(lambda: check_tickets(player, board), rounds)
+
+    @target(f"longest_trail[{size}]")
+    def bench_longest_trail(rounds):
+        board, player = _network(size)
+        routes = list(board.claimed_routes(player.name))
+        return repeat(lambda: longest_trail(routes), rounds)
+
+    @target(f"longest_continuous_path[{size}]")
+    def bench_longest_path(rounds):
+        # Cached by route mask on a CompactBoard, so this times the lookup
+        board, player = _network(size)
+        trail_cache(board.table).results.clear()
+        return repeat(lambda: longest_continuous_path(player, board), rounds)
+
+
+for size in NETWORKS:
+    _network_targets(size)
+
+
+def summarize(samples):
+    """Statistics of seconds-per-operation samples"""
+    median = statistics.median(samples)
+    return {
+        "rounds": len(samples),
+        "min": min(samples),
+        "median": median,
+        "mean": statistics.fmean(samples),
+        "stddev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "ops_per_second": 1 / median,
+    }
+
+
+def machine_info():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+        "commit": commit,
+    }
+
+
+def run(names=None, rounds=7):
+    """Run the selected targets (all by default) and return the results document"""
+    results = {}
+    for name in names or TARGETS:
+        results[name] = summarize(TARGETS[name](rounds))
+        print(f"{name:36} {format_time(results[name]['median']):>10}/op {results[name]['ops_per_second']:14,.0f} /s")
+    return {
+        "version": RESULTS_VERSION,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "machine": machine_info(),
+        "benchmarks": results,
+    }
+
+
+def compare(baseline, current, threshold=0.1, stat="median"):
+    """Print the change of every target against a baseline; return the names that regressed"""
+    regressions = []
+    print(f"{'target':36} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name in sorted(baseline["benchmarks"].keys() | current["benchmarks"].keys()):
+        old = baseline["benchmarks"].get(name)
+        new = current["benchmarks"].get(name)
+        if old is None or new is None:
+            print(f"{name:36} {'-' if old is None else format_time(old[stat]):>10} "
+                  f"{'-' if new is None else format_time(new[stat]):>10}")
+            continue
+        change = new[stat] / old[stat] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  SLOWER"
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"{name:36} {format_time(old[stat]):>10} {format_time(new[stat]):>10} {change:+8.1%}{flag}")
+    return regressions
+
+
+def format_time(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def select(pattern):
+    names = [name for name in TARGETS if pattern is None or pattern in name]
+    if not names:
+        raise SystemExit(f"No benchmark matches {pattern!r}; targets are: {', '.join(TARGETS)}")
+    return names
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description=__doc__.split("\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("-k", dest="pattern", help="only targets whose name contains this")
+    run_parser.add_argument("--rounds", type=int, default=7)
+    run_parser.add_argument("--output", help="write the results as JSON to this file")
+    run_parser.add_argument("--compare", metavar="BASELINE", help="compare against a saved run")
+    run_parser.add_argument("--threshold", type=float, default=0.1)
+
+    compare_parser = commands.add_parser("compare", help="compare two saved runs")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+    compare_parser.add_argument("--stat", choices=("min", "median", "mean"), default="median")
+
+    commands.add_parser("list", help="list the targets")
+
+    args = parser.parse_args(argv)
+    if args.command == "list":
+        print("\n".join(TARGETS))
+        return 0
+    if args.command == "run":
+        current = run(select(args.pattern), args.rounds)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(current, f, indent=2)
+        if not args.compare:
+            return 0
+        baseline = load(args.compare)
+        stat = "median"
+    else:
+        baseline, current = load(args.baseline), load(args.current)
+        stat = args.stat
+    regressions = compare(baseline, current, args.threshold, stat)
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+"""Fixed-size integer action space
+
+Every action a player can take is given a fixed id, so policies and
+genomes can index actions directly and execution dispatches on a small
+table instead of parsing action dicts. The layout, per route table, is:
+
+    claims         one id per route and payment color it accepts
+    blind draw     draw two cards from the deck
+    mixed draw     one blind card plus face-up card i
+    single face-up face-up card i alone (only legal for a wild)
+    face-up pair   face-up card i, then card j of the refilled layout
+    tickets        draw three tickets and keep a non-empty subset
+"""
+import numpy as np
+
+from ttr_ga.board import CompactBoard, RouteTable
+from ttr_ga.common import COLORS
+from ttr_ga.game import draw_tickets, take_face_up_card
+from ttr_ga.moves import claim_mask, draw_options, requirements
+
+CLAIM, DRAW_BLIND, DRAW_MIXED, DRAW_FACE_UP, DRAW_FACE_UP_PAIR, DRAW_TICKETS = range(6)
+
+FACE_UP_SLOTS = 5
+TICKETS_DRAWN = 3
+KEEP_SUBSETS = (1 << TICKETS_DRAWN) - 1  # bit i keeps the i-th ticket drawn
+
+
+class ActionSpace:
+    """
+    The integer action ids for one route table
+
+    kind, arg0 and arg1 describe every id: (route, color) for claims,
+    face-up indices for draws and the keep bitmask for tickets.
+    """
+    def __init__(self, table):
+        self.table = table
+        accepts = requirements(table).accepts
+
+        kind, arg0, arg1 = [], [], []
+
+        def add(k, a=0, b=0):
+            kind.append(k)
+            arg0.append(int(a))
+            arg1.append(int(b))
+            return len(kind) - 1
+
+        # claim_index[route, color] -> id, -1 if the route doesn't take that color
+        self.claim_index = np.full(accepts.shape, -1, dtype=np.int32)
+        for route_id, color in zip(*np.nonzero(accepts)):
+            self.claim_index[route_id, color] = add(CLAIM, route_id, color)
+        self.claim_ids = self.claim_index[accepts]
+        self.claim_route, self.claim_color = np.nonzero(accepts)
+
+        self.blind = add(DRAW_BLIND)
+        self.mixed = add(DRAW_MIXED, 0)
+        for i in range(1, FACE_UP_SLOTS):
+            add(DRAW_MIXED, i)
+        self.face_up = add(DRAW_FACE_UP, 0)
+        for i in range(1, FACE_UP_SLOTS):
+            add(DRAW_FACE_UP, i)
+        self.face_up_pair = len(kind)
+        for i in range(FACE_UP_SLOTS):
+            for j in range(FACE_UP_SLOTS):
+                add(DRAW_FACE_UP_PAIR, i, j)
+        self.tickets = len(kind)
+        for keep in range(1, KEEP_SUBSETS + 1):
+            add(DRAW_TICKETS, keep)
+
+        self.size = len(kind)
+        self.kind = np.array(kind, dtype=np.int8)
+        self.arg0 = np.array(arg0, dtype=np.int16)
+        self.arg1 = np.array(arg1, dtype=np.int16)
+
+        # Plain lists for the executor, indexing them is cheaper than arrays
+        self._kind = kind
+        self._arg0 = arg0
+        self._arg1 = arg1
+
+        # Legal draw ids by (face-up layout, deck has cards); layouts repeat a lot
+        self._draw_ids = {}
+
+    def encode(self, action):
+        """Return the id of an action dict"""
+        action_type = action["action_type"]
+
+        if action_type == "claim_route":
+            color = COLORS.index(action["color"])
+            for route_id in self.table.pair_routes[(action["city1"], action["city2"])]:
+                action_id = self.claim_index[route_id, color]
+                if action_id >= 0:
+                    return int(action_id)
+            raise ValueError(f"No route takes {action['color']} between {action['city1']} and {action['city2']}")
+
+        if action_type == "draw_tickets":
+            keep = action.get("keep", range(TICKETS_DRAWN))
+            return self.tickets + sum(1 << i for i in set(keep)) - 1
+
+        method = action["method"]
+        indices = action.get("face_up_indices", ())
+        if method == "blind":
+            return self.blind
+        if method == "mixed":
+            return self.mixed + indices[0]
+        if len(indices) == 1:
+            return self.face_up + indices[0]
+        return self.face_up_pair + indices[0] * FACE_UP_SLOTS + indices[1]
+
+    def decode(self, action_id):
+        """Return the action dict for an id"""
+        kind = self._kind[action_id]
+        arg0 = self._arg0[action_id]
+        arg1 = self._arg1[action_id]
+
+        if kind == CLAIM:
+            city1, city2 = self.table.endpoints(arg0)
+            return {"action_type": "claim_route", "city1": city1, "city2": city2, "color": COLORS[arg1]}
+        if kind == DRAW_BLIND:
+            return {"action_type": "draw_train_cards", "method": "blind", "count": 2}
+        if kind == DRAW_MIXED:
+            return {"action_type": "draw_train_cards", "method": "mixed", "blind_count": 1,
+                    "face_up_indices": [arg0]}
+        if kind == DRAW_FACE_UP:
+            return {"action_type": "draw_train_cards", "method": "face_up", "count": 1,
+                    "face_up_indices": [arg0]}
+        if kind == DRAW_FACE_UP_PAIR:
+            return {"action_type": "draw_train_cards", "method": "face_up", "count": 2,
+                    "face_up_indices": [arg0, arg1]}
+        return {"action_type": "draw_tickets", "keep": [i for i in range(TICKETS_DRAWN) if arg0 >> i & 1]}
+
+    def mask(self, game_state):
+        """Boolean array over all ids, True for the current player's legal actions"""
+        mask = np.zeros(self.size, dtype=bool)
+        board = game_state.board
+        if not isinstance(board, CompactBoard):
+            board = CompactBoard.from_board(board, self.table)
+
+        claims = claim_mask(board, game_state.get_current_player(), len(game_state.players))
+        mask[self.claim_ids] = claims[self.claim_route, self.claim_color]
+
+        mask[self.draw_ids(game_state.deck)] = True
+
+        # Keep subsets may only name tickets that will actually be drawn
+        available = min(TICKETS_DRAWN, len(game_state.deck.ticket_cards))
+        if available:
+            mask[self.tickets:self.tickets + (1 << available) - 1] = True
+        return mask
+
+    def draw_ids(self, deck):
+        """Ids of the legal card draws, see moves.draw_options"""
+        key = (tuple(deck.face_up_cards), deck.train_cards_left > 0)
+        ids = self._draw_ids.get(key)
+        if ids is None:
+            ids = []
+            for method, indices in draw_options(deck):
+                if method == "blind":
+                    ids.append(self.blind)
+                elif method == "mixed":
+                    ids.append(self.mixed + indices[0])
+                elif len(indices) == 1:
+                    ids.append(self.face_up + indices[0])
+                else:
+                    ids.append(self.face_up_pair + indices[0] * FACE_UP_SLOTS + indices[1])
+            ids = self._draw_ids[key] = np.array(ids, dtype=np.intp)
+        return ids
+
+    def legal_ids(self, game_state):
+        """Ids of the current player's legal actions"""
+        return np.flatnonzero(self.mask(game_state))
+
+
+def action_space(table=None):
+    """The ActionSpace of a route table, the standard board by default"""
+    if table is None:
+        table = RouteTable.standard()
+    space = table.action_space
+    if space is None:
+        space = table.action_space = ActionSpace(table)
+    return space
+
+
+def encode(action, table=None):
+    """Return the integer id of an action dict"""
+    return action_space(table).encode(action)
+
+
+def decode(action_id, table=None):
+    """Return the action dict for an integer id"""
+    return action_space(table).decode(action_id)
+
+
+def _claim(space, player, game_state, route_id, color):
+    board = game_state.board
+    if isinstance(board, CompactBoard):
+        return board.claim_route_id(player, route_id, color, player_count=len(game_state.players),
+                                    deck=game_state.deck)
+    city1, city2 = space.table.endpoints(route_id)
+    return board.claim_route(player, city1, city2, COLORS[color],
+                             player_count=len(game_state.players), deck=game_state.deck)
+
+
+def _draw_blind(space, player, game_state, arg0, arg1):
+    deck = game_state.deck
+    for _ in range(2):
+        if deck.train_cards_left:
+            player.hand.append(deck.draw_train_card())
+
+
+def _draw_mixed(space, player, game_state, index, arg1):
+    deck = game_state.deck
+    if deck.train_cards_left:
+        player.hand.append(deck.draw_train_card())
+    take_face_up_card(player, deck, index, game_state.sink, allow_wild=False)
+
+
+def _draw_face_up(space, player, game_state, index, arg1):
+    take_face_up_card(player, game_state.deck, index, game_state.sink)
+
+
+def _draw_face_up_pair(space, player, game_state, first, second):
+    card = take_face_up_card(player, game_state.deck, first, game_state.sink)
+    if card is not None and card != "wild":
+        take_face_up_card(player, game_state.deck, second, game_state.sink, allow_wild=False)
+
+
+def _draw_tickets(space, player, game_state, keep, arg1):
+    if game_state.deck.ticket_cards:
+        draw_tickets(player, game_state.deck, [i for i in range(TICKETS_DRAWN) if keep >> i & 1])
+
+
+_HANDLERS = [_claim, _draw_blind, _draw_mixed, _draw_face_up, _draw_face_up_pair, _draw_tickets]
+
+
+def execute_action_id(player, action_id, game_state):
+    """
+    Execute an integer action for a player
+    Same effect as execute_action on the decoded dict. Ids refer to the
+    board's route table, or the standard table for a networkx Board.
+    """
+    space = action_space(getattr(game_state.board, 'table', None))
+    return _HANDLERS[space._kind[action_id]](space, player, game_state,
+                                             space._arg0[action_id], space._arg1[action_id])
@@ -1,14 +1,26 @@
-import random
+from ttr_ga.utils.rng import choice, resolve
 
 
 class Agent:
     """Abstract base class for all AI agents"""
-    def __init__(self, player_id, name):
+    def __init__(self, player_id, name, rng=None, cache=None):
         self.player_id = player_id
         self.name = name
-        
+        self.rng = resolve(rng)  # random.Random or NumPy Generator, None for the global random module
+        self.cache = cache  # agents.transposition.TranspositionCache, or None
+
+    def memoize(self, game_state, compute):
+        """
+        compute(game_state), looked up in the agent's cache by position hash
+        Without a cache this just calls compute.
+        """
+        if self.cache is None:
+            return compute(game_state)
+        return self.cache.lookup(game_state.zobrist_hash(), lambda: compute(game_state))
+
     def choose_action(self, game_state):
         # Should be implemented by specific agent types
+        # Returns None to pass when there is no legal action
         raise NotImplementedError
         
     def observe_outcome(self, action, new_state, reward):
@@ -19,4 +31,6 @@ class RandomAgent(Agent):
     """A simple agent that chooses actions randomly"""
     def choose_action(self, game_state):
         valid_actions = game_state.get_valid_actions()
-        return random.choice(valid_actions)
\ No newline at end of file
+        if not valid_actions:
+            return None
+        return choice(self.rng, valid_actions)
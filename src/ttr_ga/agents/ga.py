@@ -0,0 +1,589 @@
+"""Genetic algorithm agents and parallel fitness evaluation
+
+A genome is a weight vector over per-action features; the agent plays the
+legal action with the highest weighted score. Static features (kind of
+action, route points and length) are fixed per action id. Dynamic ones
+are computed per decision for the legal ids only, from the board index
+and the position:
+
+    ticket_progress     value per train of the open tickets a claim serves
+    blocking            how central a claim is to tickets, near opponents
+    color_scarcity      share of the paying color already out of the supply
+    longest_path_gain   trains added when a claim extends the own network
+    color_need          cards the face-up draw supplies for ticket routes
+    ticket_draw_trains  trains left, on ticket draws
+
+Fitness is measured by playing full headless games, one task per genome,
+across a process pool. Only genomes (small float arrays) and integer
+seeds cross the process boundary; every worker builds its own compact
+boards and decks.
+
+Games are dealt from seeds, so genomes evaluated with the same seed play
+the same deals against identically seeded opponents. These paired games
+cancel out most deal luck when ranking a population.
+
+Evolution drives the search: tournament selection, uniform crossover,
+Gaussian mutation and elitism, each applied to the whole population
+matrix at once. Every generation the population, the RNG state and the
+statistics so far are checkpointed, so an interrupted run resumes where
+it stopped and continues exactly as if it never had:
+
+    python -m ttr_ga.agents.ga --generations 100 --checkpoint run.pickle
+    python -m ttr_ga.agents.ga --generations 100 --checkpoint run.pickle --resume
+"""
+import functools
+import json
+import os
+import pickle
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from ttr_ga.actions import (CLAIM, DRAW_BLIND, DRAW_FACE_UP, DRAW_FACE_UP_PAIR, DRAW_MIXED,
+                            DRAW_TICKETS, FACE_UP_SLOTS, action_space)
+from ttr_ga.agents.agent import Agent, RandomAgent
+from ttr_ga.board import CompactBoard, RouteTable
+from ttr_ga.common import COLORS
+from ttr_ga.index import BoardIndex, board_index
+from ttr_ga.moves import WILD, hand_counts
+from ttr_ga.player import STARTING_TRAINS, TICKETS, TRAIN_CARDS
+from ttr_ga.scoring import ROUTE_POINTS
+from ttr_ga.simulator import Simulator
+from ttr_ga.utils.rng import derive_seed, seat_seed
+
+FEATURES = (
+    # Static: fixed per action id
+    "claim",
+    "route_points",
+    "route_length",
+    "blind_draw",
+    "face_up_draw",
+    "face_up_wild",
+    "ticket_draw",
+    "tickets_kept",
+    "points_per_train",
+    # Dynamic: depend on the position
+    "ticket_progress",
+    "blocking",
+    "color_scarcity",
+    "longest_path_gain",
+    "color_need",
+    "ticket_draw_trains",
+)
+STATIC_FEATURES = FEATURES.index("ticket_progress")
+
+_ROUTE_POINTS = np.array(ROUTE_POINTS, dtype=np.float32)
+_CARD_TOTALS = np.array([TRAIN_CARDS.count(color) for color in COLORS], dtype=np.float32)
+_PROGRESS, _BLOCKING, _SCARCITY, _PATH_GAIN, _NEED, _TICKET_TRAINS = range(STATIC_FEATURES, len(FEATURES))
+
+
+def action_features(space):
+    """(ids, len(FEATURES)) float32 matrix of the static features of every action id, dynamic ones 0"""
+    features = np.zeros((space.size, len(FEATURES)), dtype=np.float32)
+    kind = space.kind
+    claims = kind == CLAIM
+    lengths = np.frombuffer(space.table.length, dtype=np.int8)[space.arg0[claims]]
+
+    features[claims, 0] = 1
+    features[claims, 1] = _ROUTE_POINTS[lengths]
+    features[claims, 2] = lengths
+    features[kind == DRAW_BLIND, 3] = 1
+    features[(kind == DRAW_MIXED) | (kind == DRAW_FACE_UP) | (kind == DRAW_FACE_UP_PAIR), 4] = 1
+    features[kind == DRAW_FACE_UP, 5] = 1  # a single face-up card is always a wild
+    tickets = kind == DRAW_TICKETS
+    features[tickets, 6] = 1
+    features[tickets, 7] = [bin(keep).count("1") for keep in space.arg0[tickets]]
+    features[claims, 8] = _ROUTE_POINTS[lengths] / lengths
+    return features
+
+
+class FeatureTables:
+    """
+    Per route table arrays the dynamic features are computed from
+    Ticket relevance comes from the board index: a route helps a ticket
+    when it lies on one of its cheapest connections on an empty board.
+    """
+    def __init__(self, table):
+        space = self.space = action_space(table)
+        self.static = action_features(space)
+        index = self.index = board_index() if table is RouteTable.standard() else BoardIndex.load(table, TICKETS)
+        endpoints = np.asarray(index.endpoints, dtype=np.intp)
+        self.endpoints = endpoints
+        self.length = np.asarray(index.length, dtype=np.float32)
+        self.color = np.asarray(index.color, dtype=np.intp)  # GRAY is -1
+        self.ticket_routes = np.asarray(index.ticket_routes, dtype=np.float32)
+        values = np.asarray(index.ticket_values, dtype=np.float32)
+        self.ticket_weight = values / np.maximum(np.asarray(index.ticket_cost, dtype=np.float32), 1)
+        # Share of all tickets (by points) a route serves, the routes opponents most likely need
+        centrality = values @ self.ticket_routes
+        self.centrality = centrality / centrality.max()
+
+        # Per claim id: route, paying color and endpoints
+        claims = slice(0, space.blind)
+        self.claim_route = space.arg0[claims].astype(np.intp)
+        self.claim_color = space.arg1[claims].astype(np.intp)
+        self.claim_u = endpoints[self.claim_route, 0]
+        self.claim_v = endpoints[self.claim_route, 1]
+
+        # Per draw id: the face-up slots it takes, FACE_UP_SLOTS for none or an unknown card
+        draws = range(space.blind, space.tickets)
+        self.draw_first = np.full(len(draws), FACE_UP_SLOTS, dtype=np.intp)
+        self.draw_second = np.full(len(draws), FACE_UP_SLOTS, dtype=np.intp)
+        for i, action_id in enumerate(draws):
+            kind, first, second = space.kind[action_id], space.arg0[action_id], space.arg1[action_id]
+            if kind != DRAW_BLIND:
+                self.draw_first[i] = first
+            if kind == DRAW_FACE_UP_PAIR and second != first:
+                self.draw_second[i] = second  # picking the refilled slot takes an unknown card
+
+
+@functools.lru_cache(maxsize=8)
+def feature_tables(table):
+    return FeatureTables(table)
+
+
+def state_features(game_state, ids):
+    """
+    (len(ids), len(FEATURES)) float32 matrix of the features of the given
+    action ids for the current player, static and dynamic
+    ids must be sorted, as returned by ActionSpace.legal_ids.
+    """
+    board = game_state.board
+    tables = feature_tables(board.table)
+    space = tables.space
+    player = game_state.get_current_player()
+    deck = game_state.deck
+    features = tables.static[ids]
+    # Ids are laid out claims, draws, tickets
+    claims_end, draws_end = np.searchsorted(ids, (space.blind, space.tickets))
+
+    owner = np.frombuffer(board.owner, dtype=np.int8)
+    claimed = owner != CompactBoard.UNCLAIMED
+    mine = owner == board.seats.get(player.name, -2)
+
+    # Ticket progress: value per train of the open tickets a route lies on
+    open_tickets = [tables.index.ticket_index.get((c1, c2)) for c1, c2, _ in player.tickets
+                    if not player.connections.connected(c1, c2)]
+    open_tickets = [t for t in open_tickets if t is not None]
+    if open_tickets:
+        progress = tables.ticket_weight[open_tickets] @ tables.ticket_routes[open_tickets]
+    else:
+        progress = np.zeros(len(tables.length), dtype=np.float32)
+    counts = hand_counts(player.hand)
+
+    if claims_end:
+        claim_ids = ids[:claims_end]
+        routes = tables.claim_route[claim_ids]
+        u, v = tables.claim_u[claim_ids], tables.claim_v[claim_ids]
+        cities = len(board.table.cities)
+        my_cities = np.zeros(cities, dtype=bool)
+        my_cities[tables.endpoints[mine]] = True
+        their_cities = np.zeros(cities, dtype=bool)
+        their_cities[tables.endpoints[claimed & ~mine]] = True
+        # Cards of the paying color out of the supply: in hand, face up or discarded
+        discarded = np.bincount(np.frombuffer(deck.discard_codes, dtype=np.uint8), minlength=len(COLORS))
+        seen = counts + hand_counts(deck.face_up_cards) + discarded
+
+        claim_features = features[:claims_end]
+        claim_features[:, _PROGRESS] = progress[routes]
+        claim_features[:, _BLOCKING] = tables.centrality[routes] * (their_cities[u] | their_cities[v])
+        claim_features[:, _SCARCITY] = (seen / _CARD_TOTALS)[tables.claim_color[claim_ids]]
+        # Trains added to a path when the route extends the player's network
+        claim_features[:, _PATH_GAIN] = tables.length[routes] * (my_cities[u] | my_cities[v])
+
+    if draws_end > claims_end:
+        # Cards still missing for the open routes on the player's tickets, by color
+        useful = (progress > 0) & ~claimed & (tables.color >= 0)
+        demand = np.bincount(tables.color[useful], weights=tables.length[useful], minlength=len(COLORS))
+        need = np.maximum(demand - counts, 0) / 6
+        need[WILD] = need.max()
+        face_up = np.zeros(FACE_UP_SLOTS + 1, dtype=np.float32)
+        face_up[:len(deck.face_up_cards)] = need[[COLORS.index(card) for card in deck.face_up_cards]]
+        draw_ids = ids[claims_end:draws_end] - space.blind
+        features[claims_end:draws_end, _NEED] = face_up[tables.draw_first[draw_ids]] + face_up[tables.draw_second[draw_ids]]
+
+    features[draws_end:, _TICKET_TRAINS] = player.trains / STARTING_TRAINS
+    return features
+
+
+class GeneticAgent(Agent):
+    """
+    Plays the legal action whose features score highest under its genome
+    The features of every legal action are built as one matrix and scored
+    with a single dot product. The choice only depends on what
+    zobrist.state_hash hashes, discard pile colors included, so with a
+    cache repeated positions are looked up instead.
+    """
+    def __init__(self, player_id, name, genome, rng=None, cache=None):
+        super().__init__(player_id, name, rng, cache)
+        self.genome = np.asarray(genome, dtype=np.float32)
+
+    def choose_action(self, game_state):
+        return self.memoize(game_state, self._best_action)
+
+    def _best_action(self, game_state):
+        board = game_state.board
+        if not isinstance(board, CompactBoard):
+            game_state = game_state.clone()
+            game_state.board = CompactBoard.from_board(board, RouteTable.standard())
+        legal = action_space(game_state.board.table).legal_ids(game_state)
+        if not len(legal):
+            return None
+        scores = state_features(game_state, legal) @ self.genome
+        return int(legal[np.argmax(scores)])
+
+
+def random_genome(rng):
+    """A genome with standard normal weights"""
+    return rng.standard_normal(len(FEATURES)).astype(np.float32)
+
+
+def task_seed(seed, generation, index):
+    """The deterministic seed for evaluating genome index in a generation"""
+    return derive_seed(seed, generation, index)
+
+
+def evaluate_genome(genome, opponents=(RandomAgent,), games=10, players=2, max_turns=500, seed=0):
+    """
+    Fitness of one genome: its mean score margin over the best opponent
+
+    Game i seats the genome at seat i % players and fills the other seats
+    from the opponent pool in rotation. Opponents are factories called as
+    factory(player_id, name, rng=...), e.g. RandomAgent or a
+    functools.partial of GeneticAgent with a fixed genome. The deals and
+    the opponents' random streams only depend on the seed.
+    """
+    return float(np.mean(game_margins(genome, range(games), opponents, players, max_turns, seed)))
+
+
+def game_margins(genome, games, opponents=(RandomAgent,), players=2, max_turns=500, seed=0):
+    """
+    The genome's score margin in each of the given games of the series dealt from seed
+    Game numbers index one endless series, so a genome's evaluation can be
+    extended a few games at a time and still match evaluate_genome.
+    """
+    margins = []
+    for game in games:
+        deal_seed = derive_seed(seed, game)
+        seat = game % players
+        agents = []
+        for i in range(players):
+            if i == seat:
+                agents.append(GeneticAgent(i, f"Genome {i + 1}", genome))
+            else:
+                factory = opponents[(game + i) % len(opponents)]
+                agents.append(factory(i, f"Opponent {i + 1}", rng=random.Random(seat_seed(deal_seed, i))))
+        simulator = Simulator(agents, board_factory=CompactBoard, max_turns=max_turns)
+        scores = simulator.play_game(deal_seed)["scores"]
+        margins.append(scores[seat] - max(score for i, score in enumerate(scores) if i != seat))
+    return margins
+
+
+_WORKER_SETTINGS = None
+
+
+def _init_worker(settings):
+    # Opponents and game settings are sent once per worker, not per task
+    global _WORKER_SETTINGS
+    _WORKER_SETTINGS = settings
+
+
+def _evaluate_task(task):
+    genome, seed = task
+    return evaluate_genome(genome, seed=seed, **_WORKER_SETTINGS)
+
+
+class FitnessEvaluator:
+    """
+    Evaluates populations of genomes over a process pool
+
+    Each genome plays games games against the opponent pool with a seed
+    derived from (seed, generation, index), so fitness is reproducible and
+    independent of the number of workers. With paired=True the index is
+    left out and the whole generation plays the same deals. workers=1
+    evaluates in process. The pool is started on first use and kept until
+    close().
+    """
+    def __init__(self, opponents=(RandomAgent,), games=10, players=2, max_turns=500,
+                 workers=None, seed=0, paired=True):
+        self.settings = {
+            "opponents": tuple(opponents),
+            "games": games,
+            "players": players,
+            "max_turns": max_turns,
+        }
+        self.workers = workers
+        self.seed = seed
+        self.paired = paired
+        self.last_games = None
+        self._pool = None
+
+    def evaluate(self, population, generation=0):
+        """Fitness of every genome in population (array-like, genomes x features)"""
+        tasks = [(np.asarray(genome, dtype=np.float32),
+                  task_seed(self.seed, generation, 0 if self.paired else index))
+                 for index, genome in enumerate(population)]
+        if self.workers == 1:
+            fitness = [evaluate_genome(genome, seed=seed, **self.settings) for genome, seed in tasks]
+        else:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                                 initargs=(self.settings,))
+            fitness = list(self._pool.map(_evaluate_task, tasks))
+        self.last_games = np.full(len(tasks), self.settings["games"])
+        return np.array(fitness, dtype=np.float64)
+
+    def close(self):
+        """Shut down the worker pool"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def tournament_select(fitness, count, rng, size=3):
+    """Indices of count tournament winners, each the fittest of size genomes drawn with replacement"""
+    entrants = rng.integers(len(fitness), size=(count, size))
+    return entrants[np.arange(count), np.argmax(fitness[entrants], axis=1)]
+
+
+def crossover(parents1, parents2, rng, rate=0.9):
+    """
+    Uniform crossover of two parent matrices, row by row
+    Each child takes every weight from either parent with equal chance;
+    with probability 1 - rate it is a plain copy of its first parent.
+    """
+    swap = rng.random(parents1.shape) < 0.5
+    swap &= (rng.random(len(parents1)) < rate)[:, None]
+    return np.where(swap, parents2, parents1)
+
+
+def mutate(population, rng, rate=0.1, scale=0.3):
+    """Add N(0, scale) noise to each weight with probability rate"""
+    hits = rng.random(population.shape) < rate
+    noise = rng.normal(0.0, scale, population.shape)
+    return (population + hits * noise).astype(np.float32)
+
+
+def next_generation(population, fitness, rng, elite=2, tournament=3, crossover_rate=0.9,
+                    mutation_rate=0.1, mutation_scale=0.3):
+    """The elite genomes unchanged, followed by bred and mutated children"""
+    population = np.asarray(population, dtype=np.float32)
+    fitness = np.asarray(fitness)
+    children = len(population) - elite
+    parents1 = tournament_select(fitness, children, rng, tournament)
+    parents2 = tournament_select(fitness, children, rng, tournament)
+    offspring = crossover(population[parents1], population[parents2], rng, crossover_rate)
+    offspring = mutate(offspring, rng, mutation_rate, mutation_scale)
+    best = np.argsort(-fitness, kind="stable")[:elite]
+    return np.concatenate([population[best], offspring])
+
+
+CHECKPOINT_VERSION = 1
+
+
+def _games_played(evaluator):
+    games = getattr(evaluator, "last_games", None)
+    return None if games is None else int(np.sum(games))
+
+
+class Evolution:
+    """
+    A generational GA over genomes, evaluated by a FitnessEvaluator
+
+    step() evaluates the current population, records its statistics and
+    breeds the next one. With a checkpoint path the run is saved after
+    every generation; Evolution.resume() picks it up again. metadata is
+    saved along, for callers to record how the evaluator was built.
+    """
+    def __init__(self, evaluator, population_size=32, elite=2, tournament=3, crossover_rate=0.9,
+                 mutation_rate=0.1, mutation_scale=0.3, seed=0, checkpoint=None, metadata=None):
+        if not 0 <= elite < population_size:
+            raise ValueError("elite must be smaller than the population")
+        self.evaluator = evaluator
+        self.settings = {
+            "elite": elite,
+            "tournament": tournament,
+            "crossover_rate": crossover_rate,
+            "mutation_rate": mutation_rate,
+            "mutation_scale": mutation_scale,
+        }
+        self.rng = np.random.default_rng(seed)
+        self.population = self.rng.standard_normal((population_size, len(FEATURES))).astype(np.float32)
+        self.generation = 0
+        self.history = []
+        self.best_genome = None
+        self.best_fitness = -np.inf
+        self.checkpoint = checkpoint
+        self.metadata = dict(metadata or {})
+
+    def step(self):
+        """Evaluate and breed one generation, returning its statistics"""
+        start = time.perf_counter()
+        fitness = self.evaluator.evaluate(self.population, generation=self.generation)
+        best = int(np.argmax(fitness))
+        if fitness[best] > self.best_fitness:
+            self.best_fitness = float(fitness[best])
+            self.best_genome = self.population[best].copy()
+        stats = {
+            "generation": self.generation,
+            "best": float(fitness[best]),
+            "mean": float(fitness.mean()),
+            "median": float(np.median(fitness)),
+            "std": float(fitness.std()),
+            "worst": float(fitness.min()),
+            "best_ever": self.best_fitness,
+            "diversity": float(self.population.std(axis=0).mean()),
+            "games": _games_played(self.evaluator),
+            "seconds": time.perf_counter() - start,
+        }
+        self.history.append(stats)
+        self.population = next_generation(self.population, fitness, self.rng, **self.settings)
+        self.generation += 1
+        if self.checkpoint is not None:
+            self.save(self.checkpoint)
+        return stats
+
+    def run(self, generations, callback=None):
+        """
+        Step until generations generations have been evaluated in total
+        callback(stats) is called after each one, e.g. to stream the
+        statistics. A resumed run only plays the generations still missing.
+        """
+        while self.generation < generations:
+            stats = self.step()
+            if callback is not None:
+                callback(stats)
+        return self.history
+
+    def state(self):
+        return {
+            "version": CHECKPOINT_VERSION,
+            "generation": self.generation,
+            "population": self.population,
+            "rng": self.rng.bit_generator.state,
+            "settings": self.settings,
+            "history": self.history,
+            "best_genome": self.best_genome,
+            "best_fitness": self.best_fitness,
+            "metadata": self.metadata,
+        }
+
+    def save(self, path):
+        """Write a checkpoint, replacing the file atomically so a crash never leaves half of one"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, staging = tempfile.mkstemp(prefix=f".{path.name}-", dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(self.state(), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(staging, path)
+        except BaseException:
+            Path(staging).unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    def resume(cls, path, evaluator, checkpoint=None):
+        """
+        The run saved at path, continuing with evaluator
+        The evaluator should be built as the original one was (see
+        metadata) for the resumed run to match an uninterrupted one. It
+        keeps checkpointing to path unless another checkpoint is given.
+        """
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"{path} is not a version {CHECKPOINT_VERSION} checkpoint")
+        population = state["population"]
+        evolution = cls(evaluator, population_size=len(population), checkpoint=checkpoint or path,
+                        metadata=state["metadata"], **state["settings"])
+        evolution.population = population
+        evolution.rng.bit_generator.state = state["rng"]
+        evolution.generation = state["generation"]
+        evolution.history = state["history"]
+        evolution.best_genome = state["best_genome"]
+        evolution.best_fitness = state["best_fitness"]
+        return evolution
+
+
+def main(argv=None):
+    """Evolve genomes against random opponents, streaming per-generation statistics as JSON lines"""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m ttr_ga.agents.ga", description=main.__doc__)
+    parser.add_argument("--generations", type=int, default=50,
+                        help="generations to evaluate in total, counting resumed ones")
+    parser.add_argument("--population", type=int, default=32)
+    parser.add_argument("--elite", type=int, default=2)
+    parser.add_argument("--tournament", type=int, default=3)
+    parser.add_argument("--crossover-rate", type=float, default=0.9)
+    parser.add_argument("--mutation-rate", type=float, default=0.1)
+    parser.add_argument("--mutation-scale", type=float, default=0.3)
+    parser.add_argument("--games", type=int, default=10, help="games per genome per generation")
+    parser.add_argument("--racing", action="store_true",
+                        help="race genomes (utils.eval.RacingEvaluator), --games becomes the most per genome")
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--max-turns", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--checkpoint", metavar="FILE", help="save the run here after every generation")
+    parser.add_argument("--resume", action="store_true", help="continue the run saved in --checkpoint")
+    parser.add_argument("--log", metavar="FILE", help="append the statistics to FILE instead of stdout")
+    args = parser.parse_args(argv)
+    if args.resume and not args.checkpoint:
+        parser.error("--resume needs --checkpoint")
+    if args.generations < 1:
+        parser.error("--generations must be at least 1")
+
+    if args.resume:
+        with open(args.checkpoint, "rb") as f:
+            evaluation = pickle.load(f)["metadata"]["evaluation"]
+    else:
+        evaluation = {"games": args.games, "players": args.players, "max_turns": args.max_turns,
+                      "seed": args.seed, "racing": args.racing}
+    out = open(args.log, "a") if args.log else sys.stdout
+
+    def report(stats):
+        out.write(json.dumps(stats) + "\n")
+        out.flush()
+
+    try:
+        settings = dict(evaluation, workers=args.workers)
+        if settings.pop("racing", False):
+            from ttr_ga.utils.eval import RacingEvaluator
+
+            settings["max_games"] = settings.pop("games")
+            evaluator = RacingEvaluator(min_games=min(4, settings["max_games"]), **settings)
+        else:
+            evaluator = FitnessEvaluator(**settings)
+        with evaluator:
+            if args.resume:
+                evolution = Evolution.resume(args.checkpoint, evaluator)
+            else:
+                evolution = Evolution(evaluator, population_size=args.population, elite=args.elite,
+                                      tournament=args.tournament, crossover_rate=args.crossover_rate,
+                                      mutation_rate=args.mutation_rate, mutation_scale=args.mutation_scale,
+                                      seed=args.seed, checkpoint=args.checkpoint,
+                                      metadata={"evaluation": evaluation})
+            evolution.run(args.generations, callback=report)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if evolution.best_genome is None:
+        print("no generation evaluated, no best genome", file=sys.stderr)
+    else:
+        print("best genome:", json.dumps(dict(zip(FEATURES, map(float, evolution.best_genome)))), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""Information set Monte Carlo tree search
+
+MCTSAgent grows a single tree over action ids (single observer ISMCTS).
+Each iteration first determinizes the position: the cards in opponents'
+hands and the draw pile are shuffled together and dealt back, and so are
+opponents' tickets and the ticket pile, so the search never reads
+hidden information. An action that is illegal in one determinization is
+just unavailable there; selection scores children by how often they
+were available rather than by parent visits.
+
+Iterations play out in place on one silent clone per determinization,
+through actions.execute_action_id, with a claim-first rollout policy cut
+off after rollout_plies moves. The position is then scored with
+scoring.score_game and each seat's margin over the best other seat is
+squashed into [0, 1].
+
+A move searches for a number of iterations or seconds. With workers > 1
+independent trees are grown from the same root in worker processes
+(root parallelization) and their root statistics are summed.
+"""
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ttr_ga.actions import action_space, execute_action_id
+from ttr_ga.agents.agent import Agent
+from ttr_ga.board import CompactBoard, RouteTable
+from ttr_ga.moves import claim_mask
+from ttr_ga.scoring import score_game
+
+REWARD_SCALE = 20  # points of margin for a reward of about 0.88
+
+
+class _Node:
+    """Statistics of one action in the tree, from the view of the seat taking it"""
+    __slots__ = ("action", "seat", "children", "visits", "reward", "available")
+
+    def __init__(self, action=None, seat=None):
+        self.action = action
+        self.seat = seat
+        self.children = {}
+        self.visits = 0
+        self.reward = 0.0
+        self.available = 0
+
+
+def determinize(state, observer, rng):
+    """
+    A silent copy of state with the hidden information resampled
+    Opponents keep as many cards and tickets as they hold, the observer's
+    hand and all public information are unchanged.
+    """
+    state = state.clone()
+    state.sink = state.board.sink = None
+    deck = state.deck = state.deck.copy(rng=rng)
+    deck.sink = None
+    opponents = [player for seat, player in enumerate(state.players) if seat != observer]
+
+    cards = deck.train_cards
+    tickets = list(deck.ticket_cards)
+    for player in opponents:
+        cards += player.hand
+        tickets += player.tickets
+    rng.shuffle(cards)
+    rng.shuffle(tickets)
+    for player in opponents:
+        player.hand = [cards.pop() for _ in player.hand]
+        player.tickets = [tickets.pop() for _ in player.tickets]
+    deck.train_cards = cards
+    deck.ticket_cards = tickets
+    return state
+
+
+def claim_first(space, state, rng):
+    """
+    Rollout policy: a random legal claim, else a blind draw, else any legal action
+    Only builds the full legal mask when neither a claim nor a blind draw is possible.
+    """
+    claims = claim_mask(state.board, state.get_current_player(), len(state.players))
+    claims = space.claim_ids[claims[space.claim_route, space.claim_color]]
+    if len(claims):
+        return int(claims[rng.randrange(len(claims))])
+    if state.deck.train_cards_left:
+        return space.blind
+    legal = space.legal_ids(state)
+    return int(legal[rng.randrange(len(legal))]) if len(legal) else None
+
+
+def rewards(state):
+    """Each seat's score margin over the best other seat, squashed into [0, 1]"""
+    totals = [result["total"] for result in score_game(state.players, state.board)]
+    if len(totals) == 1:
+        return [1.0]
+    result = []
+    for seat, total in enumerate(totals):
+        best_other = max(t for s, t in enumerate(totals) if s != seat)
+        result.append(0.5 + 0.5 * math.tanh((total - best_other) / REWARD_SCALE))
+    return result
+
+
+def _step(state, action):
+    execute_action_id(state.get_current_player(), action, state)
+    state.end_turn()
+
+
+def search(state, observer, iterations=None, time_limit=None, exploration=0.7, rollout_plies=20,
+           policy=claim_first, seed=None):
+    """
+    Grow a tree from state for the observer's move
+    Stops after iterations iterations or time_limit seconds, whichever
+    comes first (200 iterations if neither is given). Returns the root
+    statistics as {action id: (visits, total reward)} and the number of
+    iterations run.
+    """
+    if iterations is None and time_limit is None:
+        iterations = 200
+    rng = random.Random(seed)
+    space = action_space(state.board.table)
+    root = _Node()
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    done = 0
+
+    while (iterations is None or done < iterations) and (deadline is None or time.perf_counter() < deadline):
+        done += 1
+        game = determinize(state, observer, rng)
+        node = root
+        path = []
+
+        # Selection and expansion, on the actions available in this determinization
+        while not game.game_over:
+            legal = space.legal_ids(game).tolist()
+            if not legal:
+                break
+            untried = []
+            for action in legal:
+                child = node.children.get(action)
+                if child is None:
+                    untried.append(action)
+                else:
+                    child.available += 1
+            if untried:
+                action = untried[rng.randrange(len(untried))]
+                child = node.children[action] = _Node(action, game.current_player_idx)
+                child.available = 1
+                _step(game, action)
+                path.append(child)
+                break
+            node = max((node.children[action] for action in legal),
+                       key=lambda c: c.reward / c.visits + exploration * math.sqrt(math.log(c.available) / c.visits))
+            _step(game, node.action)
+            path.append(node)
+
+        # Rollout
+        for _ in range(rollout_plies):
+            if game.game_over:
+                break
+            action = policy(space, game, rng)
+            if action is None:
+                break
+            _step(game, action)
+
+        result = rewards(game)
+        root.visits += 1
+        for node in path:
+            node.visits += 1
+            node.reward += result[node.seat]
+
+    return {action: (child.visits, child.reward) for action, child in root.children.items()}, done
+
+
+def _search_task(task):
+    state, observer, seed, settings = task
+    return search(state, observer, seed=seed, **settings)
+
+
+class MCTSAgent(Agent):
+    """
+    Plays the most visited root action of an ISMCTS search on a CompactBoard
+
+    Each move runs iterations iterations or time_limit seconds of search
+    (per worker). workers > 1 runs that many independent searches in a
+    process pool, started on first use and kept until close(). Search
+    totals are kept in playouts and search_seconds, the last move's in
+    last_search. A networkx Board is searched as a CompactBoard on the
+    standard table, whose action ids it plays. With a cache, a position
+    searched before is answered with the move found then.
+    """
+    def __init__(self, player_id, name, iterations=200, time_limit=None, workers=1, exploration=0.7,
+                 rollout_plies=20, rng=None, cache=None):
+        super().__init__(player_id, name, rng, cache)
+        self.settings = {
+            "iterations": iterations,
+            "time_limit": time_limit,
+            "exploration": exploration,
+            "rollout_plies": rollout_plies,
+        }
+        self.workers = workers
+        self.playouts = 0
+        self.search_seconds = 0.0
+        self.last_search = None
+        self._pool = None
+
+    def choose_action(self, game_state):
+        board = game_state.board
+        if not isinstance(board, CompactBoard):
+            game_state = game_state.clone()
+            game_state.board = CompactBoard.from_board(board, RouteTable.standard())
+        return self.memoize(game_state, self._search)
+
+    def _search(self, game_state):
+        space = action_space(game_state.board.table)
+        legal = space.legal_ids(game_state)
+        if len(legal) <= 1:
+            return int(legal[0]) if len(legal) else None
+
+        start = time.perf_counter()
+        observer = game_state.current_player_idx
+        seeds = [int(self.rng.random() * 2 ** 53) for _ in range(self.workers)]
+        if self.workers == 1:
+            results = [search(game_state, observer, seed=seeds[0], **self.settings)]
+        else:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(self.workers)
+            state = game_state.clone()
+            state.sink = state.board.sink = state.deck.sink = None
+            results = list(self._pool.map(_search_task, [(state, observer, seed, self.settings) for seed in seeds]))
+
+        visits = {}
+        iterations = 0
+        for stats, done in results:
+            iterations += done
+            for action, (count, _) in stats.items():
+                visits[action] = visits.get(action, 0) + count
+        elapsed = time.perf_counter() - start
+        self.playouts += iterations
+        self.search_seconds += elapsed
+        self.last_search = {
+            "iterations": iterations,
+            "seconds": elapsed,
+            "playouts_per_second": iterations / elapsed if elapsed > 0 else float("inf"),
+        }
+        if not visits:
+            return int(legal[0])
+        return max(visits, key=lambda action: (visits[action], -action))
+
+    @property
+    def playouts_per_second(self):
+        return self.playouts / self.search_seconds if self.search_seconds else 0.0
+
+    def close(self):
+        """Shut down the worker pool"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
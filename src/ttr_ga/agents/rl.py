@@ -0,0 +1,321 @@
+"""Reinforcement learning environments
+
+TicketToRideEnv is one game seen from a learner's seat: the other seats
+are played by built-in agents, and every reset() or step() runs them
+until it is the learner's turn again. Actions are action ids
+(actions.ActionSpace) and observations come from
+observation.ObservationEncoder.
+
+The vector environments run num_envs games in lockstep and return
+stacked NumPy arrays:
+
+    reset()       -> observations (n, features), masks (n, actions)
+    step(actions) -> observations, rewards (n,), dones (n,), masks, infos
+
+masks marks the legal action ids of each learner. A game that ends is
+reset at once, so the observation and mask returned for it belong to
+the next game; infos[i] then holds the final observation, the final
+scores and the learner's margin. SyncVectorEnv steps every game in
+process; SubprocVectorEnv splits them over worker processes, each
+running a SyncVectorEnv on its share. Deals depend only on the seed and
+the env index, so both backends produce the same games.
+
+Rewards are the learner's score changes by default ("score"): points for
+the routes it claims, then the final scoring points (tickets and longest
+path) on the last step, so a game's rewards add up to its final score.
+With reward="margin" the only reward is the final margin over the best
+opponent.
+"""
+import multiprocessing
+import os
+import random
+
+import numpy as np
+
+from ttr_ga.actions import action_space
+from ttr_ga.agents.agent import Agent, RandomAgent
+from ttr_ga.game import execute_action, final_scoring
+from ttr_ga.observation import observation_encoder
+from ttr_ga.simulator import Simulator
+from ttr_ga.utils.rng import derive_seed, seat_seed
+
+REWARDS = ("score", "margin")
+LEARNER = "Learner"
+
+
+class TicketToRideEnv:
+    """
+    One game against built-in agents, from the learner's seat
+
+    Opponents are factories called as factory(player_id, name, rng=...),
+    used in rotation over the other seats. The learner plays seat, or
+    every seat in turn over successive games when seat is None. Games
+    that reach max_turns rounds, or where every seat has to pass, end as
+    in Simulator. A learner with no legal action passes automatically, and
+    a game that ends before the learner's first move is dealt again.
+    """
+    def __init__(self, opponents=(RandomAgent,), players=2, seat=None, max_turns=500, reward="score", seed=0,
+                 env_id=0):
+        if reward not in REWARDS:
+            raise ValueError(f"reward must be one of {REWARDS}")
+        if not 2 <= players <= 5:
+            raise ValueError("games take 2 to 5 players")
+        if max_turns < 1:
+            raise ValueError("max_turns must be at least 1")
+        self.opponents = tuple(opponents)
+        self.players = players
+        self.fixed_seat = seat
+        self.max_turns = max_turns
+        self.reward = reward
+        self.seed = seed
+        self.env_id = env_id
+        self.space = action_space()
+        self.games = 0
+        self.state = None
+        self.seat = None
+        self.mask = None
+        self.done = True
+
+    def reset(self):
+        """
+        Deal the next game and play until the learner's first turn
+        Games that end before then are skipped, so the learner always has a
+        legal move after reset().
+        """
+        self._deal()
+        while self.done:
+            self._deal()
+        return self.state
+
+    def _deal(self):
+        """Deal game number self.games and play the seats before the learner's"""
+        game = self.games
+        self.games += 1
+        deal_seed = derive_seed(self.seed, self.env_id, game)
+        self.seat = (self.env_id + game) % self.players if self.fixed_seat is None else self.fixed_seat
+        agents = []
+        for i in range(self.players):
+            if i == self.seat:
+                agents.append(Agent(i, LEARNER))
+            else:
+                factory = self.opponents[(game + i) % len(self.opponents)]
+                agents.append(factory(i, f"Opponent {i + 1}", rng=random.Random(seat_seed(deal_seed, i))))
+        self.agents = agents
+        self.state = Simulator(agents, max_turns=self.max_turns).new_game(deal_seed)
+        self.passes = 0
+        self.done = False
+        self._scored = 0
+        self._advance()
+
+    def step(self, action):
+        """
+        Play the learner's action id and the opponents' replies
+        Returns the learner's reward, whether the game is over and an info
+        dict, with the final scores and margin once it is.
+        """
+        if self.done:
+            raise RuntimeError("step() on a finished game, call reset()")
+        action = int(action)
+        if not 0 <= action < len(self.mask) or not self.mask[action]:
+            raise ValueError(f"action {action} is not legal")
+        state = self.state
+        execute_action(state.players[self.seat], action, state)
+        state.end_turn()
+        self.passes = 0
+        self._advance()
+
+        learner = state.players[self.seat]
+        info = {}
+        if self.done:
+            final_scoring(state.players, state.board, sink=None)
+            scores = [player.score for player in state.players]
+            margin = learner.score - max(score for i, score in enumerate(scores) if i != self.seat)
+            info = {"scores": scores, "seat": self.seat, "margin": margin, "turns": state.turn}
+        if self.reward == "score":
+            reward = learner.score - self._scored
+            self._scored = learner.score
+        else:
+            reward = info["margin"] if self.done else 0
+        return float(reward), self.done, info
+
+    def _finished(self):
+        state = self.state
+        return state.game_over or state.turn > self.max_turns or self.passes >= self.players
+
+    def _advance(self):
+        """Play opponents, and learner passes, until the learner has a move or the game is over"""
+        state = self.state
+        while not self._finished():
+            seat = state.current_player_idx
+            if seat == self.seat:
+                self.mask = self.space.mask(state)
+                if self.mask.any():
+                    return
+                action = None
+            else:
+                agent = self.agents[seat]
+                action = agent.choose_action(state)
+                if action is not None:
+                    execute_action(state.players[seat], action, state)
+                agent.observe_outcome(action, state, 0)
+            self.passes = self.passes + 1 if action is None else 0
+            state.end_turn()
+        self.done = True
+        self.mask = np.zeros(self.space.size, dtype=bool)
+
+
+class SyncVectorEnv:
+    """
+    num_envs TicketToRideEnvs stepped one after another in process
+    Env i gets env_id first_env + i; the remaining arguments are passed to
+    every TicketToRideEnv.
+    """
+    def __init__(self, num_envs, first_env=0, **env_kwargs):
+        self.envs = [TicketToRideEnv(env_id=first_env + i, **env_kwargs) for i in range(num_envs)]
+        self.num_envs = num_envs
+        self.encoder = observation_encoder()
+        self.observation_size = self.encoder.size
+        self.action_size = action_space().size
+
+    def reset(self):
+        for env in self.envs:
+            env.reset()
+        return self._observe()
+
+    def step(self, actions):
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        dones = np.zeros(self.num_envs, dtype=bool)
+        infos = []
+        for i, (env, action) in enumerate(zip(self.envs, actions)):
+            rewards[i], dones[i], info = env.step(action)
+            if dones[i]:
+                info["final_observation"] = self.encoder.encode(env.state, env.seat).copy()
+                env.reset()
+            infos.append(info)
+        observations, masks = self._observe()
+        return observations, rewards, dones, masks, infos
+
+    def _observe(self):
+        observations = np.empty((self.num_envs, self.observation_size), dtype=np.float32)
+        self.encoder.encode_batch([env.state for env in self.envs], [env.seat for env in self.envs], out=observations)
+        masks = np.stack([env.mask for env in self.envs])
+        return observations, masks
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _worker(conn, num_envs, first_env, env_kwargs):
+    env = SyncVectorEnv(num_envs, first_env=first_env, **env_kwargs)
+    while True:
+        command, data = conn.recv()
+        if command == "close":
+            conn.close()
+            return
+        try:
+            result = env.reset() if command == "reset" else env.step(data)
+        except Exception as exc:  # handed to the parent, which raises it
+            conn.send(("error", exc))
+        else:
+            conn.send(("ok", result))
+
+
+class SubprocVectorEnv:
+    """
+    num_envs games split over worker processes (os.cpu_count() by default)
+    Each worker steps a SyncVectorEnv on a contiguous share of the envs;
+    results are gathered in env order, so they match SyncVectorEnv.
+    """
+    def __init__(self, num_envs, workers=None, **env_kwargs):
+        workers = max(1, min(workers or os.cpu_count() or 1, num_envs))
+        self.num_envs = num_envs
+        shares = np.array_split(np.arange(num_envs), workers)
+        self._bounds = [(int(share[0]), int(share[-1]) + 1) for share in shares]
+        self._conns = []
+        self._processes = []
+        context = multiprocessing.get_context()
+        for start, stop in self._bounds:
+            parent, child = context.Pipe()
+            process = context.Process(target=_worker, args=(child, stop - start, start, env_kwargs), daemon=True)
+            process.start()
+            child.close()
+            self._conns.append(parent)
+            self._processes.append(process)
+        self.observation_size = observation_encoder().size
+        self.action_size = action_space().size
+
+    def _gather(self):
+        results = []
+        for conn in self._conns:
+            status, result = conn.recv()
+            if status == "error":
+                raise result
+            results.append(result)
+        return results
+
+    def reset(self):
+        for conn in self._conns:
+            conn.send(("reset", None))
+        results = self._gather()
+        return tuple(np.concatenate(parts) for parts in zip(*results))
+
+    def step(self, actions):
+        actions = np.asarray(actions)
+        for conn, (start, stop) in zip(self._conns, self._bounds):
+            conn.send(("step", actions[start:stop]))
+        results = self._gather()
+        observations, rewards, dones, masks, infos = zip(*results)
+        return (np.concatenate(observations), np.concatenate(rewards), np.concatenate(dones),
+                np.concatenate(masks), [info for part in infos for info in part])
+
+    def close(self):
+        for conn in self._conns:
+            try:
+                conn.send(("close", None))
+            except (BrokenPipeError, EOFError):
+                pass
+            conn.close()
+        for process in self._processes:
+            process.join()
+        self._conns = []
+        self._processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def make_vector_env(num_envs, backend="sync", workers=None, **env_kwargs):
+    """A vector environment of num_envs games, stepped in process ("sync") or in workers ("subprocess")"""
+    if backend == "sync":
+        return SyncVectorEnv(num_envs, **env_kwargs)
+    if backend == "subprocess":
+        return SubprocVectorEnv(num_envs, workers=workers, **env_kwargs)
+    raise ValueError(f"unknown backend {backend!r}, expected 'sync' or 'subprocess'")
+
+
+class PolicyAgent(Agent):
+    """
+    Plays a policy trained on these environments in ordinary games
+    policy(observation, mask) returns an action id, e.g. the argmax of a
+    network's masked logits; useful as a Tournament entrant.
+    """
+    def __init__(self, player_id, name, policy, rng=None, cache=None):
+        super().__init__(player_id, name, rng, cache)
+        self.policy = policy
+
+    def choose_action(self, game_state):
+        space = action_space(getattr(game_state.board, "table", None))
+        mask = space.mask(game_state)
+        if not mask.any():
+            return None
+        observation = observation_encoder(getattr(game_state.board, "table", None)).encode(game_state)
+        return int(self.policy(observation, mask))
@@ -0,0 +1,77 @@
+"""Size-bounded transposition cache for agent decisions
+
+Agents that evaluate the same positions over and over (opening turns
+under common random numbers, rollouts from one root) can memoize their
+results under GameState.zobrist_hash(). Entries are evicted least
+recently used first once the cache is full. Only agents computing the
+same kind of value should share a cache; key on (hash, something) to
+keep several kinds apart.
+"""
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TranspositionCache:
+    """LRU map from position hashes to values, with hit statistics"""
+    def __init__(self, maxsize=100_000):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """The value stored under key, counting a hit or a miss"""
+        value = self._entries.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entry when full"""
+        entries = self._entries
+        entries[key] = value
+        entries.move_to_end(key)
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def lookup(self, key, compute):
+        """The value under key, calling compute() and storing its result on a miss"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
+
+    def clear(self):
+        """Drop every entry and reset the statistics"""
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
@@ -0,0 +1,409 @@
+"""Many games at once on stacked NumPy arrays
+
+BatchGame holds B independent games of the standard rules as arrays with
+a leading game axis: route owners, per-player color counts, trains,
+route points, held tickets and each game's deck permutation. Every step
+applies one action id (see actions.ActionSpace) per game with vectorized
+operations, so a population can be evaluated without a Python loop
+through execute_action per game.
+
+Differences from the object engine, all within the rules of the game:
+returned tickets go to the bottom of the ticket pile instead of being
+shuffled back in, and face-up slots left empty by an exhausted deck are
+not closed up, so face-up ids always name the same five slots.
+"""
+import time
+
+import numpy as np
+
+from ttr_ga.actions import (CLAIM, DRAW_BLIND, DRAW_FACE_UP, DRAW_FACE_UP_PAIR, DRAW_MIXED,
+                            DRAW_TICKETS, FACE_UP_SLOTS, TICKETS_DRAWN, action_space)
+from ttr_ga.board import RouteTable
+from ttr_ga.common import COLORS
+from ttr_ga.moves import WILD, requirements
+from ttr_ga.player import TICKETS, TRAIN_CARDS
+from ttr_ga.scoring import LONGEST_PATH_BONUS, ROUTE_POINTS, trail_cache
+
+TRAINS = 45
+HAND_SIZE = 4
+EMPTY = -1  # an empty face-up slot, or a pass in an action array
+
+_CARDS = np.array([COLORS.index(card) for card in TRAIN_CARDS], dtype=np.int8)
+_POINTS = np.array(ROUTE_POINTS, dtype=np.int16)
+
+
+class BatchGame:
+    """
+    B games with the same number of players, stepped together
+
+    Games that end (by the final round, max_turns or a full round of
+    passes) stop changing while the rest play on; done marks them. Seat s
+    of every game is the same agent, so per-seat policies and genomes can
+    be looked up with the current array.
+    """
+    def __init__(self, batch_size, players=2, table=None, seed=None, max_turns=500):
+        self.table = table if table is not None else RouteTable.standard()
+        self.space = action_space(self.table)
+        self.req = requirements(self.table)
+        self.rng = np.random.default_rng(seed)
+        self.size = batch_size
+        self.players = players
+        self.max_turns = max_turns
+
+        # Per claim id: route length, payment kind and the partner route that shadows it
+        space = self.space
+        route = space.claim_route
+        shadows = self.req.partner_first[route] & self.req.accepts[self.req.partner[route], space.claim_color]
+        self._claims = {
+            "length": self.req.length[route],
+            "gray": self.req.is_gray[route],
+            "wild": space.claim_color == WILD,
+            "shadow": np.where(shadows, self.req.partner[route], EMPTY),
+        }
+
+        n, p = batch_size, players
+        self._games = np.arange(n)
+        self.owner = np.full((n, len(self.table)), EMPTY, dtype=np.int8)
+        self.hands = np.zeros((n, p, len(COLORS)), dtype=np.int16)
+        self.trains = np.full((n, p), TRAINS, dtype=np.int16)
+        self.route_points = np.zeros((n, p), dtype=np.int16)
+
+        # Tickets: who holds each one and the draw order of those still in the pile
+        self.ticket_holder = np.full((n, len(TICKETS)), EMPTY, dtype=np.int8)
+        self.ticket_order = self.rng.random((n, len(TICKETS)))
+        city_index = self.table.city_index
+        self.ticket_cities = np.array([(city_index[c1], city_index[c2]) for c1, c2, _ in TICKETS],
+                                      dtype=np.intp)
+        self.ticket_values = np.array([value for _, _, value in TICKETS], dtype=np.int16)
+
+        # Train cards: a permutation per game drawn from the end, plus discard counts
+        self.pile = _CARDS[np.argsort(self.rng.random((n, len(_CARDS))), axis=1)]
+        self.top = np.full(n, len(_CARDS), dtype=np.int16)
+        self.discard = np.zeros((n, len(COLORS)), dtype=np.int16)
+        self.face_up = np.full((n, FACE_UP_SLOTS), EMPTY, dtype=np.int8)
+
+        self.current = np.zeros(n, dtype=np.intp)
+        self.turn = np.ones(n, dtype=np.int32)
+        self.trigger = np.full(n, EMPTY, dtype=np.int8)  # seat that started the final round
+        self.passes = np.zeros(n, dtype=np.int8)
+        self.finished = np.zeros(n, dtype=bool)
+        self.done = np.zeros(n, dtype=bool)
+
+        # Same order as Simulator.new_game: face-up cards, then each player's deal
+        games = self._games
+        for slot in range(FACE_UP_SLOTS):
+            self.face_up[:, slot] = self._draw(games)
+        self._check_wilds(games)
+        for seat in range(p):
+            seats = np.full(n, seat)
+            for _ in range(HAND_SIZE):
+                self._give(games, seats, self._draw(games))
+            self._draw_tickets(games, seats, np.full(n, (1 << TICKETS_DRAWN) - 1))
+
+    # Cards
+
+    def _draw(self, games):
+        """Top card of each game's deck (unique game indices), EMPTY where none is left"""
+        empty = self.top[games] == 0
+        if empty.any():
+            self._reshuffle(games[empty])
+        top = self.top[games]
+        has = top > 0
+        cards = np.full(len(games), EMPTY, dtype=np.int8)
+        cards[has] = self.pile[games[has], top[has] - 1]
+        self.top[games[has]] -= 1
+        return cards
+
+    def _reshuffle(self, games):
+        """Shuffle the discard pile back into the empty decks of games"""
+        counts = self.discard[games]
+        bounds = np.cumsum(counts, axis=1)
+        positions = np.arange(self.pile.shape[1])
+        cards = (bounds[:, :, None] <= positions).sum(axis=1)  # len(COLORS) past the last card
+        keys = self.rng.random(cards.shape)
+        keys[cards == len(COLORS)] = 2.0
+        order = np.argsort(keys, axis=1)
+        self.pile[games] = np.take_along_axis(cards, order, axis=1)
+        self.top[games] = bounds[:, -1]
+        self.discard[games] = 0
+
+    def _give(self, games, seats, cards):
+        has = cards != EMPTY
+        self.hands[games[has], seats[has], cards[has]] += 1
+
+    def _deck_has_cards(self, games):
+        return (self.top[games] > 0) | (self.discard[games].sum(axis=1) > 0)
+
+    def _check_wilds(self, games):
+        """Discard and redeal face-up layouts with 3+ wilds, where a better one is possible"""
+        while len(games):
+            face_up = self.face_up[games]
+            games = games[(face_up == WILD).sum(axis=1) >= 3]
+            if not len(games):
+                return
+            face_up = self.face_up[games]
+            in_pile = np.arange(self.pile.shape[1]) < self.top[games, None]
+            total = self.top[games] + self.discard[games].sum(axis=1) + (face_up != EMPTY).sum(axis=1)
+            wilds = (((self.pile[games] == WILD) & in_pile).sum(axis=1) + self.discard[games, WILD]
+                     + (face_up == WILD).sum(axis=1))
+            games = games[total - wilds >= np.minimum(5, total) - 2]
+            if not len(games):
+                return
+
+            for slot in range(FACE_UP_SLOTS):
+                cards = self.face_up[games, slot]
+                has = cards != EMPTY
+                self.discard[games[has], cards[has]] += 1
+            for slot in range(FACE_UP_SLOTS):
+                self.face_up[games, slot] = self._draw(games)
+
+    def _take_face_up(self, games, seats, slots):
+        """Move face-up cards to hands and refill their slots; returns the cards taken"""
+        cards = self.face_up[games, slots]
+        self._give(games, seats, cards)
+        self.face_up[games, slots] = self._draw(games)
+        self._check_wilds(games)
+        return cards
+
+    def _draw_tickets(self, games, seats, keep):
+        """Draw up to three tickets per game, keep the bitmask and put the rest at the bottom"""
+        order = np.where(self.ticket_holder[games] == EMPTY, self.ticket_order[games], np.inf)
+        drawn = np.argsort(order, axis=1)[:, :TICKETS_DRAWN]
+        available = np.isfinite(np.take_along_axis(order, drawn, axis=1))
+        bottom = order.max(axis=1, where=np.isfinite(order), initial=0.0) + 1
+        for i in range(TICKETS_DRAWN):
+            kept = available[:, i] & (keep >> i & 1).astype(bool)
+            self.ticket_holder[games[kept], drawn[kept, i]] = seats[kept]
+            returned = available[:, i] & ~kept
+            self.ticket_order[games[returned], drawn[returned, i]] = bottom[returned] + i
+
+    # Rules
+
+    def legal_mask(self):
+        """(B, actions) bool array of the current players' legal action ids, all False once done"""
+        space = self.space
+        req = self.req
+        n = self.size
+        games = self._games
+        seat = self.current
+        hands = self.hands[games, seat]
+        wilds = hands[:, WILD]
+        mask = np.zeros((n, space.size), dtype=bool)
+
+        # Claims, as moves.claim_mask for every game at once, one column per claim id
+        owner = self.owner
+        partner_owner = np.where(req.has_partner, owner[:, req.partner], EMPTY)
+        blocked = partner_owner == seat[:, None]
+        if self.players < 4:
+            blocked |= partner_owner != EMPTY
+        trains = self.trains[games, seat]
+        open_routes = (owner == EMPTY) & ~blocked & (req.length <= trains[:, None])
+
+        claims = self._claims
+        length = claims["length"]
+        color_cards = hands[:, space.claim_color]
+        pay = np.where(claims["wild"], wilds[:, None] >= length,
+                       (color_cards + wilds[:, None] >= length) & (~claims["gray"] | (color_cards > 0)))
+        legal = open_routes[:, space.claim_route] & pay
+        shadow = claims["shadow"]
+        legal[:, shadow >= 0] &= owner[:, shadow[shadow >= 0]] != EMPTY
+        mask[:, space.claim_ids] = legal
+
+        # Train card draws, as moves.draw_options with fixed slots
+        face_up = self.face_up
+        deck = self._deck_has_cards(games)
+        regular = (face_up != EMPTY) & (face_up != WILD)
+        mask[:, space.blind] = deck
+        mask[:, space.mixed:space.mixed + FACE_UP_SLOTS] = regular & deck[:, None]
+        mask[:, space.face_up:space.face_up + FACE_UP_SLOTS] = face_up == WILD
+        pairs = regular[:, :, None] & regular[:, None, :]
+        same = np.eye(FACE_UP_SLOTS, dtype=bool)
+        pairs[:, same] = regular & deck[:, None]  # the second pick is the refilled slot
+        mask[:, space.face_up_pair:space.face_up_pair + FACE_UP_SLOTS ** 2] = pairs.reshape(n, -1)
+
+        # Tickets: keep subsets may only name tickets that will be drawn
+        available = np.minimum(TICKETS_DRAWN, (self.ticket_holder == EMPTY).sum(axis=1))
+        subsets = np.arange(1, 1 << TICKETS_DRAWN)
+        mask[:, space.tickets:space.tickets + len(subsets)] = subsets < (1 << available)[:, None]
+
+        mask[self.done] = False
+        return mask
+
+    def step(self, actions):
+        """
+        Apply one action id per game, EMPTY to pass, then end the turn
+        Actions must be legal (see legal_mask); finished games are skipped.
+        """
+        actions = np.asarray(actions)
+        live = ~self.done
+        passed = live & (actions == EMPTY)
+        acting = np.flatnonzero(live & ~passed)
+        self.passes[passed] += 1
+        self.passes[acting] = 0
+
+        space = self.space
+        ids = actions[acting]
+        kinds = space.kind[ids]
+        arg0 = space.arg0[ids].astype(np.intp)
+        arg1 = space.arg1[ids].astype(np.intp)
+        for kind in np.unique(kinds):
+            sel = kinds == kind
+            games = acting[sel]
+            seats = self.current[games]
+            if kind == CLAIM:
+                self._claim(games, seats, arg0[sel], arg1[sel])
+            elif kind == DRAW_BLIND:
+                for _ in range(2):
+                    self._give(games, seats, self._draw(games))
+            elif kind == DRAW_MIXED:
+                self._give(games, seats, self._draw(games))
+                self._take_face_up(games, seats, arg0[sel])
+            elif kind == DRAW_FACE_UP:
+                self._take_face_up(games, seats, arg0[sel])
+            elif kind == DRAW_FACE_UP_PAIR:
+                self._take_face_up(games, seats, arg0[sel])
+                second = arg1[sel]
+                card = self.face_up[games, second]
+                ok = (card != EMPTY) & (card != WILD)
+                self._take_face_up(games[ok], seats[ok], second[ok])
+            elif kind == DRAW_TICKETS:
+                self._draw_tickets(games, seats, arg0[sel])
+
+        self._end_turn(np.flatnonzero(live))
+
+    def _claim(self, games, seats, routes, colors):
+        length = self.req.length[routes]
+        have = self.hands[games, seats, colors]
+        use_color = np.where(colors == WILD, 0, np.minimum(have, length))
+        use_wild = length - use_color
+        self.hands[games, seats, colors] -= use_color
+        self.hands[games, seats, WILD] -= use_wild
+        self.discard[games, colors] += use_color
+        self.discard[games, WILD] += use_wild
+        self.owner[games, routes] = seats
+        self.trains[games, seats] -= length
+        self.route_points[games, seats] += _POINTS[length]
+
+    def _end_turn(self, games):
+        """GameState.end_turn for each game, plus the max_turns and pass limits"""
+        seats = self.current[games]
+        over = (self.trigger[games] != EMPTY) & (self.trigger[games] == seats)
+        starts = (self.trigger[games] == EMPTY) & (self.trains[games, seats] <= 2)
+        self.trigger[games[starts]] = seats[starts]
+        self.finished[games[over]] = True
+
+        seats = (seats + 1) % self.players
+        self.current[games] = seats
+        self.turn[games] += seats == 0
+        self.done[games] = (over | (self.turn[games] > self.max_turns)
+                            | (self.passes[games] >= self.players))
+
+    # Scoring
+
+    def scores(self):
+        """
+        End-of-game scoring for every game, as scoring.score_game
+        Returns (B, players) arrays: route_points, ticket_points,
+        longest_trail, longest_bonus and total.
+        """
+        n, p = self.size, self.players
+        table = self.table
+        c1 = np.frombuffer(table.city1, dtype=np.int16).astype(np.intp)
+        c2 = np.frombuffer(table.city2, dtype=np.int16).astype(np.intp)
+        owned = self.owner[:, None, :] == np.arange(p)[None, :, None]
+
+        # Connected components by min-label propagation over each player's routes
+        cities = len(table.cities)
+        labels = np.broadcast_to(np.arange(cities), (n, p, cities)).copy()
+        while True:
+            low = np.where(owned, np.minimum(labels[:, :, c1], labels[:, :, c2]), cities)
+            merged = labels.copy()
+            rows = np.arange(n * p)[:, None]
+            flat = merged.reshape(n * p, cities)
+            np.minimum.at(flat, (rows, c1[None, :]), low.reshape(n * p, -1))
+            np.minimum.at(flat, (rows, c2[None, :]), low.reshape(n * p, -1))
+            merged = np.take_along_axis(merged, merged, axis=2)
+            if np.array_equal(merged, labels):
+                break
+            labels = merged
+
+        t1, t2 = self.ticket_cities[:, 0], self.ticket_cities[:, 1]
+        connected = labels[:, :, t1] == labels[:, :, t2]
+        held = self.ticket_holder[:, None, :] == np.arange(p)[None, :, None]
+        ticket_points = (np.where(connected, 1, -1) * self.ticket_values * held).sum(axis=2)
+
+        cache = trail_cache(table)
+        bits = np.packbits(owned, axis=2, bitorder='little')
+        trails = np.array([[cache.longest(int.from_bytes(bits[g, s].tobytes(), 'little'))
+                            for s in range(p)] for g in range(n)], dtype=np.int16).reshape(n, p)
+        longest = trails.max(axis=1, keepdims=True)
+        bonus = np.where((trails == longest) & (longest > 0), LONGEST_PATH_BONUS, 0)
+
+        return {
+            "route_points": self.route_points.astype(np.int32),
+            "ticket_points": ticket_points.astype(np.int32),
+            "longest_trail": trails.astype(np.int32),
+            "longest_bonus": bonus.astype(np.int32),
+            "total": self.route_points + ticket_points + bonus,
+        }
+
+    def play(self, policy):
+        """
+        Step every game to the end with policy(game, mask) -> action ids
+        A row of mask with no legal action must get EMPTY (a pass).
+        Returns scores().
+        """
+        while not self.done.all():
+            self.step(policy(self, self.legal_mask()))
+        return self.scores()
+
+
+def random_policy(seed=None):
+    """A policy picking uniformly among each game's legal action ids"""
+    rng = np.random.default_rng(seed)
+
+    def policy(game, mask):
+        keys = rng.random(mask.shape, dtype=np.float32)
+        keys[~mask] = -1.0
+        actions = keys.argmax(axis=1)
+        actions[~mask.any(axis=1)] = EMPTY
+        return actions
+    return policy
+
+
+def score_policy(preferences):
+    """
+    A policy playing the legal id with the highest preference
+    preferences is (players, actions), one row per seat, or
+    (B, players, actions) for a different line-up in every game.
+    """
+    preferences = np.asarray(preferences, dtype=np.float32)
+
+    def policy(game, mask):
+        if preferences.ndim == 2:
+            scores = preferences[game.current]
+        else:
+            scores = preferences[game._games, game.current]
+        actions = np.where(mask, scores, -np.inf).argmax(axis=1)
+        actions[~mask.any(axis=1)] = EMPTY
+        return actions
+    return policy
+
+
+def play_batch(batch_size, policy, players=2, seed=None, max_turns=500):
+    """
+    Play batch_size games with one policy
+    Returns the scores() dict plus turns, finished, seconds and
+    games_per_second.
+    """
+    start = time.perf_counter()
+    game = BatchGame(batch_size, players=players, seed=seed, max_turns=max_turns)
+    result = game.play(policy)
+    elapsed = time.perf_counter() - start
+    result.update({
+        "turns": game.turn.copy(),
+        "finished": game.finished.copy(),
+        "seconds": elapsed,
+        "games_per_second": batch_size / elapsed if elapsed > 0 else float("inf"),
+    })
+    return result
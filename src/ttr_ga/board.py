@@ -1,10 +1,105 @@
+from array import array
+
 import networkx as nx
-from ttr_ga.common import CITIES, ROUTES
+from ttr_ga.common import CITIES, COLORS, GRAY_COLORS, ROUTES
+from ttr_ga.events import emit, print_sink
+
+_COLOR_IDS = {color: i for i, color in enumerate(COLORS)}
+_WILD_ID = _COLOR_IDS['wild']
+
+
+def select_cards(hand, route_color, route_length, card_color):
+    """
+    Pick the cards from a hand that pay for a route
+    Returns (can_claim, cards_to_use)
+
+    Gray routes take any single color; if no specific color is requested the
+    color with the most cards is used, falling back to topping up with wilds.
+    """
+    cards_to_use = []
+
+    if route_color in GRAY_COLORS:
+        # Paying with wilds only
+        if card_color == 'wild':
+            if hand.count('wild') >= route_length:
+                return True, ['wild'] * route_length
+            return False, []
+
+        # A specific color was requested
+        if card_color is not None and card_color not in GRAY_COLORS:
+            color_count = hand.count(card_color)
+            wild_count = hand.count('wild')
+
+            if color_count + wild_count >= route_length:
+                cards_to_use = [card_color] * min(color_count, route_length)
+                cards_to_use.extend(['wild'] * (route_length - len(cards_to_use)))
+                return True, cards_to_use
+            return False, []
+
+        # Count cards by color
+        color_counts = {}
+        for card in hand:
+            if card != 'wild':
+                color_counts[card] = color_counts.get(card, 0) + 1
+
+        # Find the color with most cards (at least route_length)
+        best_color = None
+        best_count = 0
+
+        for c, count in color_counts.items():
+            if count >= route_length and count > best_count:
+                best_color = c
+                best_count = count
+
+        if best_color:
+            cards_to_use = [best_color] * route_length
+            return True, cards_to_use
+
+        # If no color has enough cards, check with wilds
+        wild_count = hand.count('wild')
+
+        for c, count in color_counts.items():
+            if count + wild_count >= route_length:
+                # Use as many regular cards as possible, then fill with wilds
+                cards_to_use = [c] * min(count, route_length)
+                wilds_needed = route_length - len(cards_to_use)
+                cards_to_use.extend(['wild'] * wilds_needed)
+                return True, cards_to_use
+
+        return False, []
+
+    # Colored routes
+    if card_color == route_color:
+        color_count = hand.count(card_color)
+        wild_count = hand.count('wild')
+
+        if color_count + wild_count >= route_length:
+            # Use as many regular cards as possible, then fill with wilds
+            cards_to_use = [card_color] * min(color_count, route_length)
+            wilds_needed = route_length - len(cards_to_use)
+            cards_to_use.extend(['wild'] * wilds_needed)
+            return True, cards_to_use
+
+    return False, []
+
+
+def _color_matches(route_color, card_color):
+    """Whether cards of card_color may be played on a route of route_color"""
+    return card_color is None or route_color in GRAY_COLORS or card_color == route_color
+
 
 class Board:
-    def __init__(self):
+    def __init__(self, sink=print_sink):
         self.graph = nx.MultiGraph()  # Use MultiGraph to handle double routes
         self.double_routes = []
+        self.sink = sink  # where claim messages go, None for silence
+
+    def copy(self):
+        """Copy the board; edge attribute dicts are copied, not shared"""
+        board = Board(self.sink)
+        board.graph = self.graph.copy()
+        board.double_routes = list(self.double_routes)
+        return board
 
     def add_city(self, city):
         self.graph.add_node(city)
@@ -17,9 +112,9 @@ class Board:
             self.graph.add_edge(city1, city2, length=length, color=color)
     
     @classmethod
-    def create_standard_board(cls):
+    def create_standard_board(cls, sink=print_sink):
         """Create a standard Ticket to Ride USA board"""
-        board = cls()
+        board = cls(sink)
         
         for city in CITIES:
             board.add_city(city)
@@ -32,18 +127,31 @@ class Board:
     def is_double_route(self, city1, city2):
         return (city1, city2) in self.double_routes or (city2, city1) in self.double_routes
 
-    def claim_route(self, player, city1, city2, color=None, player_count=None):
+    def claimed_routes(self, name):
+        """Yield (city1, city2, length) for every route claimed by a player"""
+        for u, v, data in self.graph.edges(data=True):
+            if data.get('claimed') == name:
+                yield u, v, data['length']
+
+    def unclaimed_routes(self):
+        """Yield (city1, city2, length, color) for every unclaimed route"""
+        for u, v, data in self.graph.edges(data=True):
+            if 'claimed' not in data:
+                yield u, v, data['length'], data['color']
+
+    def claim_route(self, player, city1, city2, color=None, player_count=None, deck=None):
         """
         Attempt to claim a route between two cities
         Returns True if successful, False otherwise
         
         For 2-3 player games, only one of the double routes can be claimed.
         For 4+ player games, a single player cannot claim both routes of a double route.
+        The cards spent go to the deck's discard pile when a deck is given.
         """
         # Find the edge between the cities
         edge_data = self.graph.get_edge_data(city1, city2)
         if not edge_data:
-            print(f"No route exists between {city1} and {city2}")
+            emit(self.sink, "claim_failed", f"No route exists between {city1} and {city2}")
             return False
             
         # Check if any route is already claimed by this player
@@ -51,7 +159,7 @@ class Board:
                                     for key, route in edge_data.items())
         
         if player_already_claimed:
-            print(f"{player.name} has already claimed a route between {city1} and {city2}")
+            emit(self.sink, "claim_failed", f"{player.name} has already claimed a route between {city1} and {city2}")
             return False
         
         # For 2-3 player games, check if any route is claimed by any player
@@ -65,10 +173,18 @@ class Board:
                 route_color = route['color']
                 route_length = route['length']
                 
+                # Skip the parallel route of another color
+                if not _color_matches(route_color, color):
+                    continue
+                
                 # If color wasn't specified, use the route's color
                 if color is None:
                     color = route_color
                 
+                if player.trains < route_length:
+                    emit(self.sink, "claim_failed", "Not enough trains to claim this route")
+                    return False
+                
                 # Check if player has required cards for this route
                 can_claim, cards_to_use = self._player_can_claim_route(player, route_color, route_length, color)
                 
@@ -76,6 +192,8 @@ class Board:
                     # Remove cards from player's hand
                     for card in cards_to_use:
                         player.hand.remove(card)
+                    if deck is not None:
+                        deck.discard(cards_to_use)
                     
                     # Update player stats
                     player.trains -= route_length
@@ -83,19 +201,21 @@ class Board:
                     
                     # Mark route as claimed
                     route['claimed'] = player.name
-                    print(f"{player.name} claimed route from {city1} to {city2}")
+                    player.connections.union(city1, city2)
+                    emit(self.sink, "claim", f"{player.name} claimed route from {city1} to {city2}",
+                         player=player.name, city1=city1, city2=city2, length=route_length)
                     
                     # Check for final round trigger
                     if player.trains <= 2:
-                        print(f"{player.name} has {player.trains} trains left! Final round begins!")
+                        emit(self.sink, "final_round", f"{player.name} has {player.trains} trains left! Final round begins!")
                         return True, "final_round"
                     
                     return True
                 else:
-                    print(f"Not enough cards to claim this route")
+                    emit(self.sink, "claim_failed", "Not enough cards to claim this route")
                     return False
         
-        print(f"All routes between {city1} and {city2} are already claimed")
+        emit(self.sink, "claim_failed", f"All routes between {city1} and {city2} are already claimed")
         return False
 
     def _player_can_claim_route(self, player, route_color, route_length, card_color):
@@ -103,57 +223,11 @@ class Board:
         Check if the player has the required cards to claim a route
         Returns (can_claim, cards_to_use)
         """
-        cards_to_use = []
-        
-        # Gray routes can be claimed with any single color
-        if route_color == 'gray':
-            # Count cards by color
-            color_counts = {}
-            for card in player.hand:
-                if card != 'wild':
-                    color_counts[card] = color_counts.get(card, 0) + 1
-            
-            # Find the color with most cards (at least route_length)
-            best_color = None
-            best_count = 0
-            
-            for c, count in color_counts.items():
-                if count >= route_length and count > best_count:
-                    best_color = c
-                    best_count = count
-            
-            if best_color:
-                cards_to_use = [best_color] * route_length
-                return True, cards_to_use
-            
-            # If no color has enough cards, check with wilds
-            wild_count = player.hand.count('wild')
-            
-            for c, count in color_counts.items():
-                if count + wild_count >= route_length:
-                    # Use as many regular cards as possible, then fill with wilds
-                    cards_to_use = [c] * min(count, route_length)
-                    wilds_needed = route_length - len(cards_to_use)
-                    cards_to_use.extend(['wild'] * wilds_needed)
-                    return True, cards_to_use
-            
-            return False, []
-        
-        # Colored routes
-        else:
-            # Using specified color
-            if card_color == route_color or route_color == 'gray':
-                color_count = player.hand.count(card_color)
-                wild_count = player.hand.count('wild')
-                
-                if color_count + wild_count >= route_length:
-                    # Use as many regular cards as possible, then fill with wilds
-                    cards_to_use = [card_color] * min(color_count, route_length)
-                    wilds_needed = route_length - len(cards_to_use)
-                    cards_to_use.extend(['wild'] * wilds_needed)
-                    return True, cards_to_use
-            
-            return False, []
+        return select_cards(player.hand, route_color, route_length, card_color)
+
+    def to_networkx(self):
+        """The board's networkx MultiGraph itself, for code shared with CompactBoard"""
+        return self.graph
 
     def display(self):
         print("Cities:", self.graph.nodes)
@@ -162,3 +236,377 @@ class Board:
             print(f"{u} - {v}: {data}")
 
 
+
+
+class RouteTable:
+    """
+    Static, integer-indexed description of a board
+
+    Cities and routes are numbered once and their attributes are stored in
+    fixed columns, so boards built from the same table share them and only
+    have to track route ownership.
+    """
+    GRAY = -1  # color id of routes that accept any single color
+
+    def __init__(self, cities, routes):
+        self.cities = list(cities)
+        self.city_index = {city: i for i, city in enumerate(self.cities)}
+
+        self.city1 = array('h')
+        self.city2 = array('h')
+        self.length = array('b')
+        self.color = array('b')      # index into COLORS, GRAY for gray routes
+        self.is_double = array('b')
+        self.partner = array('h')    # id of the parallel route, -1 if none
+        self.color_names = []        # route colors as given in the route list
+        self.pair_routes = {}        # (city1, city2) -> route ids, both orders
+        self.trail_cache = None      # scoring.TrailCache, created on first use
+        self.requirements = None     # moves.RouteRequirements, created on first use
+        self.action_space = None     # actions.ActionSpace, created on first use
+        self.zobrist = None          # zobrist.ZobristKeys, created on first use
+
+        for route_id, route in enumerate(routes):
+            city1, city2, length, color = route[:4]
+            is_double = route[4] if len(route) > 4 else False
+
+            for city in (city1, city2):
+                if city not in self.city_index:
+                    self.city_index[city] = len(self.cities)
+                    self.cities.append(city)
+
+            self.city1.append(self.city_index[city1])
+            self.city2.append(self.city_index[city2])
+            self.length.append(length)
+            self.color.append(self.GRAY if color in GRAY_COLORS else COLORS.index(color))
+            self.is_double.append(bool(is_double))
+            self.partner.append(-1)
+            self.color_names.append(color)
+
+            parallel = self.pair_routes.get((city1, city2), ())
+            for other in parallel:
+                self.partner[other] = route_id
+                self.partner[route_id] = other
+            self.pair_routes[(city1, city2)] = parallel + (route_id,)
+            self.pair_routes[(city2, city1)] = parallel + (route_id,)
+
+    # Derived structures built on demand; they are dropped when pickling so
+    # copies sent to other processes never hold stale or missing ones
+    _LAZY = ("trail_cache", "requirements", "action_space", "zobrist")
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in self._LAZY:
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        for name in self._LAZY:
+            setattr(self, name, None)
+
+    def __len__(self):
+        return len(self.length)
+
+    def endpoints(self, route_id):
+        """Return the city names of a route"""
+        return self.cities[self.city1[route_id]], self.cities[self.city2[route_id]]
+
+    @classmethod
+    def standard(cls):
+        """The table for the standard USA board, compiled once per process"""
+        global _STANDARD_TABLE
+        if _STANDARD_TABLE is None:
+            from ttr_ga.maps import load_map  # maps builds RouteTables
+            _STANDARD_TABLE = load_map("usa").table
+        return _STANDARD_TABLE
+
+
+_STANDARD_TABLE = None
+
+
+class CompactBoard:
+    """
+    Array-backed board for simulation
+
+    Mirrors Board.claim_route and Board.is_double_route, but keeps route
+    ownership in a single array indexed by route id instead of per-edge
+    dicts on a networkx graph. Owners are stored as seat numbers, assigned
+    to player names in the order they first claim a route.
+    """
+    UNCLAIMED = -1
+
+    def __init__(self, table=None, sink=print_sink):
+        self.table = table if table is not None else RouteTable.standard()
+        self.owner = array('b', [self.UNCLAIMED]) * len(self.table)
+        self.seats = {}   # player name -> seat
+        self.names = []   # seat -> player name
+        self.sink = sink
+
+    @classmethod
+    def create_standard_board(cls, sink=print_sink):
+        """Create a standard Ticket to Ride USA board"""
+        return cls(sink=sink)
+
+    @classmethod
+    def from_board(cls, board, table=None):
+        """
+        Build a compact copy of a networkx Board, including claimed routes
+        With a table the claims are put on its routes instead, matched by
+        city pair and color, so the table's action ids apply to the copy.
+        """
+        if table is not None:
+            compact = cls(table, board.sink)
+            for u, v, data in board.graph.edges(data=True):
+                name = data.get('claimed')
+                if name is None:
+                    continue
+                free = [route_id for route_id in table.pair_routes.get((u, v), ())
+                        if compact.owner[route_id] == cls.UNCLAIMED]
+                same_color = [route_id for route_id in free if table.color_names[route_id] == data['color']]
+                if same_color or free:
+                    compact.owner[(same_color or free)[0]] = compact.seat(name)
+            return compact
+
+        routes = []
+        claims = []
+        for u, v, data in board.graph.edges(data=True):
+            routes.append((u, v, data['length'], data['color'], board.is_double_route(u, v)))
+            claims.append(data.get('claimed'))
+
+        compact = cls(RouteTable(board.graph.nodes, routes), board.sink)
+        for route_id, name in enumerate(claims):
+            if name is not None:
+                compact.owner[route_id] = compact.seat(name)
+        return compact
+
+    def copy(self):
+        """Copy the ownership state; the static route table is shared"""
+        board = CompactBoard.__new__(CompactBoard)
+        board.table = self.table
+        board.owner = self.owner[:]
+        board.seats = dict(self.seats)
+        board.names = list(self.names)
+        board.sink = self.sink
+        return board
+
+    def seat(self, name):
+        """Return the seat number for a player name, assigning one if needed"""
+        seat = self.seats.get(name)
+        if seat is None:
+            seat = len(self.names)
+            self.seats[name] = seat
+            self.names.append(name)
+        return seat
+
+    def claimed_by(self, route_id):
+        """Return the name of the player owning a route, or None"""
+        seat = self.owner[route_id]
+        return None if seat == self.UNCLAIMED else self.names[seat]
+
+    def routes_of(self, name):
+        """Return the ids of all routes claimed by a player"""
+        seat = self.seats.get(name)
+        if seat is None:
+            return []
+        return [route_id for route_id, owner in enumerate(self.owner) if owner == seat]
+
+    def route_mask(self, name):
+        """Bitmask of the routes claimed by a player, bit i for route i"""
+        mask = 0
+        for route_id in self.routes_of(name):
+            mask |= 1 << route_id
+        return mask
+
+    def claimed_routes(self, name):
+        """Yield (city1, city2, length) for every route claimed by a player"""
+        table = self.table
+        for route_id in self.routes_of(name):
+            city1, city2 = table.endpoints(route_id)
+            yield city1, city2, table.length[route_id]
+
+    def unclaimed_routes(self):
+        """Yield (city1, city2, length, color) for every unclaimed route"""
+        table = self.table
+        for route_id, owner in enumerate(self.owner):
+            if owner == self.UNCLAIMED:
+                city1, city2 = table.endpoints(route_id)
+                yield city1, city2, table.length[route_id], table.color_names[route_id]
+
+    def is_double_route(self, city1, city2):
+        for route_id in self.table.pair_routes.get((city1, city2), ()):
+            if self.table.is_double[route_id]:
+                return True
+        return False
+
+    def claim_route(self, player, city1, city2, color=None, player_count=None, deck=None):
+        """
+        Attempt to claim a route between two cities
+        Returns True if successful, False otherwise
+
+        Same rules as Board.claim_route. The route and the cards are picked
+        by name, then paid for as in claim_route_id.
+        """
+        table = self.table
+        route_ids = table.pair_routes.get((city1, city2))
+        if not route_ids:
+            emit(self.sink, "claim_failed", f"No route exists between {city1} and {city2}")
+            return False
+
+        owner = self.owner
+        seat = self.seats.get(player.name)
+        unclaimed = self.UNCLAIMED
+        claimed_any = False
+        for route_id in route_ids:
+            if owner[route_id] != unclaimed:
+                claimed_any = True
+
+                # Check if any route is already claimed by this player
+                if owner[route_id] == seat:
+                    emit(self.sink, "claim_failed", f"{player.name} has already claimed a route between {city1} and {city2}")
+                    return False
+
+        # For 2-3 player games, check if any route is claimed by any player
+        double_route_blocked = bool(player_count) and player_count < 4 and claimed_any
+
+        # Find an unclaimed route
+        for route_id in route_ids:
+            if owner[route_id] == unclaimed and not double_route_blocked:
+                route_color = table.color_names[route_id]
+
+                # Skip the parallel route of another color
+                if not _color_matches(route_color, color):
+                    continue
+
+                # If color wasn't specified, use the route's color
+                if color is None:
+                    color = route_color
+
+                if color not in GRAY_COLORS:
+                    # A color no card has can only be paid for in wilds
+                    return self._pay(player, route_id, _COLOR_IDS.get(color, _WILD_ID), deck)
+
+                # Gray route and no color given: pay with the color select_cards picks
+                if player.trains < table.length[route_id]:
+                    emit(self.sink, "claim_failed", "Not enough trains to claim this route")
+                    return False
+                can_claim, cards_to_use = select_cards(player.hand, route_color, table.length[route_id], color)
+                if not can_claim:
+                    emit(self.sink, "claim_failed", "Not enough cards to claim this route")
+                    return False
+                return self._pay(player, route_id, _COLOR_IDS[cards_to_use[0]], deck)
+
+        emit(self.sink, "claim_failed", f"All routes between {city1} and {city2} are already claimed")
+        return False
+
+    def claim_route_id(self, player, route_id, color_id, player_count=None, deck=None):
+        """
+        Attempt to claim a route by id, paying with cards of COLORS[color_id]
+        Returns True if successful, False otherwise
+
+        Same rules and results as claim_route for the route and color, but
+        works on the table's integer columns: no city names are looked up
+        and the cards are counted per color instead of being selected.
+        Wilds top up a color; color_id of 'wild' pays with wilds alone.
+        """
+        table = self.table
+        owner = self.owner
+        unclaimed = self.UNCLAIMED
+        if owner[route_id] != unclaimed:
+            self._claim_failed("All routes between {} and {} are already claimed", route_id)
+            return False
+
+        partner = table.partner[route_id]
+        if partner >= 0 and owner[partner] != unclaimed:
+            # Never both halves of a double route, and only one half with 2-3 players
+            if owner[partner] == self.seats.get(player.name):
+                self._claim_failed(f"{player.name} has already claimed a route between {{}} and {{}}", route_id)
+                return False
+            if player_count and player_count < 4:
+                self._claim_failed("All routes between {} and {} are already claimed", route_id)
+                return False
+
+        route_color = table.color[route_id]
+        if route_color != table.GRAY and color_id != route_color:
+            self._claim_failed(f"The route between {{}} and {{}} does not take {COLORS[color_id]} cards", route_id)
+            return False
+        return self._pay(player, route_id, color_id, deck)
+
+    def _pay(self, player, route_id, color_id, deck):
+        """Pay for a free route with as many cards of a color as possible plus wilds, and claim it"""
+        table = self.table
+        length = table.length[route_id]
+        if player.trains < length:
+            emit(self.sink, "claim_failed", "Not enough trains to claim this route")
+            return False
+
+        # Card counts: as many cards of the color as will pay, the rest in wilds
+        hand = player.hand
+        if color_id == _WILD_ID:
+            plain = 0
+        else:
+            card = COLORS[color_id]
+            plain = hand.count(card)
+            if plain > length:
+                plain = length
+        wilds = length - plain
+        if wilds and hand.count('wild') < wilds:
+            emit(self.sink, "claim_failed", "Not enough cards to claim this route")
+            return False
+
+        for _ in range(plain):
+            hand.remove(card)
+        for _ in range(wilds):
+            hand.remove('wild')
+        if deck is not None:
+            deck.discard_counts(color_id, plain, wilds)
+
+        # Update player stats
+        player.trains -= length
+        player.score += player.calculate_route_score(length)
+
+        # Mark route as claimed
+        self.owner[route_id] = self.seat(player.name)
+        cities = table.cities
+        city1 = cities[table.city1[route_id]]
+        city2 = cities[table.city2[route_id]]
+        player.connections.union(city1, city2)
+        sink = self.sink
+        if sink is not None:
+            sink("claim", f"{player.name} claimed route from {city1} to {city2}",
+                 player=player.name, city1=city1, city2=city2, length=length)
+
+        # Check for final round trigger
+        if player.trains <= 2:
+            emit(sink, "final_round", f"{player.name} has {player.trains} trains left! Final round begins!")
+            return True, "final_round"
+        return True
+
+    def _claim_failed(self, message, route_id):
+        """Report a failed claim, message having {} for the two city names"""
+        if self.sink is not None:
+            emit(self.sink, "claim_failed", message.format(*self.table.endpoints(route_id)))
+
+    def to_networkx(self):
+        """
+        Build a networkx MultiGraph view of the board, laid out like Board.graph
+        Built anew on every call, so keep it off hot paths; changes to it do
+        not affect the board.
+        """
+        graph = nx.MultiGraph()
+        graph.add_nodes_from(self.table.cities)
+        for route_id in range(len(self.table)):
+            city1, city2 = self.table.endpoints(route_id)
+            data = {'length': self.table.length[route_id], 'color': self.table.color_names[route_id]}
+            name = self.claimed_by(route_id)
+            if name is not None:
+                data['claimed'] = name
+            graph.add_edge(city1, city2, **data)
+        return graph
+
+    def display(self):
+        print("Cities:", self.table.cities)
+        print("Routes:")
+        for route_id in range(len(self.table)):
+            city1, city2 = self.table.endpoints(route_id)
+            print(f"{city1} - {city2}: {self.table.color_names[route_id]}, "
+                  f"{self.table.length[route_id]}, claimed by {self.claimed_by(route_id)}")
@@ -0,0 +1,29 @@
+"""Event sinks for reporting game progress
+
+Engine components take an optional sink instead of calling print(), so
+AI-only games can run without any console I/O. A sink is any callable
+taking (kind, message, **data); None disables reporting altogether.
+"""
+
+
+def print_sink(kind, message, **data):
+    """Default sink for interactive games: print the message"""
+    print(message)
+
+
+def emit(sink, kind, message, **data):
+    """Send an event to a sink, if there is one"""
+    if sink is not None:
+        sink(kind, message, **data)
+
+
+class EventLog:
+    """Sink that keeps events in memory, e.g. for tests or replays"""
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, kind, message, **data):
+        self.events.append((kind, message, data))
+
+    def kinds(self):
+        return [kind for kind, _, _ in self.events]
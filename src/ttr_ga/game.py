@@ -1,224 +1,192 @@
 from ttr_ga.common import CITIES, ROUTES, COLORS
 from ttr_ga.board import Board
+from ttr_ga.events import emit, print_sink
 from ttr_ga.player import HumanPlayer, Player, Deck
-import networkx as nx
-import random
+from ttr_ga.scoring import CityUnionFind, longest_trail, score_game, trail_cache
 
+from ttr_ga.utils.profiling import timed
 from ttr_ga.utils.state import GameState
 
-def setup_game(players, deck):
+def setup_game(players, deck, sink=print_sink):
     for player in players:
         player.draw_initial_cards(deck)
         player.draw_ticket_cards(deck)
 
-    print("Initial face-up train cards:", deck.face_up_cards)
+    emit(sink, "setup", f"Initial face-up train cards: {deck.face_up_cards}")
     
 
-def game_loop(players, board, deck):
-    """Main game loop using GameState for tracking"""
-    # Initialize game state
-    game_state = GameState(board, players, 0, deck)
-    turn_number = 1
+def game_loop(players, board, deck, sink=print_sink, instruments=None):
+    """
+    Main game loop using GameState for tracking
+    An utils.profiling.Instrumentation passed as instruments collects the
+    time spent per phase and counts deck reshuffles; the deck gets its own
+    sink back when the game ends.
+    """
+    # Deck events are counted through the deck's sink for the length of the game
+    deck_sink = deck.sink
+    if instruments is not None:
+        deck.sink = instruments.sink(deck_sink)
+    try:
+        # Initialize game state
+        game_state = GameState(board, players, 0, deck, sink)
     
-    while not game_state.game_over:
-        current_player_idx = game_state.current_player_idx
-        current_player = players[current_player_idx]
+        while not game_state.game_over:
+            current_player_idx = game_state.current_player_idx
+            current_player = players[current_player_idx]
         
-        print(f"\nTurn {turn_number}: {current_player.name}'s turn:")
+            emit(sink, "turn", f"\nTurn {game_state.turn}: {current_player.name}'s turn:")
                 
-        # Get action from player (human or AI)
-        action = current_player.choose_action(game_state)
+            # Get action from player (human or AI) and execute it
+            if instruments is None:
+                action = current_player.choose_action(game_state)
+                execute_action(current_player, action, game_state)
+            else:
+                action = instruments.call("choose_action", current_player.choose_action, game_state)
+                instruments.call("execute_action", execute_action, current_player, action, game_state)
         
-        # Execute the action
-        result = execute_action(current_player, action, game_state)
+            # Display game state
+            emit(sink, "hand", f"{current_player.name} hand: {current_player.hand}")
+            emit(sink, "face_up", f"Face-up cards: {deck.face_up_cards}")
         
-        # Check for final round trigger
-        if isinstance(result, tuple) and result[1] == "final_round":
-            game_state.final_round = True
-            game_state.final_round_trigger_player = current_player_idx
-        
-        # Display game state
-        print(current_player.name, "hand:", current_player.hand)
-        print("Face-up cards:", deck.face_up_cards)
-        
-        # Check for game end conditions
-        if current_player.trains <= 2:
-            print(f"{current_player.name} has used all trains! Game entering final round.")
-            game_state.final_round = True
-            game_state.final_round_trigger_player = current_player_idx
-        
-        # Final round logic - game ends when we get back to the player who triggered it
-        if game_state.final_round and game_state.current_player_idx == game_state.final_round_trigger_player:
-            game_state.game_over = True
-        
-        # Move to next player
-        game_state.current_player_idx = (current_player_idx + 1) % len(players)
-
-        # Increment turn number if we've looped through all players
-        if game_state.current_player_idx == 0:
-            turn_number += 1
+            # Final round logic and move to next player
+            game_state.end_turn()
     
-    print("\nGame over! Calculating final scores...")
-    
-    # Calculate final scores
-    for player in players:
-        # Get points for completed tickets
-        ticket_score = check_tickets(player, board)
-        print(f"{player.name} completed tickets: {ticket_score} points")
-        
-        # Get points for longest path
-        longest_path_score = longest_continuous_path(player, board)
-        print(f"{player.name} longest path: {longest_path_score} points")
+        emit(sink, "game_over", "\nGame over! Calculating final scores...")
+        return final_scoring(players, board, sink, instruments)
+    finally:
+        deck.sink = deck_sink
+
+
+def final_scoring(players, board, sink=print_sink, instruments=None):
+    """
+    Add ticket points and the longest path bonus to every player
+    Returns the per-player breakdown from scoring.score_game.
+    """
+    with timed(instruments, "final_scoring"):
+        breakdown = score_game(players, board, instruments)
+
+    for player, result in zip(players, breakdown):
+        emit(sink, "score", f"{player.name} completed tickets: {result['ticket_points']} points")
+        emit(sink, "score", f"{player.name} longest path: {result['longest_trail']} trains"
+                            f" (+{result['longest_bonus']} points)")
         
         # Update final score
-        player.score += ticket_score + longest_path_score
-        print(f"{player.name}'s final score: {player.score}")
+        player.score = result["total"]
+        emit(sink, "score", f"{player.name}'s final score: {player.score}")
     
     # Determine winner
     winner = max(players, key=lambda p: p.score)
-    print(f"\n{winner.name} wins with {winner.score} points!")
+    emit(sink, "winner", f"\n{winner.name} wins with {winner.score} points!")
+    return breakdown
 
 
 def check_tickets(player, board):
-    score = 0
-    for (city1, city2, points) in player.tickets:
-        if nx.has_path(board.graph, city1, city2):
-            score += points
-        else:
-            score -= points
-    return score
+    """
+    Score a player's tickets against the routes they have claimed
+    Connectivity only counts the player's own routes, not the whole board.
+    """
+    network = CityUnionFind.from_routes(board.claimed_routes(player.name))
+    return network.ticket_score(player.tickets)
 
-# TODO: resolve placeholder for longest cont path
 def longest_continuous_path(player, board):
-    """Calculate the longest continuous path for a player"""
-    # Create a subgraph containing only this player's claimed routes
-    player_graph = nx.Graph()
-    
-    for u, v, data in board.graph.edges(data=True):
-        if 'claimed' in data and data['claimed'] == player.name:
-            player_graph.add_edge(u, v)
-    
-    if not player_graph.nodes():
-        return 0  # No routes claimed
-    
-    # Find all simple paths between all pairs of nodes
-    max_length = 0
-    
-    # This is a brute-force approach and could be optimized
-    for source in player_graph.nodes():
-        for target in player_graph.nodes():
-            if source != target:
-                try:
-                    paths = list(nx.all_simple_paths(player_graph, source, target))
-                    for path in paths:
-                        path_length = len(path) - 1  # Number of edges in path
-                        max_length = max(max_length, path_length)
-                except nx.NetworkXNoPath:
-                    continue
-    
-    # Calculate bonus points (10 for the longest path in the game)
-    # This is a placeholder - in a real game, you'd compare across all players
-    return max_length + (10 if max_length > 0 else 0)
+    """
+    Length in trains of a player's longest continuous path
+    The bonus depends on every player's path, see scoring.score_game. On a
+    CompactBoard the result is cached on the route table by route bitmask.
+    """
+    if hasattr(board, 'route_mask'):
+        return trail_cache(board.table).longest(board.route_mask(player.name))
+    return longest_trail(list(board.claimed_routes(player.name)))
 
 def execute_action(player, action, game_state):
-    """Execute a player's action and update the game state"""
+    """
+    Execute a player's action and update the game state
+
+    Face-up draws take their card choices from action["face_up_indices"];
+    when those are missing the player is asked via choose_face_up_card.
+    Integer action ids are run through actions.execute_action_id.
+    """
+    game_state._zobrist = None  # the position changes, see GameState.zobrist_hash
+    if not isinstance(action, dict):
+        from ttr_ga.actions import execute_action_id
+        return execute_action_id(player, action, game_state)
+
     action_type = action["action_type"]
+    deck = game_state.deck
+    sink = game_state.sink
     
     if action_type == "draw_train_cards":
+        face_up = action.get("face_up_indices", ())
+
         if action["method"] == "blind":
             # Draw blind cards
             for _ in range(action["count"]):
-                if game_state.deck.train_cards:
-                    player.hand.append(game_state.deck.draw_train_card())
+                if deck.train_cards_left:
+                    player.hand.append(deck.draw_train_card())
         
         elif action["method"] == "mixed":
             # First draw blind card
-            if game_state.deck.train_cards:
-                player.hand.append(game_state.deck.draw_train_card())
-            
-            # Then handle face-up card selection
-            print("Choose a face-up card (0-4):", game_state.deck.face_up_cards)
-            face_up_choice = int(input("Enter your choice: "))
+            if deck.train_cards_left:
+                player.hand.append(deck.draw_train_card())
             
-            if 0 <= face_up_choice < len(game_state.deck.face_up_cards):
-                player.hand.append(game_state.deck.face_up_cards[face_up_choice])
-                game_state.deck.replace_face_up_card(face_up_choice)
+            # Then take a face-up card, which can't be a wild as a second card
+            index = face_up[0] if face_up else player.choose_face_up_card(deck)
+            take_face_up_card(player, deck, index, sink, allow_wild=False)
         
         elif action["method"] == "face_up":
-            print("Choose a face-up card (0-4):", game_state.deck.face_up_cards)
-            face_up_choice = int(input("Enter your choice: "))
-            
-            if 0 <= face_up_choice < len(game_state.deck.face_up_cards):
-                card = game_state.deck.face_up_cards[face_up_choice]
-                player.hand.append(card)
-                game_state.deck.replace_face_up_card(face_up_choice)
+            index = face_up[0] if face_up else player.choose_face_up_card(deck)
+            card = take_face_up_card(player, deck, index, sink)
                 
-                # If wild card was drawn, no second card
-                if card != "wild" and action.get("count", 0) > 1:
-                    print("Choose a second face-up card (0-4):", game_state.deck.face_up_cards)
-                    face_up_choice2 = int(input("Enter your choice: "))
-                    
-                    if 0 <= face_up_choice2 < len(game_state.deck.face_up_cards):
-                        player.hand.append(game_state.deck.face_up_cards[face_up_choice2])
-                        game_state.deck.replace_face_up_card(face_up_choice2)
+            # If wild card was drawn, no second card
+            if card is not None and card != "wild" and action.get("count", 0) > 1:
+                index = face_up[1] if len(face_up) > 1 else player.choose_face_up_card(deck, second=True)
+                take_face_up_card(player, deck, index, sink, allow_wild=False)
     
     elif action_type == "claim_route":
-        city1 = action["city1"]
-        city2 = action["city2"]
-        color = action["color"]
-        
-        # Get route data
-        edge_data = game_state.board.graph.get_edge_data(city1, city2)
-        if not edge_data:
-            print(f"No route exists between {city1} and {city2}")
-            return False
-        
-        # Find the first unclaimed edge with matching color
-        for key, route in edge_data.items():
-            # Check if route color matches requested color or if "any" color is allowed
-            if (route["color"] == color or route["color"] == "any") and "claimed" not in route:
-                length = route["length"]
-                
-                # Count regular cards and wild cards
-                regular_cards = player.hand.count(color)
-                wild_cards = player.hand.count("wild")
-                
-                # Check if player has enough cards (regular + wild)
-                if regular_cards + wild_cards >= length:
-                    # Use regular cards first, then wild cards as needed
-                    cards_to_use = min(regular_cards, length)
-                    wilds_to_use = length - cards_to_use
-                    
-                    # Remove cards from hand
-                    for _ in range(cards_to_use):
-                        player.hand.remove(color)
-                    for _ in range(wilds_to_use):
-                        player.hand.remove("wild")
-                    
-                    # Update player stats
-                    player.trains -= length
-                    player.score += player.calculate_route_score(length)
-                    
-                    # Mark route as claimed
-                    route["claimed"] = player.name
-                    print(f"{player.name} claimed route from {city1} to {city2}")
-                    return True
-                else:
-                    print(f"Not enough {color} cards and wild cards to claim this route")
-                    return False
-        
-        # If we get here, no matching unclaimed route was found
-        print(f"Cannot claim route from {city1} to {city2} with {color} cards")
-        return False
+        return game_state.board.claim_route(player, action["city1"], action["city2"], action.get("color"),
+                                            player_count=len(game_state.players), deck=deck)
     
     elif action_type == "draw_tickets":
-        if len(game_state.deck.ticket_cards) > 0:
-            # Let the player class handle the ticket drawing
-            return_tickets = player.draw_ticket_cards(game_state.deck)
-            
-            # Return unwanted tickets to the deck
-            game_state.deck.ticket_cards.extend(return_tickets)
-            random.shuffle(game_state.deck.ticket_cards)
+        if len(deck.ticket_cards) > 0:
+            if "keep" in action:
+                draw_tickets(player, deck, action["keep"])
+            else:
+                # Let the player class handle the ticket drawing
+                return_tickets = player.draw_ticket_cards(deck)
+                
+                # Return unwanted tickets to the deck
+                deck.ticket_cards.extend(return_tickets)
+                deck.shuffle_ticket_cards()
         else:
-            print("No ticket cards remaining")
+            emit(sink, "no_tickets", "No ticket cards remaining")
+
+
+def draw_tickets(player, deck, keep, count=3):
+    """
+    Draw tickets and keep the ones at the given positions
+    At least one ticket is always kept; the rest go back into the deck.
+    """
+    tickets = [deck.draw_ticket_card() for _ in range(min(count, len(deck.ticket_cards)))]
+    kept = [ticket for i, ticket in enumerate(tickets) if i in keep] or tickets[:1]
+    player.tickets.extend(kept)
+
+    returned = [ticket for ticket in tickets if ticket not in kept]
+    if returned:
+        deck.ticket_cards.extend(returned)
+        deck.shuffle_ticket_cards()
+    return kept
+
+
+def take_face_up_card(player, deck, index, sink, allow_wild=True):
+    """Move a face-up card to the player's hand, return it or None if not taken"""
+    if index is None or not 0 <= index < len(deck.face_up_cards):
+        return None
+
+    card = deck.face_up_cards[index]
+    if card == "wild" and not allow_wild:
+        emit(sink, "draw_failed", "A face-up wild can't be taken as the second card")
+        return None
 
+    player.hand.append(card)
+    deck.replace_face_up_card(index)
+    return card
@@ -0,0 +1,184 @@
+"""Precomputed static index of a board and its tickets
+
+Everything about a map that never changes during a game, as integer
+arrays keyed by city and route id (the ids of board.RouteTable):
+
+    endpoints, length, color, partner, points   per route
+    distance        (cities, cities) shortest connection in trains
+    ticket_cities   (tickets, 2) city ids, ticket_values their points
+    ticket_cost     trains needed to complete each ticket on an empty board
+    ticket_routes   (tickets, routes) routes on some cheapest connection
+    ticket_path     (tickets, longest) one cheapest connection, padded with -1
+
+The arrays are computed once per map and cached on disk as .npy files,
+which are memory-mapped on load. The cache lives in TTR_GA_CACHE if set,
+else next to the package, else in the user cache directory. Cache
+entries are named by a hash of the map, so edits to the map data are
+picked up automatically.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from ttr_ga.board import RouteTable
+from ttr_ga.player import TICKETS
+from ttr_ga.scoring import ROUTE_POINTS
+from ttr_ga.utils.cache import cache_dir
+
+INDEX_VERSION = 1
+UNREACHABLE = np.iinfo(np.int16).max
+
+ARRAYS = ("endpoints", "length", "color", "partner", "points", "distance",
+          "ticket_cities", "ticket_values", "ticket_cost", "ticket_routes", "ticket_path")
+
+
+class BoardIndex:
+    """The precomputed arrays of one route table and ticket list"""
+    def __init__(self, table, tickets, arrays):
+        self.table = table
+        self.tickets = list(tickets)
+        self.ticket_index = {(c1, c2): i for i, (c1, c2, _) in enumerate(self.tickets)}
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+
+    @classmethod
+    def build(cls, table, tickets):
+        """Compute the index from scratch"""
+        city_index = table.city_index
+        endpoints = np.stack([np.frombuffer(table.city1, dtype=np.int16),
+                              np.frombuffer(table.city2, dtype=np.int16)], axis=1).astype(np.int16)
+        length = np.frombuffer(table.length, dtype=np.int8).astype(np.int16)
+
+        # Floyd-Warshall over route lengths; parallel routes have equal lengths
+        cities = len(table.cities)
+        distance = np.full((cities, cities), UNREACHABLE, dtype=np.int32)
+        np.fill_diagonal(distance, 0)
+        distance[endpoints[:, 0], endpoints[:, 1]] = length
+        distance[endpoints[:, 1], endpoints[:, 0]] = length
+        for k in range(cities):
+            np.minimum(distance, distance[:, k, None] + distance[None, k, :], out=distance)
+        distance = np.minimum(distance, UNREACHABLE)
+
+        ticket_cities = np.array([(city_index[c1], city_index[c2]) for c1, c2, _ in tickets], dtype=np.int16)
+        a, b = ticket_cities[:, 0].astype(np.intp), ticket_cities[:, 1].astype(np.intp)
+        ticket_cost = distance[a, b]
+
+        # A route u-v lies on a cheapest a-b connection when d(a,u) + len + d(v,b) == d(a,b), either way round
+        u, v = endpoints[:, 0].astype(np.intp), endpoints[:, 1].astype(np.intp)
+        forward = distance[a][:, u] + length + distance[:, b].T[:, v]
+        backward = distance[a][:, v] + length + distance[:, b].T[:, u]
+        ticket_routes = (forward == ticket_cost[:, None]) | (backward == ticket_cost[:, None])
+
+        paths = [_cheapest_path(a[t], b[t], distance, endpoints, length, ticket_routes[t])
+                 for t in range(len(tickets))]
+        longest = max([1] + [len(path) for path in paths])
+        ticket_path = np.full((len(tickets), longest), -1, dtype=np.int16)
+        for t, path in enumerate(paths):
+            ticket_path[t, :len(path)] = path
+
+        arrays = {
+            "endpoints": endpoints,
+            "length": length,
+            "color": np.frombuffer(table.color, dtype=np.int8).copy(),
+            "partner": np.frombuffer(table.partner, dtype=np.int16).copy(),
+            "points": np.array(ROUTE_POINTS, dtype=np.int16)[length],
+            "distance": distance.astype(np.int16),
+            "ticket_cities": ticket_cities,
+            "ticket_values": np.array([value for _, _, value in tickets], dtype=np.int16),
+            "ticket_cost": ticket_cost.astype(np.int16),
+            "ticket_routes": ticket_routes,
+            "ticket_path": ticket_path,
+        }
+        return cls(table, tickets, arrays)
+
+    @classmethod
+    def load(cls, table, tickets, cache=None):
+        """The index from the disk cache, building and saving it on a miss"""
+        directory = (Path(cache) if cache is not None else cache_dir()) / f"index-{map_hash(table, tickets)}"
+        try:
+            arrays = {name: np.load(directory / f"{name}.npy", mmap_mode='r') for name in ARRAYS}
+        except (OSError, ValueError):
+            index = cls.build(table, tickets)
+            index.save(directory)
+            return index
+        return cls(table, tickets, arrays)
+
+    def save(self, directory):
+        """
+        Write the arrays as .npy files in directory
+        Files are written to a temporary directory that is then renamed,
+        so concurrent workers never see a half-written index. Failing to
+        write (e.g. a read-only cache) is not an error.
+        """
+        directory = Path(directory)
+        staging = None
+        try:
+            directory.parent.mkdir(parents=True, exist_ok=True)
+            staging = Path(tempfile.mkdtemp(prefix=".index-", dir=directory.parent))
+            for name in ARRAYS:
+                np.save(staging / f"{name}.npy", np.asarray(getattr(self, name)))
+            os.replace(staging, directory)
+        except OSError:
+            if staging is not None:
+                shutil.rmtree(staging, ignore_errors=True)
+
+    def city_id(self, city):
+        return self.table.city_index[city]
+
+    def distance_between(self, city1, city2):
+        """Fewest trains connecting two cities on an empty board"""
+        return int(self.distance[self.table.city_index[city1], self.table.city_index[city2]])
+
+    def ticket_id(self, ticket):
+        """Id of a (city1, city2, points) ticket"""
+        return self.ticket_index[ticket[0], ticket[1]]
+
+    def ticket_difficulty(self, ticket):
+        """Trains needed to complete a ticket on an empty board"""
+        return int(self.ticket_cost[self.ticket_id(ticket)])
+
+    def cheapest_path(self, ticket):
+        """Route ids of one cheapest connection for a ticket"""
+        path = self.ticket_path[self.ticket_id(ticket)]
+        return [int(route_id) for route_id in path if route_id >= 0]
+
+
+def _cheapest_path(start, goal, distance, endpoints, length, on_path):
+    """Walk from start to goal along routes that keep to a cheapest connection"""
+    path = []
+    city = start
+    candidates = np.flatnonzero(on_path)
+    while city != goal:
+        for route_id in candidates:
+            u, v = endpoints[route_id]
+            other = v if u == city else u if v == city else None
+            if other is not None and length[route_id] + distance[other, goal] == distance[city, goal]:
+                path.append(route_id)
+                city = other
+                break
+        else:
+            return []  # unreachable
+    return path
+
+
+def map_hash(table, tickets):
+    """Short content hash of a map, naming its cache entry"""
+    routes = [(table.endpoints(route_id), table.length[route_id], table.color_names[route_id],
+               table.is_double[route_id]) for route_id in range(len(table))]
+    data = repr((INDEX_VERSION, table.cities, routes, list(tickets)))
+    return hashlib.sha256(data.encode()).hexdigest()[:16]
+
+
+_STANDARD_INDEX = None
+
+
+def board_index():
+    """The index of the standard board and tickets, loaded once per process"""
+    global _STANDARD_INDEX
+    if _STANDARD_INDEX is None:
+        _STANDARD_INDEX = BoardIndex.load(RouteTable.standard(), TICKETS)
+    return _STANDARD_INDEX
@@ -0,0 +1,205 @@
+"""Map definitions: loading, validation and compiled route tables
+
+A map is a JSON file with a name, train_cards (color -> count in the
+deck), cities, routes as [city1, city2, length, color] plus a trailing
+true on both halves of a double route, and tickets as
+[city1, city2, points]. Gray routes have the color "gray". A map may list
+extra rules (e.g. "tunnels", "ferries" and "stations" for Europe); the
+engine only plays the base rules, so such maps are rejected.
+
+Maps are validated on load and every problem is reported in one
+MapError. The validated map is written to the cache directory as plain
+JSON, under a hash of FORMAT_VERSION and the file contents, so later
+runs skip validation. The cache may be shared or user-writable, so
+nothing in it is unpickled or executed. Bump FORMAT_VERSION when
+validation or the cached fields change.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from ttr_ga.board import RouteTable
+from ttr_ga.common import COLORS
+from ttr_ga.scoring import ROUTE_POINTS, CityUnionFind
+from ttr_ga.utils.cache import cache_dir
+
+MAPS_DIR = Path(__file__).resolve().parent
+FORMAT_VERSION = 2
+GRAY = "gray"
+SUPPORTED_RULES = ()  # rules beyond the base game the engine can play
+
+
+class MapError(ValueError):
+    """A map definition that cannot be played"""
+    def __init__(self, name, problems):
+        self.problems = list(problems)
+        super().__init__(f"Invalid map {name}: " + "; ".join(self.problems))
+
+
+class GameMap:
+    """A validated map and the RouteTable compiled from it"""
+    def __init__(self, name, cities, routes, tickets, train_cards):
+        self.name = name
+        self.cities = list(cities)
+        self.routes = [tuple(route) for route in routes]
+        self.tickets = [tuple(ticket) for ticket in tickets]
+        self.train_cards = dict(train_cards)
+        self.table = RouteTable(self.cities, self.routes)
+
+    @classmethod
+    def from_definition(cls, definition):
+        """Validate a parsed map definition and compile it"""
+        name = definition.get("name", "<unnamed>")
+        problems = validate(definition)
+        if problems:
+            raise MapError(name, problems)
+        return cls(name, definition["cities"], definition["routes"], definition["tickets"],
+                   definition["train_cards"])
+
+    @classmethod
+    def from_cached(cls, fields):
+        """Rebuild a map written by to_cached, which was validated then"""
+        return cls(fields["name"], fields["cities"], fields["routes"], fields["tickets"], fields["train_cards"])
+
+    def to_cached(self):
+        """The map as plain JSON-ready fields"""
+        return {"name": self.name, "cities": self.cities, "routes": self.routes, "tickets": self.tickets,
+                "train_cards": self.train_cards}
+
+    def deck_cards(self):
+        """The train cards of a fresh deck, in a fixed order"""
+        return [color for color, count in self.train_cards.items() for _ in range(count)]
+
+
+def validate(definition):
+    """Return a list of the problems with a map definition, empty if it is playable"""
+    problems = []
+    for key in ("name", "cities", "routes", "tickets", "train_cards"):
+        if key not in definition:
+            problems.append(f"missing {key!r}")
+    if problems:
+        return problems
+
+    for rule in definition.get("rules", []):
+        if rule not in SUPPORTED_RULES:
+            problems.append(f"rule {rule!r} is not supported by the engine")
+
+    cities = definition["cities"]
+    known = set()
+    for city in cities:
+        if not isinstance(city, str) or not city.strip():
+            problems.append(f"invalid city name {city!r}")
+        elif city in known:
+            problems.append(f"duplicate city {city!r}")
+        known.add(city)
+
+    card_colors = COLORS[:-1]
+    max_length = len(ROUTE_POINTS) - 1
+    pairs = {}
+    connected = CityUnionFind()
+    for route in definition["routes"]:
+        if not isinstance(route, list) or len(route) not in (4, 5):
+            problems.append(f"route {route!r} is not [city1, city2, length, color(, double)]")
+            continue
+        city1, city2, length, color = route[:4]
+        double = len(route) == 5 and route[4]
+        if city1 not in known or city2 not in known:
+            problems.append(f"route {route!r} names an unknown city")
+            continue
+        if city1 == city2:
+            problems.append(f"route {route!r} is a loop")
+        if not isinstance(length, int) or not 1 <= length <= max_length:
+            problems.append(f"route {route!r} length must be 1 to {max_length}, the lengths scored by the engine")
+        if color != GRAY and color not in card_colors:
+            problems.append(f"route {route!r} color {color!r} is not {GRAY!r} or one of {card_colors}")
+        if len(route) == 5 and not isinstance(route[4], bool):
+            problems.append(f"route {route!r} double flag must be true or false")
+        pairs.setdefault(frozenset((city1, city2)), []).append(bool(double))
+        connected.union(city1, city2)
+
+    for pair, flags in pairs.items():
+        city1, city2 = sorted(pair)
+        if any(flags) and flags != [True, True]:
+            problems.append(f"double route {city1} - {city2} needs exactly two routes marked double, "
+                            f"found {len(flags)} route(s) with flags {flags}")
+        elif not any(flags) and len(flags) > 1:
+            problems.append(f"{len(flags)} routes between {city1} and {city2} are not marked double")
+
+    used = {city for pair in pairs for city in pair}
+    for city in cities:
+        if city in known and city not in used:
+            problems.append(f"city {city!r} has no routes")
+
+    for ticket in definition["tickets"]:
+        if not isinstance(ticket, list) or len(ticket) != 3:
+            problems.append(f"ticket {ticket!r} is not [city1, city2, points]")
+            continue
+        city1, city2, points = ticket
+        if city1 not in known or city2 not in known:
+            problems.append(f"ticket {ticket!r} names an unknown city")
+        elif city1 == city2:
+            problems.append(f"ticket {ticket!r} connects a city to itself")
+        elif not connected.connected(city1, city2):
+            problems.append(f"ticket {ticket!r} can never be completed")
+        if not isinstance(points, int) or points <= 0:
+            problems.append(f"ticket {ticket!r} points must be a positive integer")
+
+    cards = definition["train_cards"]
+    for color, count in cards.items():
+        if color not in COLORS:
+            problems.append(f"train card color {color!r} is not one of {COLORS}")
+        if not isinstance(count, int) or count < 0:
+            problems.append(f"train card count for {color!r} must be a non-negative integer")
+    return problems
+
+
+def map_path(name):
+    """Path of a bundled map by name, or the given path to a map file"""
+    path = Path(name)
+    if path.suffix == ".json":
+        return path
+    return MAPS_DIR / f"{name}.json"
+
+
+_LOADED = {}
+
+
+def load_map(name="usa", cache=None):
+    """
+    Load, validate and compile a map, by bundled name or path to a .json
+    Compiled maps are kept per process, and validated maps on disk by
+    content hash.
+    """
+    data = map_path(name).read_bytes()
+    key = hashlib.sha256(b"%d:" % FORMAT_VERSION + data).hexdigest()[:16]
+    game_map = _LOADED.get(key)
+    if game_map is not None:
+        return game_map
+
+    compiled = (Path(cache) if cache is not None else cache_dir()) / f"map-{key}.json"
+    try:
+        game_map = GameMap.from_cached(json.loads(compiled.read_bytes()))
+    except (OSError, ValueError, KeyError, TypeError):
+        game_map = GameMap.from_definition(json.loads(data))
+        _save(game_map, compiled)
+    _LOADED[key] = game_map
+    return game_map
+
+
+def _save(game_map, path):
+    """Write a validated map to the cache, replacing the file atomically; a read-only cache is not an error"""
+    staging = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, staging = tempfile.mkstemp(prefix=".map-", dir=path.parent)
+        with os.fdopen(fd, "w") as f:
+            json.dump(game_map.to_cached(), f)
+        os.replace(staging, path)
+        staging = None
+    except OSError:
+        pass
+    finally:
+        if staging is not None:
+            Path(staging).unlink(missing_ok=True)
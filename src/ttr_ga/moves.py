@@ -0,0 +1,164 @@
+"""Legal move generation on color-count hands
+
+A hand is reduced to a 9-slot count vector over common.COLORS and every
+route's requirements are precomputed as arrays, so checking all routes
+against a hand takes a few NumPy operations instead of a hand.count() per
+edge. Claims follow Board.claim_route exactly: the double route rules,
+trains left, gray routes and wilds.
+"""
+import numpy as np
+
+from ttr_ga.board import CompactBoard
+from ttr_ga.common import COLORS
+
+WILD = COLORS.index('wild')
+CARD_COLORS = WILD  # the first eight colors are regular cards
+
+
+def hand_counts(hand):
+    """Count the cards of each color in a hand, in COLORS order"""
+    return np.array([hand.count(color) for color in COLORS], dtype=np.int16)
+
+
+class RouteRequirements:
+    """
+    Per-route arrays used to test claims against a hand
+
+    Payment colors are the 9 COLORS slots: a colored route only takes its
+    own color, a gray route takes any regular color or wilds alone. Double
+    routes are assumed to be pairs, as on the standard maps.
+    """
+    def __init__(self, table):
+        self.table = table
+        n = len(table)
+        self.length = np.frombuffer(table.length, dtype=np.int8).astype(np.int16)
+        self.is_gray = np.frombuffer(table.color, dtype=np.int8) == table.GRAY
+        self.partner = np.frombuffer(table.partner, dtype=np.int16).astype(np.intp)
+        self.has_partner = self.partner >= 0
+
+        # The partner comes first in the pair, so it is tried first by claim_route
+        self.partner_first = self.has_partner & (self.partner < np.arange(n))
+
+        # Which payment colors each route accepts
+        self.accepts = np.zeros((n, len(COLORS)), dtype=bool)
+        colored = np.flatnonzero(~self.is_gray)
+        self.accepts[colored, np.frombuffer(table.color, dtype=np.int8)[colored]] = True
+        self.accepts[self.is_gray, :] = True
+
+        # Endpoint names, for building action dicts
+        self.endpoints = [table.endpoints(route_id) for route_id in range(n)]
+
+
+def requirements(table):
+    """The RouteRequirements shared by every board built on a table"""
+    req = table.requirements
+    if req is None:
+        req = table.requirements = RouteRequirements(table)
+    return req
+
+
+def claim_mask(board, player, player_count):
+    """
+    Boolean (routes, 9) array of legal claims
+    Entry [r, c] is True when claiming with color COLORS[c] succeeds and
+    claims route r. Paying for a gray route with a color the player has no
+    card of is left out; that is the same claim as paying with wilds.
+    """
+    req = requirements(board.table)
+    owner = np.frombuffer(board.owner, dtype=np.int8)
+    seat = board.seats.get(player.name, -2)
+    counts = hand_counts(player.hand)
+    wilds = counts[WILD]
+    length = req.length
+
+    free = owner == CompactBoard.UNCLAIMED
+    partner_owner = np.where(req.has_partner, owner[req.partner], CompactBoard.UNCLAIMED)
+
+    # Double route rules: never both halves, only one half with 2-3 players
+    blocked = partner_owner == seat
+    if player_count and player_count < 4:
+        blocked |= partner_owner != CompactBoard.UNCLAIMED
+
+    # A free partner listed first takes every color it accepts
+    shadowed = (req.partner_first & (partner_owner == CompactBoard.UNCLAIMED))[:, None] & req.accepts[req.partner]
+
+    # Cards: a color plus wilds; gray routes need at least one card of the color
+    enough = (counts[:CARD_COLORS] + wilds)[None, :] >= length[:, None]
+    pay = np.empty((len(length), len(COLORS)), dtype=bool)
+    pay[:, :CARD_COLORS] = enough & np.where(req.is_gray[:, None], counts[:CARD_COLORS] > 0, True)
+    pay[:, WILD] = wilds >= length
+    pay &= req.accepts
+
+    open_routes = free & ~blocked & (length <= player.trains)
+    return open_routes[:, None] & ~shadowed & pay
+
+
+def draw_options(deck):
+    """
+    Yield (method, face_up_indices) for every way to draw train cards
+    The second face-up pick indexes the layout after the first card is
+    replaced; with an empty deck the first slot is removed instead.
+    """
+    face_up = deck.face_up_cards
+    deck_has_cards = deck.train_cards_left > 0
+
+    if deck_has_cards:
+        yield "blind", ()
+
+    for i, card in enumerate(face_up):
+        if card == "wild":
+            # A face-up wild is the whole draw
+            yield "face_up", (i,)
+            continue
+
+        if deck_has_cards:
+            yield "mixed", (i,)
+
+        if deck_has_cards:
+            after = [None if j == i else other for j, other in enumerate(face_up)]
+        else:
+            after = face_up[:i] + face_up[i + 1:]
+        for j, second in enumerate(after):
+            if second != "wild":
+                yield "face_up", (i, j)
+
+
+def draw_actions(deck):
+    """Every way to draw train cards, with face-up choices in the action"""
+    actions = []
+    for method, indices in draw_options(deck):
+        if method == "blind":
+            actions.append({"action_type": "draw_train_cards", "method": "blind", "count": 2})
+        elif method == "mixed":
+            actions.append({"action_type": "draw_train_cards", "method": "mixed",
+                            "blind_count": 1, "face_up_indices": list(indices)})
+        else:
+            actions.append({"action_type": "draw_train_cards", "method": "face_up",
+                            "count": len(indices), "face_up_indices": list(indices)})
+    return actions
+
+
+def legal_actions(game_state):
+    """
+    All legal actions for the current player, as action dicts
+    Boards other than CompactBoard are compiled first, which is slow.
+    """
+    board = game_state.board
+    if not isinstance(board, CompactBoard):
+        board = CompactBoard.from_board(board)
+    player = game_state.get_current_player()
+
+    actions = draw_actions(game_state.deck)
+    if game_state.deck.ticket_cards:
+        actions.append({"action_type": "draw_tickets"})
+
+    endpoints = requirements(board.table).endpoints
+    for route_id, color in zip(*np.nonzero(claim_mask(board, player, len(game_state.players)))):
+        city1, city2 = endpoints[route_id]
+        actions.append({
+            "action_type": "claim_route",
+            "city1": city1,
+            "city2": city2,
+            "color": COLORS[color],
+        })
+    return actions
@@ -0,0 +1,228 @@
+"""Fixed-size float32 observations of game states
+
+ObservationEncoder turns a GameState into a flat float32 vector from one
+seat's view, for learning agents and the trajectory log. Seats are
+counted from the viewer, so the viewer is always seat 0. The layout, in
+order:
+
+    owner     (routes, MAX_SEATS) one-hot route ownership by seat
+    hand      viewer's cards per color, over the cards of that color in the game
+    face_up   face-up cards per color, over FACE_UP_SLOTS
+    seats     (MAX_SEATS, 5) seated, trains, cards, score, tickets per seat
+    tickets   (tickets, 2) viewer holds the ticket, progress on it
+    deck      draw pile, discard pile and ticket pile sizes, final round
+
+Progress on a held ticket is 1 once it is connected, else the share of
+the trains of its cheapest connection on the board index that the
+viewer has claimed. Only public information and the viewer's own hand
+and tickets are encoded.
+
+encode() writes into a given buffer (or the encoder's own) in place and
+encode_batch() encodes many states into the rows of one matrix. The
+per-route and per-ticket parts run as array operations over the whole
+batch on scratch arrays kept by the encoder, and the per-player values
+are written straight into each state's row, so repeated calls of the
+same or smaller batch size allocate no array memory.
+"""
+import functools
+
+import numpy as np
+
+from ttr_ga.actions import FACE_UP_SLOTS
+from ttr_ga.board import CompactBoard, RouteTable
+from ttr_ga.common import COLORS
+from ttr_ga.index import BoardIndex, board_index
+from ttr_ga.player import STARTING_TRAINS, TICKETS, TRAIN_CARDS
+
+MAX_SEATS = 5
+SEAT_FEATURES = 5
+CARD_SCALE = 12.0     # cards in a hand
+SCORE_SCALE = 100.0   # points
+TICKET_SCALE = 5.0    # tickets held
+
+_CARD_TOTALS = [TRAIN_CARDS.count(color) for color in COLORS]
+_COLOR_INDEX = {color: i for i, color in enumerate(COLORS)}
+
+
+class ObservationEncoder:
+    """
+    Encodes states of games on one route table
+
+    layout maps the block names above to their slices of the vector.
+    """
+    def __init__(self, table=None):
+        table = RouteTable.standard() if table is None else table
+        self.table = table
+        index = self.index = board_index() if table is RouteTable.standard() else BoardIndex.load(table, TICKETS)
+        self.routes = len(table)
+        self.tickets = len(index.tickets)
+        colors = len(COLORS)
+
+        sizes = {
+            "owner": self.routes * MAX_SEATS,
+            "hand": colors,
+            "face_up": colors,
+            "seats": MAX_SEATS * SEAT_FEATURES,
+            "tickets": self.tickets * 2,
+            "deck": 4,
+        }
+        self.layout = {}
+        offset = 0
+        for name, size in sizes.items():
+            self.layout[name] = slice(offset, offset + size)
+            offset += size
+        self.size = offset
+
+        # A held ticket's cheapest connection; index routes pads the path and never counts
+        path = np.asarray(index.ticket_path, dtype=np.intp)
+        self._path = np.where(path < 0, self.routes, path)
+        length = np.append(np.asarray(index.length, dtype=np.float32), 0)
+        self._path_share = length[self._path] / np.maximum(length[self._path].sum(axis=1, keepdims=True), 1)
+        self._ticket_index = index.ticket_index
+        # Hand counts over the cards of each color, face-up counts over the slots
+        self._card_scale = np.array([1 / total for total in _CARD_TOTALS] + [1 / FACE_UP_SLOTS] * len(COLORS),
+                                    dtype=np.float32)
+        self._seat_ids = np.arange(MAX_SEATS, dtype=np.int8)
+        self._out = np.zeros(self.size, dtype=np.float32)
+        self._capacity = 0
+
+    def _reserve(self, count):
+        """Scratch arrays for batches of up to count states"""
+        if count <= self._capacity:
+            return
+        self._capacity = count
+        self._owner = np.zeros((count, self.routes), dtype=np.int8)
+        self._relative = np.zeros((count, self.routes), dtype=np.int8)
+        self._seat_map = np.full((count, 256), MAX_SEATS, dtype=np.int8)  # board seat (as a byte) -> viewer seat
+        self._flat = np.zeros((count, self.routes), dtype=np.intp)
+        self._onehot = np.zeros((count, self.routes, MAX_SEATS), dtype=bool)
+        self._mine = np.zeros((count, self.routes + 1), dtype=np.float32)
+        self._on_path = np.zeros((count, self.tickets, self._path.shape[1]), dtype=np.float32)
+        self._progress = np.zeros((count, self.tickets), dtype=np.float32)
+        self._cards = np.zeros((count, 2 * len(COLORS)), dtype=np.float32)
+        self._batch = np.zeros((count, self.size), dtype=np.float32)
+        self._rows = np.arange(count, dtype=np.intp)[:, None] * 256
+
+    def _compact(self, board):
+        """A networkx Board's claims on this encoder's table, matched by city pair"""
+        compact = CompactBoard(self.table, sink=None)
+        for city1, city2, data in board.graph.edges(data=True):
+            name = data.get('claimed')
+            if name is None:
+                continue
+            for route_id in self.table.pair_routes.get((city1, city2), ()):
+                if compact.owner[route_id] == compact.UNCLAIMED:
+                    compact.owner[route_id] = compact.seat(name)
+                    break
+        return compact
+
+    def encode(self, state, seat=None, out=None):
+        """
+        The observation of state from seat's view (the player to move by default)
+        Written into out when given, else into a buffer owned by the
+        encoder that the next call overwrites.
+        """
+        out = self._out if out is None else out
+        self.encode_batch((state,), None if seat is None else (seat,), out[None])
+        return out
+
+    __call__ = encode
+
+    def encode_batch(self, states, seats=None, out=None):
+        """
+        Observations of many states as the rows of a (len(states), size) matrix
+        seats gives each state's viewer (the players to move by default).
+        Written into out when given, else into a buffer owned by the
+        encoder that the next call overwrites.
+        """
+        count = len(states)
+        self._reserve(count)
+        if out is None:
+            out = self._batch[:count]
+        out[:] = 0
+        layout = self.layout
+        owner, relative, seat_map = self._owner[:count], self._relative[:count], self._seat_map[:count]
+        viewers = []
+
+        for i, state in enumerate(states):
+            board = state.board
+            if not isinstance(board, CompactBoard):
+                board = self._compact(board)
+            seat = state.current_player_idx if seats is None else seats[i]
+            players = state.players
+            viewers.append((state, seat))
+            owner[i] = board.owner
+            seat_map[i, :MAX_SEATS] = MAX_SEATS
+            for index, player in enumerate(players):
+                board_seat = board.seats.get(player.name)
+                if board_seat is not None:
+                    seat_map[i, board_seat] = (index - seat) % len(players)
+
+        # Route ownership: map board seats to viewer seats, then one-hot
+        flat = self._flat[:count]
+        np.add(owner.view(np.uint8), self._rows[:count], out=flat)
+        np.take(seat_map, flat, out=relative, mode="clip")
+        onehot = self._onehot[:count]
+        np.equal(relative[:, :, None], self._seat_ids, out=onehot)
+        out[:, layout["owner"]] = onehot.reshape(count, -1)
+
+        # Progress along each ticket's cheapest connection, for every ticket at once
+        mine = self._mine[:count]
+        mine[:, :self.routes] = onehot[:, :, 0]
+        on_path = self._on_path[:count]
+        np.take(mine, self._path, axis=1, out=on_path, mode="clip")
+        np.multiply(on_path, self._path_share, out=on_path)
+        progress = self._progress[:count]
+        np.sum(on_path, axis=2, out=progress)
+
+        # The rest is written per state straight into its row
+        colors = len(COLORS)
+        cards = self._cards[:count]
+        cards[:] = 0
+        tickets = out[:, layout["tickets"]].reshape(count, -1, 2)
+        seats_at, deck_at = layout["seats"].start, layout["deck"].start
+        for i, (state, seat) in enumerate(viewers):
+            players = state.players
+            viewer = players[seat]
+            deck = state.deck
+            row = out[i]
+            for card in viewer.hand:
+                cards[i, _COLOR_INDEX[card]] += 1
+            for card in deck.face_up_cards:
+                cards[i, colors + _COLOR_INDEX[card]] += 1
+
+            at = seats_at
+            for k in range(len(players)):
+                player = players[(seat + k) % len(players)]
+                row[at] = 1
+                row[at + 1] = player.trains / STARTING_TRAINS
+                row[at + 2] = len(player.hand) / CARD_SCALE
+                row[at + 3] = player.score / SCORE_SCALE
+                row[at + 4] = len(player.tickets) / TICKET_SCALE
+                at += SEAT_FEATURES
+
+            connections = viewer.connections
+            for city1, city2, _ in viewer.tickets:
+                ticket = self._ticket_index.get((city1, city2))
+                if ticket is not None:
+                    tickets[i, ticket, 0] = 1
+                    tickets[i, ticket, 1] = 1 if connections.connected(city1, city2) else progress[i, ticket]
+
+            row[deck_at] = deck.train_cards_left / len(TRAIN_CARDS)
+            row[deck_at + 1] = deck.discard_count / len(TRAIN_CARDS)
+            row[deck_at + 2] = len(deck.ticket_cards) / len(TICKETS)
+            row[deck_at + 3] = state.final_round
+
+        np.multiply(cards, self._card_scale, out=out[:, layout["hand"].start:layout["face_up"].stop])
+        return out
+
+
+@functools.lru_cache(maxsize=8)
+def observation_encoder(table=None):
+    """The ObservationEncoder of a route table, shared per process"""
+    return ObservationEncoder(table)
+
+
+def encode_observation(state, seat=None, out=None):
+    """Observation of state from seat's view with the shared encoder of its table"""
+    return observation_encoder(getattr(state.board, "table", None)).encode(state, seat, out)
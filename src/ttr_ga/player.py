@@ -1,33 +1,130 @@
-import random
+import copy
+from ttr_ga.common import COLORS
+from ttr_ga.events import emit, print_sink
+from ttr_ga.maps import load_map
+from ttr_ga.scoring import ROUTE_POINTS, CityUnionFind
+from ttr_ga.utils.rng import resolve
 from ttr_ga.utils.state import GameState
 
+STARTING_TRAINS = 45
+
+# The standard USA map's deck and tickets, as listed in maps/usa.json
+_USA = load_map("usa")
+TRAIN_CARDS = _USA.deck_cards()
+TICKETS = list(_USA.tickets)
+
+_CODES = {color: code for code, color in enumerate(COLORS)}
+_NAMES = tuple(COLORS)
+_WILD = _CODES['wild']
+
 class Deck:
-    def __init__(self):
-        self.train_cards = ["red", "blue", "green", "yellow", "black", "pink", "orange", "white"] * 12 + ["wild"] * 14
-        random.shuffle(self.train_cards)
-        self.ticket_cards = [("Seattle", "New York", 22), ("Los Angeles", "New York", 21), ("Los Angeles", "Miami", 20), ("Vancouver", "Montreal", 20), ("Portland", "Nashville", 17), ("San Francisco", "Atlanta", 17), ("Los Angeles", "Chicago", 16),
-                             ("Calgary", "Phoenix", 13), ("Montreal", "New Orleans", 13), ("Vancouver", "Santa Fe", 13), ("Boston", "Miami", 12), ("Winnipeg", "Houston", 12), ("Dallas", "New York", 11), ("Dnever", "Pittsburgh", 11),
-                             ("Portland", "Phoenix", 11), ("Winnipeg", "Little Rock", 11), ("Duluth", "El Paso", 10), ("Toronto", "Miami", 10), ("Chicago", "Santa Fe", 9), ("Montreal", "Atlanta", 9), ("Sault St Marie", "Oklahoma City", 9),
-                             ("Seattle", "Los Angeles", 9), ("Duluth", "Houston", 8), ("Helena", "Los Angeles", 8), ("Sault St Marie", "Nashville", 8), ("Calgary", "Salt Lake City", 7), ("Chicago", "New Orleans", 7), ("New York", "Atlanta", 6),
-                             ("Kansas City", "Houston", 5), ("Denver", "El Paso", 4)]
-        random.shuffle(self.ticket_cards)
-        self.face_up_cards = [self.train_cards.pop() for _ in range(5)]
+    """
+    Train cards, face-up cards and tickets
+
+    The draw pile is an immutable bytes of COLORS indices read from the
+    end through the cursor _top, so drawing only moves the cursor and
+    copies of a deck share the pile. Spent cards go to a discard pile
+    (also bytes, replaced on every discard) that is shuffled back in when
+    the draw pile runs out. train_cards reads and assigns the draw pile as
+    color names, for tests and tools; the engine uses train_cards_left.
+    """
+    # __dict__ stays so tests can patch methods on an instance
+    __slots__ = ("sink", "rng", "_pile", "_top", "_discard", "ticket_cards", "face_up_cards", "__dict__")
+
+    def __init__(self, sink=print_sink, rng=None, game_map=None):
+        self.sink = sink  # where deck messages go, None for silence
+        self.rng = resolve(rng)  # random.Random or NumPy Generator, None for the global random module
+        cards = TRAIN_CARDS if game_map is None else game_map.deck_cards()
+        self._pile = self._shuffled(_CODES[card] for card in cards)
+        self._top = len(self._pile)
+        self._discard = b""
+        self.ticket_cards = list(TICKETS if game_map is None else game_map.tickets)
+        self.rng.shuffle(self.ticket_cards)
+        self.face_up_cards = [self.draw_train_card() for _ in range(5)]
+
+    @property
+    def train_cards(self):
+        """The draw pile as color names, the next card last"""
+        return [COLORS[code] for code in self._pile[:self._top]]
+
+    @train_cards.setter
+    def train_cards(self, cards):
+        self._pile = bytes(_CODES[card] for card in cards)
+        self._top = len(self._pile)
+
+    @property
+    def discard_pile(self):
+        """The discarded cards as color names"""
+        return [COLORS[code] for code in self._discard]
+
+    @property
+    def train_cards_left(self):
+        """Cards that can still be drawn, counting the discard pile"""
+        return self._top + len(self._discard)
+
+    @property
+    def discard_count(self):
+        """Cards in the discard pile"""
+        return len(self._discard)
+
+    @property
+    def discard_codes(self):
+        """The discard pile as COLORS indices; copies share it until either discards"""
+        return self._discard
+
+    def copy(self, rng=None):
+        """
+        Copy the card piles so the copy can be drawn from independently
+        The copy shares this deck's rng unless given its own.
+        """
+        deck = Deck.__new__(Deck)
+        deck.sink = self.sink
+        deck.rng = self.rng if rng is None else rng
+        deck._pile = self._pile
+        deck._top = self._top
+        deck._discard = self._discard
+        deck.ticket_cards = list(self.ticket_cards)
+        deck.face_up_cards = list(self.face_up_cards)
+        return deck
 
     def draw_train_card(self):
-        return self.train_cards.pop()
+        if not self._top:
+            self._reshuffle_discard()
+        self._top -= 1
+        return _NAMES[self._pile[self._top]]
+
+    def _reshuffle_discard(self):
+        """Turn the discard pile into the draw pile"""
+        if not self._discard:
+            raise IndexError("draw from an empty deck")
+        emit(self.sink, "reshuffle", "Shuffling the discard pile into the deck")
+        self._pile = self._shuffled(self._discard)
+        self._discard = b""
+        self._top = len(self._pile)
+
+    def _shuffled(self, codes):
+        cards = bytearray(codes)
+        self.rng.shuffle(cards)
+        return bytes(cards)
+
+    def discard(self, cards):
+        """Put spent train cards on the discard pile"""
+        self._discard += bytes([_CODES[card] for card in cards])
+
+    def discard_counts(self, code, count, wilds):
+        """Put count cards of color COLORS[code], then wilds wilds, on the discard pile"""
+        self._discard += bytes((code,)) * count + bytes((_WILD,)) * wilds
 
     def draw_ticket_card(self):
         return self.ticket_cards.pop()
     
     def shuffle_train_cards(self):
         """Shuffle the train card deck"""
-        import random
-        random.shuffle(self.train_cards)
+        self._pile = self._shuffled(self._pile[:self._top])
 
     def shuffle_ticket_cards(self):
         """Shuffle the ticket card deck"""
-        import random
-        random.shuffle(self.ticket_cards)
+        self.rng.shuffle(self.ticket_cards)
         
     def setup_face_up_cards(self):
         """Set up the initial face-up cards, ensuring no more than 2 wilds"""
@@ -40,65 +137,81 @@ class Deck:
     
     def add_face_up_card(self):
         """Add a new card to the face-up cards"""
-        if self.train_cards:
+        if self._top or self._discard:
             self.face_up_cards.append(self.draw_train_card())
     
     def replace_face_up_card(self, index):
         """Replace a face-up card and check for too many wilds"""
         if 0 <= index < len(self.face_up_cards):
-            if self.train_cards:
+            if self._top or self._discard:
                 self.face_up_cards[index] = self.draw_train_card()
                 self.check_and_replace_wilds()
+            else:
+                # Nothing left to turn over, so the slot goes away
+                self.face_up_cards.pop(index)
     
     def check_and_replace_wilds(self):
-        """Check for 3+ wilds in face-up cards and replace all if found"""
-        wild_count = self.face_up_cards.count('wild')
-        if wild_count >= 3:
-            print("Three or more wild cards present. Replacing all face-up cards.")
-            # Put the current face-up cards back in the deck
-            self.train_cards.extend(self.face_up_cards)
-            random.shuffle(self.train_cards)
-            
-            # Draw new face-up cards
+        """Discard and redeal the face-up cards while 3+ of them are wilds"""
+        while self.face_up_cards.count('wild') >= 3:
+            # Give up if the remaining cards can't make a layout with fewer wilds
+            total = self._top + len(self._discard) + len(self.face_up_cards)
+            wilds = (self._pile.count(_WILD, 0, self._top) + self._discard.count(_WILD)
+                     + self.face_up_cards.count('wild'))
+            if total - wilds < min(5, total) - 2:
+                return
+
+            emit(self.sink, "face_up_reset", "Three or more wild cards present. Replacing all face-up cards.")
+            self.discard(self.face_up_cards)
             self.face_up_cards = []
             for _ in range(5):
-                if self.train_cards:
+                if self._top or self._discard:
                     self.face_up_cards.append(self.draw_train_card())
-            
-            # Check again (recursive call)
-            self.check_and_replace_wilds()
 
 class Player:
     """Base class for all players (human and AI)"""
     def __init__(self, name):
         self.name = name
-        self.trains = 45
+        self.trains = STARTING_TRAINS
         self.hand = []
         self.tickets = []
         self.score = 0
+        self.connections = CityUnionFind()  # cities joined by claimed routes
 
     def choose_action(self, game_state):
         """Must be implemented by subclasses"""
         raise NotImplementedError
 
+    def copy(self):
+        """Copy the player, with its own hand and ticket lists"""
+        player = copy.copy(self)
+        player.hand = list(self.hand)
+        player.tickets = list(self.tickets)
+        player.connections = self.connections.copy()
+        return player
+
+    def choose_face_up_card(self, deck, second=False):
+        """
+        Pick the index of a face-up card to take
+        Only called when an action does not carry its face-up choices;
+        AI players are expected to put them in the action dict.
+        """
+        raise NotImplementedError
+
     def draw_initial_cards(self, deck):
         for _ in range(4):
             self.hand.append(deck.draw_train_card())
 
     def calculate_route_score(self, length):
-        if length == 1:
-            return 1
-        elif length == 2:
-            return 2
-        elif length == 3:
-            return 4
-        elif length == 4:
-            return 7
-        elif length == 5:
-            return 10
-        elif length == 6:
-            return 15
+        if 0 < length < len(ROUTE_POINTS):
+            return ROUTE_POINTS[length]
         
+    def ticket_score(self):
+        """
+        Running ticket score from the routes claimed so far
+        Tickets already connected count for their points, the rest against.
+        """
+        return self.connections.ticket_score(self.tickets)
+
     def add_tickets(self, tickets):
         """Add specified tickets to the player's hand"""
         self.tickets.extend(tickets)
@@ -164,15 +277,24 @@ class HumanPlayer(Player):
             print("Invalid choice. Try again.")
             return self._choose_draw_train_cards()
     
+    def choose_face_up_card(self, deck, second=False):
+        label = "a second face-up card" if second else "a face-up card"
+        print(f"Choose {label} (0-{len(deck.face_up_cards) - 1}):", deck.face_up_cards)
+        try:
+            return int(input("Enter your choice: "))
+        except ValueError:
+            return -1
+
     def _choose_claim_route(self, board):
         print("Choose a route to claim:")
-        for i, (city1, city2, data) in enumerate(board.graph.edges(data=True)):
+        routes = list(board.to_networkx().edges(data=True))
+        for i, (city1, city2, data) in enumerate(routes):
             if 'claimed' not in data:  # Only show unclaimed routes
                 print(f"{i}: {city1} to {city2} ({data['color']}, {data['length']})")
         
         try:
             route_choice = int(input("Enter the route number: "))
-            route = list(board.graph.edges(data=True))[route_choice]
+            route = routes[route_choice]
             
             if 'claimed' in route[2]:
                 print("This route is already claimed. Choose another.")
@@ -0,0 +1,220 @@
+"""End-of-game and running score helpers"""
+from ttr_ga.utils.profiling import timed
+
+
+class CityUnionFind:
+    """
+    Disjoint sets of cities joined by one player's routes
+
+    Claiming a route is a union, so keeping it up to date costs O(α(n)) per
+    claim, and "is this ticket complete" is a pair of finds.
+    """
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    @classmethod
+    def from_routes(cls, routes):
+        """Build the sets from (city1, city2, ...) tuples"""
+        network = cls()
+        for route in routes:
+            network.union(route[0], route[1])
+        return network
+
+    def copy(self):
+        network = CityUnionFind.__new__(CityUnionFind)
+        network.parent = dict(self.parent)
+        network.size = dict(self.size)
+        return network
+
+    def find(self, city):
+        """Return the representative city of a set; unseen cities are their own set"""
+        parent = self.parent
+        while True:
+            up = parent.get(city, city)
+            if up == city:
+                return city
+            # Path halving: point at the grandparent and jump there
+            grandparent = parent.get(up, up)
+            parent[city] = grandparent
+            city = grandparent
+
+    def union(self, city1, city2):
+        """Join the sets of two cities, the smaller under the larger"""
+        root1 = self.find(city1)
+        root2 = self.find(city2)
+        if root1 == root2:
+            return
+
+        size = self.size
+        size1 = size.get(root1, 1)
+        size2 = size.get(root2, 1)
+        if size1 < size2:
+            root1, root2 = root2, root1
+        self.parent[root2] = root1
+        self.parent.setdefault(root1, root1)
+        size[root1] = size1 + size2
+
+    def connected(self, city1, city2):
+        return self.find(city1) == self.find(city2)
+
+    def ticket_score(self, tickets):
+        """Points for completed tickets minus points for incomplete ones"""
+        score = 0
+        for city1, city2, points in tickets:
+            if self.find(city1) == self.find(city2):
+                score += points
+            else:
+                score -= points
+        return score
+
+
+def longest_trail(routes):
+    """
+    Total length of the longest trail through a set of routes
+
+    A trail may pass through a city more than once but uses every route at
+    most once, as in the longest continuous path bonus. routes is a list of
+    (city1, city2, length); parallel routes are kept apart.
+    """
+    adjacency = {}
+    for edge, (city1, city2, length) in enumerate(routes):
+        bit = 1 << edge
+        adjacency.setdefault(city1, []).append((bit, city2, length))
+        adjacency.setdefault(city2, []).append((bit, city1, length))
+
+    # Continuations only depend on the current city and the routes used,
+    # so one memo serves every starting city
+    memo = {}
+    best = 0
+    for city in adjacency:
+        best = max(best, _longest_from(city, adjacency, 0, memo))
+    return best
+
+
+def _longest_from(city, adjacency, used, memo):
+    """Longest continuation of a trail at city, given the routes used so far"""
+    key = (city, used)
+    best = memo.get(key)
+    if best is not None:
+        return best
+
+    best = 0
+    for bit, other, length in adjacency[city]:
+        if not used & bit:
+            total = length + _longest_from(other, adjacency, used | bit, memo)
+            if total > best:
+                best = total
+    memo[key] = best
+    return best
+
+
+class TrailCache:
+    """
+    Longest trail lengths for subsets of a RouteTable, keyed on route bitmask
+
+    Bit i of a mask stands for route i of the table. Results are kept until
+    max_size entries are stored, then the cache starts over.
+    """
+    def __init__(self, table, max_size=1 << 16):
+        self.table = table
+        self.max_size = max_size
+        self.results = {}
+        self.hits = 0
+        self.misses = 0
+
+    def longest(self, mask):
+        """Longest trail over the routes in mask"""
+        result = self.results.get(mask)
+        if result is not None:
+            self.hits += 1
+            return result
+
+        self.misses += 1
+        table = self.table
+        routes = []
+        route_id = 0
+        bits = mask
+        while bits:
+            if bits & 1:
+                routes.append((table.city1[route_id], table.city2[route_id], table.length[route_id]))
+            bits >>= 1
+            route_id += 1
+
+        result = longest_trail(routes)
+        if len(self.results) >= self.max_size:
+            self.results.clear()
+        self.results[mask] = result
+        return result
+
+
+def trail_cache(table):
+    """The TrailCache shared by every board built on a table"""
+    cache = table.trail_cache
+    if cache is None:
+        cache = table.trail_cache = TrailCache(table)
+    return cache
+
+
+LONGEST_PATH_BONUS = 10
+
+# Points for claiming a route, indexed by its length
+ROUTE_POINTS = (0, 1, 2, 4, 7, 10, 15)
+
+
+def score_game(players, board, instruments=None):
+    """
+    End-of-game scoring for all players at once
+
+    Route ownership is read in a single pass, building every player's ticket
+    network and route set together. The longest path bonus goes to every
+    player tied for the longest trail. Players are not modified; returns one
+    breakdown dict per player, in seat order. Ticket checks and longest
+    paths are timed per player into instruments, if given.
+    """
+    names = [player.name for player in players]
+    networks = {name: CityUnionFind() for name in names}
+
+    if hasattr(board, 'owner'):
+        table = board.table
+        cities = table.cities
+        masks = dict.fromkeys(names, 0)
+        for route_id, seat in enumerate(board.owner):
+            if seat != board.UNCLAIMED:
+                name = board.names[seat]
+                if name in masks:
+                    masks[name] |= 1 << route_id
+                    networks[name].union(cities[table.city1[route_id]], cities[table.city2[route_id]])
+        cache = trail_cache(table)
+        trails = {}
+        for name, mask in masks.items():
+            with timed(instruments, "longest_continuous_path"):
+                trails[name] = cache.longest(mask)
+    else:
+        routes = {name: [] for name in names}
+        for city1, city2, data in board.graph.edges(data=True):
+            name = data.get('claimed')
+            if name in routes:
+                routes[name].append((city1, city2, data['length']))
+                networks[name].union(city1, city2)
+        trails = {}
+        for name, owned in routes.items():
+            with timed(instruments, "longest_continuous_path"):
+                trails[name] = longest_trail(owned)
+
+    longest = max(trails.values(), default=0)
+    breakdown = []
+    for player in players:
+        with timed(instruments, "check_tickets"):
+            ticket_points = networks[player.name].ticket_score(player.tickets)
+        trail = trails[player.name]
+        bonus = LONGEST_PATH_BONUS if longest > 0 and trail == longest else 0
+        breakdown.append({
+            "name": player.name,
+            "route_points": player.score,
+            "ticket_points": ticket_points,
+            "longest_trail": trail,
+            "longest_bonus": bonus,
+            "total": player.score + ticket_points + bonus,
+        })
+    return breakdown
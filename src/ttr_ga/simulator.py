@@ -0,0 +1,173 @@
+"""Headless engine for AI-vs-AI games
+
+Runs complete games between agents.agent.Agent instances with no console
+I/O: boards and decks are built without a sink, face-up choices come from
+the action dicts and progress is only reported to an optional event sink.
+"""
+import random
+import time
+
+from ttr_ga.board import CompactBoard
+from ttr_ga.events import emit
+from ttr_ga.game import execute_action, final_scoring, setup_game
+from ttr_ga.player import Deck, Player
+from ttr_ga.trajectory import action_id
+from ttr_ga.utils.rng import deck_seed, derive_seed
+from ttr_ga.utils.state import GameState
+
+
+class Simulator:
+    """
+    Plays games between a fixed line-up of agents
+
+    Agents take seats in the order given; agent i plays as players[i] of
+    the GameState passed to choose_action. Games that have not ended after
+    max_turns rounds are stopped and scored as is. An agent with no legal
+    action passes by returning None; a full round of passes (the decks ran
+    dry) also stops the game.
+
+    Deals are shuffled from the global random module unless a seed is
+    given, in which case every game gets its own stream drawn from it. A
+    deal seed fixes one game's shuffles exactly, for replaying a deal or
+    comparing agents on the same deals.
+
+    An utils.profiling.Instrumentation passed as instruments accumulates
+    per-phase times and deck event counts over every game played. A
+    trajectory.TrajectoryWriter passed as recorder logs every move and
+    the final scoring of every game.
+    """
+    def __init__(self, agents, board_factory=CompactBoard, max_turns=500, sink=None, seed=None,
+                 instruments=None, recorder=None):
+        self.agents = agents
+        self.board_factory = board_factory
+        self.max_turns = max_turns
+        self.sink = sink
+        self.rng = None if seed is None else random.Random(seed)
+        self.instruments = instruments
+        self.recorder = recorder
+
+    def new_game(self, deal_seed=None):
+        """Deal a fresh game and return its GameState"""
+        if deal_seed is None and self.rng is not None:
+            deal_seed = self.rng.getrandbits(64)
+        rng = None if deal_seed is None else random.Random(deck_seed(deal_seed))
+        board = self.board_factory(sink=None)
+        deck = Deck(sink=None if self.instruments is None else self.instruments.sink(), rng=rng)
+        deck.check_and_replace_wilds()
+        players = [Player(agent.name) for agent in self.agents]
+        setup_game(players, deck, sink=None)
+        return GameState(board, players, 0, deck, sink=None)
+
+    def play_game(self, deal_seed=None):
+        """
+        Play one game to the end, on the given deal if deal_seed is set
+        Returns a dict with the final scores, the winner's seat, the number
+        of turns, whether the game finished before max_turns and the
+        per-player breakdown from scoring.score_game.
+        """
+        instruments = self.instruments
+        start = time.perf_counter()  # for the "game" phase
+        game_state = self.new_game(deal_seed)
+        players = game_state.players
+        sink = self.sink
+        recorder = self.recorder
+        if recorder is not None:
+            game = recorder.begin_game()
+            step = 0
+        passes = 0
+
+        while not game_state.game_over and game_state.turn <= self.max_turns and passes < len(players):
+            seat = game_state.current_player_idx
+            agent = self.agents[seat]
+            if recorder is not None:
+                features, score = recorder.encode(game_state), players[seat].score
+            if instruments is None:
+                action = agent.choose_action(game_state)
+                if action is not None:
+                    execute_action(players[seat], action, game_state)
+            else:
+                action = instruments.call("choose_action", agent.choose_action, game_state)
+                if action is not None:
+                    instruments.call("execute_action", execute_action, players[seat], action, game_state)
+            passes = passes + 1 if action is None else 0
+            if recorder is not None and action is not None:
+                recorder.record(game, step, seat, features, action_id(game_state, action), players[seat].score - score)
+                step += 1
+            emit(sink, "action", f"{agent.name}: {action}", seat=seat, action=action)
+            agent.observe_outcome(action, game_state, 0)
+            game_state.end_turn()
+
+        before = [player.score for player in players]
+        breakdown = final_scoring(players, game_state.board, sink=None, instruments=instruments)
+        scores = [player.score for player in players]
+        winner = scores.index(max(scores))
+        if recorder is not None:
+            recorder.end_game(game, step, game_state, [score - b for score, b in zip(scores, before)])
+        result = {
+            "scores": scores,
+            "winner": winner,
+            "turns": game_state.turn,
+            "finished": game_state.game_over,
+            "breakdown": breakdown,
+        }
+        emit(sink, "game_over", f"{players[winner].name} wins with {scores[winner]} points", **result)
+        if instruments is not None:
+            instruments.seconds["game"] += time.perf_counter() - start
+            instruments.count("game")
+        return result
+
+    def run(self, games, deal_seeds=None):
+        """
+        Play a number of games back to back, optionally on given deal seeds
+        Returns the per-game results along with the elapsed time and the
+        games/second rate, for sizing GA generations. With fewer deal seeds
+        than games only one game per seed is played.
+        """
+        deal_seeds = deal_seeds or [None] * games
+        start = time.perf_counter()
+        results = [self.play_game(deal_seed) for deal_seed in deal_seeds[:games]]
+        elapsed = time.perf_counter() - start
+        return {
+            "results": results,
+            "seconds": elapsed,
+            "games_per_second": len(results) / elapsed if elapsed > 0 else float("inf"),
+        }
+
+
+def main(argv=None):
+    """Play a batch of random-agent games and report where the time goes"""
+    import argparse
+    import cProfile
+    import pstats
+
+    from ttr_ga.agents.agent import RandomAgent
+    from ttr_ga.utils.profiling import Instrumentation
+
+    parser = argparse.ArgumentParser(prog="python -m ttr_ga.simulator", description=main.__doc__)
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-turns", type=int, default=500)
+    parser.add_argument("--profile", metavar="FILE",
+                        help="run under cProfile and write pstats to FILE instead of timing phases")
+    args = parser.parse_args(argv)
+
+    agents = [RandomAgent(i, f"Random {i + 1}", rng=random.Random(derive_seed(args.seed, i)))
+              for i in range(args.players)]
+    if args.profile:
+        simulator = Simulator(agents, max_turns=args.max_turns, seed=args.seed)
+        profiler = cProfile.Profile()
+        report = profiler.runcall(simulator.run, args.games)
+        profiler.dump_stats(args.profile)
+        print(f"{args.games} games in {report['seconds']:.2f} s, profile written to {args.profile}")
+        pstats.Stats(args.profile).sort_stats("cumulative").print_stats(15)
+    else:
+        instruments = Instrumentation()
+        simulator = Simulator(agents, max_turns=args.max_turns, seed=args.seed, instruments=instruments)
+        report = simulator.run(args.games)
+        print(f"{args.games} games in {report['seconds']:.2f} s ({report['games_per_second']:.1f} games/s)")
+        print(instruments.table())
+
+
+if __name__ == "__main__":
+    main()
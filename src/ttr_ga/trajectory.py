@@ -0,0 +1,246 @@
+"""Binary logs of played games
+
+A trajectory log is a directory of append-only chunk files. Each chunk
+is a 64 byte header followed by fixed-width little-endian records, one
+per move:
+
+    game      u8   game number, unique within the log
+    reward    f4   points the move scored for the seat that made it
+    step      u2   move number within the game
+    action    i2   action id (actions.ActionSpace), -1 on terminal records
+    seat      u1   seat that moved
+    done      u1   1 on terminal records
+    features  f4[n] the position before the move, from the mover's view
+
+When a game ends every seat gets a terminal record holding the final
+position from its view and the points final scoring gave it (tickets and
+longest path). Features default to observation.encode_observation; the
+header stores the feature count, so any fixed-size encoder can be logged.
+
+TrajectoryWriter buffers records and appends them to the current chunk,
+starting a new one every chunk_records records; reopening a log appends
+to it. Pass one as Simulator(..., recorder=...) to log every game played.
+TrajectoryReader maps the chunks read-only with numpy.memmap, so fields
+are views of the page cache and only the records touched are read.
+Records cut short by a crash are ignored.
+"""
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from ttr_ga.actions import action_space
+from ttr_ga.observation import encode_observation
+
+MAGIC = b"TTRTRAJ\0"
+FORMAT_VERSION = 1
+HEADER_SIZE = 64
+HEADER = struct.Struct("<8sIII")  # magic, version, feature count, record size
+CHUNK_PATTERN = "chunk-{:06d}.traj"
+TERMINAL = -1
+
+
+def record_dtype(features):
+    """The record layout for a feature count"""
+    return np.dtype([
+        ("game", "<u8"),
+        ("reward", "<f4"),
+        ("step", "<u2"),
+        ("action", "<i2"),
+        ("seat", "u1"),
+        ("done", "u1"),
+        ("_", "V2"),  # keeps the features 4-byte aligned
+        ("features", "<f4", (features,)),
+    ])
+
+
+def _chunk_paths(directory):
+    return sorted(Path(directory).glob("chunk-*.traj"))
+
+
+def _read_header(path):
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE:
+        raise ValueError(f"{path} is not a trajectory chunk")
+    magic, version, features, itemsize = HEADER.unpack_from(header)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a trajectory chunk")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"{path} is format version {version}, expected {FORMAT_VERSION}")
+    dtype = record_dtype(features)
+    if dtype.itemsize != itemsize:
+        raise ValueError(f"{path} has {itemsize} byte records, expected {dtype.itemsize}")
+    return dtype
+
+
+def _records_in(path, dtype):
+    return (path.stat().st_size - HEADER_SIZE) // dtype.itemsize
+
+
+class TrajectoryWriter:
+    """
+    Appends records to a trajectory log
+
+    encoder(state, seat) returns the float32 features of a position from a
+    seat's view; every call must return the same number of features.
+    encode() copies them, so encoders may reuse their output buffer.
+    Records are buffered in memory and written every buffer_records
+    records, on flush() and on close().
+    """
+    def __init__(self, directory, encoder=encode_observation, chunk_records=1 << 16, buffer_records=4096):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.encoder = encoder
+        self.chunk_records = chunk_records
+        self.buffer_records = buffer_records
+        self.dtype = None
+        self._buffer = None
+        self._pending = 0
+        self._file = None
+        self._chunk_used = 0
+        self.records = 0
+
+        paths = _chunk_paths(self.directory)
+        self._next_chunk = int(paths[-1].stem.split("-")[1]) + 1 if paths else 0
+        self._next_game = 0
+        if paths:
+            reader = TrajectoryReader(self.directory)
+            self.dtype = reader.dtype
+            if len(reader):
+                self._next_game = int(reader.field("game")[-1][-1]) + 1
+            reader.close()
+
+    def begin_game(self):
+        """A new game number"""
+        game = self._next_game
+        self._next_game += 1
+        return game
+
+    def encode(self, state, seat=None):
+        return np.array(self.encoder(state, state.current_player_idx if seat is None else seat), dtype=np.float32)
+
+    def record(self, game, step, seat, features, action, reward=0.0, done=False):
+        """Buffer one record"""
+        if self._buffer is None:
+            if self.dtype is None:
+                self.dtype = record_dtype(len(features))
+            self._buffer = np.zeros(self.buffer_records, dtype=self.dtype)
+        self._buffer[self._pending] = (game, reward, step, action, seat, done, b"", features)
+        self._pending += 1
+        self.records += 1
+        if self._pending == self.buffer_records:
+            self.flush()
+
+    def end_game(self, game, step, state, rewards):
+        """Terminal records for every seat, with the final position and its final scoring points"""
+        for seat, reward in enumerate(rewards):
+            self.record(game, step, seat, self.encode(state, seat), TERMINAL, reward, done=True)
+
+    def flush(self):
+        """Append the buffered records to the chunk files"""
+        start = 0
+        while start < self._pending:
+            if self._file is None or self._chunk_used == self.chunk_records:
+                self._open_chunk()
+            count = min(self._pending - start, self.chunk_records - self._chunk_used)
+            self._file.write(self._buffer[start:start + count].tobytes())
+            self._chunk_used += count
+            start += count
+        if self._file is not None:
+            self._file.flush()
+        self._pending = 0
+
+    def _open_chunk(self):
+        if self._file is not None:
+            self._file.close()
+        path = self.directory / CHUNK_PATTERN.format(self._next_chunk)
+        self._next_chunk += 1
+        self._file = open(path, "xb")
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, self.dtype["features"].shape[0], self.dtype.itemsize)
+        self._file.write(header.ljust(HEADER_SIZE, b"\0"))
+        self._chunk_used = 0
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TrajectoryReader:
+    """
+    Read-only view of a trajectory log
+
+    chunks holds one structured memmap per chunk file; field(name) gives
+    the per-chunk views of one field. Integer indexing and sample() copy
+    only the records they return.
+    """
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.dtype = None
+        self.chunks = []
+        for path in _chunk_paths(self.directory):
+            dtype = _read_header(path)
+            if self.dtype is None:
+                self.dtype = dtype
+            elif dtype != self.dtype:
+                raise ValueError(f"{path} has {dtype['features'].shape[0]} features, "
+                                 f"expected {self.dtype['features'].shape[0]}")
+            count = _records_in(path, dtype)
+            if count > 0:
+                self.chunks.append(np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(count,)))
+        self.offsets = np.cumsum([0] + [len(chunk) for chunk in self.chunks])
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        chunk = int(np.searchsorted(self.offsets, index, side="right")) - 1
+        return self.chunks[chunk][index - self.offsets[chunk]]
+
+    def field(self, name):
+        """The field in every chunk, as views"""
+        return [chunk[name] for chunk in self.chunks]
+
+    def sample(self, count, rng=None):
+        """count records drawn uniformly with replacement, as one array"""
+        rng = np.random.default_rng(rng)
+        indices = np.sort(rng.integers(len(self), size=count))
+        chunks = np.searchsorted(self.offsets, indices, side="right") - 1
+        out = np.empty(count, dtype=self.dtype)
+        for chunk in np.unique(chunks):
+            selected = chunks == chunk
+            out[selected] = self.chunks[chunk][indices[selected] - self.offsets[chunk]]
+        return out
+
+    def close(self):
+        """Drop the memory maps (views taken from them stay valid until released)"""
+        self.chunks = []
+        self.offsets = np.zeros(1, dtype=np.int64)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def action_id(game_state, action):
+    """The id of an action an agent returned, dict or id"""
+    if isinstance(action, dict):
+        return action_space(getattr(game_state.board, "table", None)).encode(action)
+    return int(action)
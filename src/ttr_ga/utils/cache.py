@@ -0,0 +1,18 @@
+"""On-disk cache location for precomputed data"""
+import os
+from pathlib import Path
+
+
+def cache_dir():
+    """
+    Where precomputed files are cached
+    TTR_GA_CACHE if set, else _cache next to the package when writable,
+    else the user cache directory.
+    """
+    configured = os.environ.get("TTR_GA_CACHE")
+    if configured:
+        return Path(configured)
+    local = Path(__file__).resolve().parent.parent / "_cache"
+    if os.access(local if local.exists() else local.parent, os.W_OK):
+        return local
+    return Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "ttr_ga"
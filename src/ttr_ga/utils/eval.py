@@ -0,0 +1,468 @@
+"""Adaptive fitness evaluation
+
+Single games are a noisy measure of a genome, so a fixed evaluation
+plays many games for every genome, including the ones that are clearly
+hopeless after a handful. RacingEvaluator races the population instead:
+
+    every genome plays min_games games
+    while some genome's side of the selection cutoff is still uncertain:
+        drop genomes whose confidence interval lies entirely below the
+        top-th best lower bound (clearly not selected) or entirely above
+        the (top + 1)-th best upper bound (clearly selected)
+        play batch more games for the genomes that are left
+
+A genome stops at max_games at the latest. Genomes far from the cutoff
+leave the race early and the ones near it get the most games, so
+selection of the top genomes matches a full max_games evaluation at a
+fraction of the games.
+
+Confidence intervals use each genome's sample variance, shrunk toward
+the variance pooled over the population so that a few tied games do not
+look certain.
+
+Tournament compares any agents. Entrants are named factories called as
+factory(player_id, name, rng=...). A match is a lineup of 2-5 entrants
+on one deal, played once per seat rotation on the same deal seed, so
+every entrant gets every seat on the same cards. Matches run across a
+process pool and each result is appended to a JSON lines file as soon as
+it is in; a rerun with the same file only plays the missing matches.
+
+Ratings are Elo-scaled Bradley-Terry strengths fitted to the pairwise
+finishes of every game (a game of n players counts as n(n-1)/2
+pairings), with standard errors from the Fisher information. Unlike
+sequential Elo updates they do not depend on the order in which matches
+finish.
+"""
+import itertools
+import json
+import math
+import os
+import random
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import numpy as np
+
+from ttr_ga.agents.agent import RandomAgent
+from ttr_ga.agents.ga import game_margins, task_seed
+from ttr_ga.board import CompactBoard
+from ttr_ga.simulator import Simulator
+from ttr_ga.utils.rng import derive_seed, seat_seed
+
+PRIOR_GAMES = 2  # weight of the pooled variance, in games
+
+
+def race(play, count, top, min_games=4, max_games=32, batch=4, z=1.96):
+    """
+    Race count candidates for the top places
+    play(requests) takes [(candidate, game numbers)] and returns the
+    margins of each request. Returns the mean margin and the number of
+    games of every candidate.
+    """
+    margins = [[] for _ in range(count)]
+    active = np.ones(count, dtype=bool)
+    step = min_games
+    while active.any():
+        requests = [(i, range(len(margins[i]), min(len(margins[i]) + step, max_games)))
+                    for i in np.flatnonzero(active)]
+        for (i, _), results in zip(requests, play(requests)):
+            margins[i].extend(results)
+        step = batch
+
+        games = np.array([len(m) for m in margins])
+        means = np.array([np.mean(m) for m in margins])
+        squares = np.array([np.sum((np.asarray(m) - mean) ** 2) for m, mean in zip(margins, means)])
+        pooled = squares.sum() / max(games.sum() - count, 1)
+        variance = (squares + PRIOR_GAMES * pooled) / (games - 1 + PRIOR_GAMES)
+        half = z * np.sqrt(variance / games)
+        lower, upper = means - half, means + half
+
+        if top >= count:
+            break  # everyone is selected, there is nothing to race for
+        out = upper < np.sort(lower)[-top]
+        settled = lower > np.sort(upper)[-top - 1]
+        active &= ~(out | settled) & (games < max_games)
+    return means, games
+
+
+_WORKER_SETTINGS = None
+
+
+def _init_worker(settings):
+    global _WORKER_SETTINGS
+    _WORKER_SETTINGS = settings
+
+
+def _margins_task(task):
+    genome, seed, games = task
+    return game_margins(genome, games, seed=seed, **_WORKER_SETTINGS)
+
+
+class RacingEvaluator:
+    """
+    Drop-in replacement for FitnessEvaluator that races genomes
+
+    top is the number of genomes selection cares about (half the
+    population by default); with an Evolution that is at least its elite.
+    Seeds, pairing and workers work as in FitnessEvaluator, and a genome's
+    first n games are the same ones a fixed evaluation with games=n plays.
+    The games each genome got in the last call are in last_games.
+    """
+    def __init__(self, opponents=(RandomAgent,), min_games=4, max_games=32, batch=4, top=None, z=1.96,
+                 players=2, max_turns=500, workers=None, seed=0, paired=True):
+        if not 0 < min_games <= max_games:
+            raise ValueError("need 0 < min_games <= max_games")
+        self.settings = {
+            "opponents": tuple(opponents),
+            "players": players,
+            "max_turns": max_turns,
+        }
+        self.min_games = min_games
+        self.max_games = max_games
+        self.batch = batch
+        self.top = top
+        self.z = z
+        self.workers = workers
+        self.seed = seed
+        self.paired = paired
+        self.last_games = None
+        self.games_played = 0
+        self._pool = None
+
+    def evaluate(self, population, generation=0):
+        """Mean margin of every genome in population over the games it was raced on"""
+        population = np.asarray(population, dtype=np.float32)
+        seeds = [task_seed(self.seed, generation, 0 if self.paired else index) for index in range(len(population))]
+
+        def play(requests):
+            tasks = [(population[i], seeds[i], tuple(games)) for i, games in requests]
+            if self.workers == 1:
+                return [game_margins(genome, games, seed=seed, **self.settings) for genome, seed, games in tasks]
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.settings,))
+            return list(self._pool.map(_margins_task, tasks))
+
+        top = min(self.top or max(len(population) // 2, 1), len(population))
+        fitness, games = race(play, len(population), top, self.min_games, self.max_games, self.batch, self.z)
+        self.last_games = games
+        self.games_played += int(games.sum())
+        return fitness.astype(np.float64)
+
+    def close(self):
+        """Shut down the worker pool"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+ELO_SCALE = 400 / math.log(10)  # Elo points per unit of log strength
+PRIOR_DRAWS = 1.0  # virtual drawn games between every two entrants, keeps unbeaten ratings finite
+
+
+def round_robin(names, players=2):
+    """Every lineup of players distinct entrants"""
+    return list(itertools.combinations(names, players))
+
+
+def gauntlet(challenger, names, players=2):
+    """Every lineup of the challenger and players - 1 of the other entrants"""
+    return [(challenger,) + others for others in itertools.combinations(
+        [name for name in names if name != challenger], players - 1)]
+
+
+def rotations(lineup):
+    """The lineup in every cyclic seat order"""
+    return [tuple(lineup[(start + seat) % len(lineup)] for seat in range(len(lineup)))
+            for start in range(len(lineup))]
+
+
+def play_match(entrants, seats, deal_seed, max_turns=500):
+    """Play one game with entrants seated in the given order, returning its scores"""
+    agents = [entrants[name](seat, name, rng=random.Random(seat_seed(deal_seed, seat)))
+              for seat, name in enumerate(seats)]
+    result = Simulator(agents, board_factory=CompactBoard, max_turns=max_turns).play_game(deal_seed)
+    return {"scores": result["scores"], "turns": result["turns"], "finished": result["finished"]}
+
+
+_TOURNAMENT = None
+
+
+def _init_tournament(entrants, max_turns):
+    global _TOURNAMENT
+    _TOURNAMENT = (entrants, max_turns)
+
+
+def _match_task(task):
+    match_id, seats, deal_seed = task
+    entrants, max_turns = _TOURNAMENT
+    return match_id, play_match(entrants, seats, deal_seed, max_turns)
+
+
+class Tournament:
+    """
+    Plays lineups of entrants on deals deals each, every seat rotation per deal
+
+    entrants maps names to agent factories (picklable when workers != 1).
+    lineups defaults to a round robin of players-player lineups. With an
+    output path results are streamed there and matches already in the
+    file are not replayed.
+    """
+    def __init__(self, entrants, players=2, deals=10, lineups=None, seed=0, max_turns=500, workers=None,
+                 output=None):
+        if not 2 <= players <= 5:
+            raise ValueError("matches take 2 to 5 players")
+        self.entrants = dict(entrants)
+        self.lineups = [tuple(lineup) for lineup in (lineups or round_robin(list(self.entrants), players))]
+        for lineup in self.lineups:
+            unknown = set(lineup) - set(self.entrants)
+            if unknown:
+                raise ValueError(f"unknown entrants {sorted(unknown)}")
+            if len(set(lineup)) != len(lineup):
+                raise ValueError(f"lineup {lineup} seats an entrant twice")
+        self.deals = deals
+        self.seed = seed
+        self.max_turns = max_turns
+        self.workers = workers
+        self.output = None if output is None else Path(output)
+        self.results = []
+
+    def schedule(self):
+        """(match id, seats, deal seed) of every match, in a fixed order"""
+        matches = []
+        for index, lineup in enumerate(self.lineups):
+            for deal in range(self.deals):
+                deal_seed = derive_seed(self.seed, index, deal)
+                for seats in rotations(lineup):
+                    matches.append((len(matches), seats, deal_seed))
+        return matches
+
+    def _load(self, matches):
+        """
+        Results already streamed to the output file, checked against the schedule
+        Returns them, one per match, and the size in bytes of the complete
+        lines they were read from.
+        """
+        if self.output is None or not self.output.exists():
+            return [], 0
+        results = []
+        seen = set()
+        size = 0
+        with open(self.output, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # a torn final line of an interrupted run is cut off and replayed
+                size += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    result = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                match_id = result["match"]
+                if match_id >= len(matches) or tuple(result["seats"]) != matches[match_id][1] \
+                        or result["deal_seed"] != matches[match_id][2]:
+                    raise ValueError(f"{self.output} holds results of a different tournament")
+                if match_id not in seen:  # a match recorded twice only counts once
+                    seen.add(match_id)
+                    results.append(result)
+        return results, size
+
+    def run(self, callback=None):
+        """
+        Play every match not played yet, calling callback(result) as each comes in
+        Returns all results, including the ones loaded from the output file.
+        """
+        matches = self.schedule()
+        self.results, size = self._load(matches)
+        done = {result["match"] for result in self.results}
+        todo = [match for match in matches if match[0] not in done]
+        out = None
+        if self.output is not None:
+            if self.output.exists() and self.output.stat().st_size > size:
+                os.truncate(self.output, size)  # new results start on a line of their own
+            out = open(self.output, "a")
+
+        def record(match_id, outcome):
+            _, seats, deal_seed = matches[match_id]
+            result = {"match": match_id, "seats": list(seats), "deal_seed": deal_seed, **outcome}
+            self.results.append(result)
+            if out is not None:
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+            if callback is not None:
+                callback(result)
+
+        try:
+            if self.workers == 1:
+                for match_id, seats, deal_seed in todo:
+                    record(match_id, play_match(self.entrants, seats, deal_seed, self.max_turns))
+            elif todo:
+                with ProcessPoolExecutor(self.workers, initializer=_init_tournament,
+                                         initargs=(self.entrants, self.max_turns)) as pool:
+                    pending = {pool.submit(_match_task, match) for match in todo}
+                    while pending:
+                        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            record(*future.result())
+        finally:
+            if out is not None:
+                out.close()
+        self.results.sort(key=lambda result: result["match"])
+        return self.results
+
+    def standings(self):
+        """Ratings of the entrants from the results so far, see elo_ratings"""
+        return elo_ratings(self.results, list(self.entrants))
+
+
+def pairwise_wins(results, names):
+    """(wins, games) matrices: wins[i, j] is how often i finished above j, ties counting half"""
+    index = {name: i for i, name in enumerate(names)}
+    wins = np.zeros((len(names), len(names)))
+    for result in results:
+        seats = [index[name] for name in result["seats"]]
+        scores = result["scores"]
+        for a, b in itertools.combinations(range(len(seats)), 2):
+            i, j = seats[a], seats[b]
+            if scores[a] > scores[b]:
+                wins[i, j] += 1
+            elif scores[a] < scores[b]:
+                wins[j, i] += 1
+            else:
+                wins[i, j] += 0.5
+                wins[j, i] += 0.5
+    return wins, wins + wins.T
+
+
+def elo_ratings(results, names, anchor=1500, iterations=1000, tolerance=1e-10):
+    """
+    Elo-scaled Bradley-Terry ratings with 95% intervals, best first
+    Ratings average to anchor. Each entry holds the name, rating,
+    standard error, low and high bounds, games played, pairwise win
+    share and mean score.
+    """
+    count = len(names)
+    wins, games = pairwise_wins(results, names)
+    wins = wins + PRIOR_DRAWS / 2 * (1 - np.eye(count))
+    games = games + PRIOR_DRAWS * (1 - np.eye(count))
+
+    # Minorization-maximization updates of the strengths (Hunter 2004)
+    strength = np.ones(count)
+    for _ in range(iterations):
+        updated = wins.sum(axis=1) / (games / (strength[:, None] + strength[None, :])).sum(axis=1)
+        updated /= np.exp(np.log(updated).mean())
+        converged = np.abs(updated - strength).max() < tolerance
+        strength = updated
+        if converged:
+            break
+
+    # Covariance of the log strengths: pseudo-inverse of the Fisher information, centered
+    p = strength[:, None] * strength[None, :] / (strength[:, None] + strength[None, :]) ** 2
+    information = -games * p
+    information[np.diag_indices(count)] = (games * p).sum(axis=1)
+    error = ELO_SCALE * np.sqrt(np.clip(np.diag(np.linalg.pinv(information)), 0, None))
+    ratings = anchor + ELO_SCALE * np.log(strength)
+
+    played = {name: 0 for name in names}
+    points = {name: 0 for name in names}
+    for result in results:
+        for name, score in zip(result["seats"], result["scores"]):
+            played[name] += 1
+            points[name] += score
+    real_wins, real_games = pairwise_wins(results, names)
+    standings = []
+    for i, name in enumerate(names):
+        standings.append({
+            "name": name,
+            "rating": float(ratings[i]),
+            "error": float(error[i]),
+            "low": float(ratings[i] - 1.96 * error[i]),
+            "high": float(ratings[i] + 1.96 * error[i]),
+            "games": played[name],
+            "win_share": float(real_wins[i].sum() / real_games[i].sum()) if real_games[i].sum() else None,
+            "mean_score": points[name] / played[name] if played[name] else None,
+        })
+    return sorted(standings, key=lambda entry: -entry["rating"])
+
+
+def format_standings(standings):
+    lines = [f"{'entrant':24} {'rating':>7} {'95% interval':>15} {'games':>6} {'wins':>6} {'score':>7}"]
+    for entry in standings:
+        wins = "-" if entry["win_share"] is None else f"{entry['win_share']:.1%}"
+        score = "-" if entry["mean_score"] is None else f"{entry['mean_score']:.1f}"
+        lines.append(f"{entry['name']:24} {entry['rating']:7.0f} {entry['low']:7.0f}..{entry['high']:<6.0f} "
+                     f"{entry['games']:6d} {wins:>6} {score:>7}")
+    return "\n".join(lines)
+
+
+def load_entrant(spec):
+    """
+    An agent factory from a command line spec
+    random, mcts or mcts:ITERATIONS, and ga:PATH for a genome saved by
+    the ga CLI (a checkpoint, whose best genome is used), a .npy array or
+    a .json object of feature weights.
+    """
+    import functools
+    import pickle
+
+    from ttr_ga.agents.ga import FEATURES, GeneticAgent
+    from ttr_ga.agents.mcts import MCTSAgent
+
+    kind, _, argument = spec.partition(":")
+    if kind == "random":
+        return RandomAgent
+    if kind == "mcts":
+        return functools.partial(MCTSAgent, iterations=int(argument or 200))
+    if kind == "ga" and argument:
+        path = Path(argument)
+        if path.suffix == ".npy":
+            genome = np.load(path)
+        elif path.suffix == ".json":
+            weights = json.loads(path.read_text())
+            genome = [weights.get(name, 0.0) for name in FEATURES]
+        else:
+            with open(path, "rb") as f:
+                genome = pickle.load(f)["best_genome"]
+        return functools.partial(GeneticAgent, genome=np.asarray(genome, dtype=np.float32))
+    raise ValueError(f"unknown entrant {spec!r}, expected random, mcts[:ITERATIONS] or ga:PATH")
+
+
+def main(argv=None):
+    """Rate agents against each other in a round robin, or a challenger against an archive"""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m ttr_ga.utils.eval", description=main.__doc__)
+    parser.add_argument("entrants", nargs="+", metavar="ENTRANT", help="random, mcts[:ITERATIONS] or ga:PATH")
+    parser.add_argument("--challenger", metavar="ENTRANT", help="only play lineups including this entrant")
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--deals", type=int, default=10, help="deals per lineup, each played in every seat rotation")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-turns", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", metavar="FILE", help="stream results to FILE and resume from it")
+    args = parser.parse_args(argv)
+
+    specs = list(dict.fromkeys(args.entrants + ([args.challenger] if args.challenger else [])))
+    entrants = {spec: load_entrant(spec) for spec in specs}
+    lineups = gauntlet(args.challenger, specs, args.players) if args.challenger else None
+    tournament = Tournament(entrants, players=args.players, deals=args.deals, lineups=lineups, seed=args.seed,
+                            max_turns=args.max_turns, workers=args.workers, output=args.output)
+    total = len(tournament.schedule())
+
+    def progress(result):
+        done = len(tournament.results)
+        if done % max(total // 10, 1) == 0 or done == total:
+            print(f"{done}/{total} matches", flush=True)
+
+    tournament.run(callback=progress)
+    print(format_standings(tournament.standings()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Per-phase timing and call counts for the game loop
+
+An Instrumentation object is passed to game_loop, Simulator or
+score_game to find out where a slow run spends its time. Phases are
+timed with perf_counter around agent decisions, action execution and
+end-of-game scoring; deck events such as reshuffles are counted through
+a sink. Engine code only touches the object when one is given, so an
+uninstrumented game pays for a None check per turn.
+"""
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+# Deck events counted as phases, by event kind
+DECK_EVENTS = {"reshuffle": "deck_reshuffle", "face_up_reset": "face_up_reset"}
+
+_NOT_TIMED = nullcontext()
+
+
+class Instrumentation:
+    """Accumulated wall time and call counts per phase"""
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self.calls = defaultdict(int)
+
+    def call(self, phase, fn, *args):
+        """Call fn(*args), adding its wall time to a phase"""
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.seconds[phase] += time.perf_counter() - start
+            self.calls[phase] += 1
+
+    @contextmanager
+    def phase(self, phase):
+        """Time the body of a with statement as one call of a phase"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[phase] += time.perf_counter() - start
+            self.calls[phase] += 1
+
+    def count(self, phase, calls=1):
+        """Count calls of an untimed phase"""
+        self.calls[phase] += calls
+
+    def sink(self, forward=None):
+        """An event sink counting deck events, passing every event on to forward"""
+        def sink(kind, message, **data):
+            phase = DECK_EVENTS.get(kind)
+            if phase is not None:
+                self.calls[phase] += 1
+            if forward is not None:
+                forward(kind, message, **data)
+        return sink
+
+    def merge(self, other):
+        """Add another instrumentation's totals, e.g. from a worker process"""
+        for phase, seconds in other.seconds.items():
+            self.seconds[phase] += seconds
+        for phase, calls in other.calls.items():
+            self.calls[phase] += calls
+        return self
+
+    def as_dict(self):
+        return {phase: {"calls": self.calls[phase], "seconds": self.seconds.get(phase, 0.0)}
+                for phase in self.calls}
+
+    def table(self, total=None):
+        """
+        Summary table of the phases, slowest first
+        Shares are of total seconds if given, else of the "game" phase.
+        """
+        total = total if total is not None else self.seconds.get("game")
+        lines = [f"{'phase':24} {'calls':>10} {'total s':>10} {'per call':>12} {'share':>7}"]
+        for phase in sorted(self.calls, key=lambda p: (-self.seconds.get(p, 0.0), p)):
+            calls = self.calls[phase]
+            line = f"{phase:24} {calls:10,}"
+            if phase in self.seconds:
+                seconds = self.seconds[phase]
+                line += f" {seconds:10.3f} {seconds / calls * 1e6:9.1f} us"
+                if total:
+                    line += f" {seconds / total:7.1%}"
+            lines.append(line)
+        return "\n".join(lines)
+
+
+def timed(instruments, phase):
+    """instruments.phase(phase), or a no-op context manager without instrumentation"""
+    return _NOT_TIMED if instruments is None else instruments.phase(phase)
@@ -0,0 +1,70 @@
+"""Random streams and seeds
+
+Engine components take an explicit rng: a random.Random or a NumPy
+Generator, both of which provide shuffle() and random(). None stands for
+the global random module, which keeps the interactive game and
+random.seed() working as before.
+"""
+import random
+
+import numpy as np
+
+
+class GlobalRandom:
+    """
+    Draws from the global random module
+    Unlike the module itself it can be deep-copied and pickled, and it looks
+    the module functions up on every call so patching them still works.
+    """
+    def shuffle(self, x):
+        random.shuffle(x)
+
+    def random(self):
+        return random.random()
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return "GLOBAL_RANDOM"
+
+
+GLOBAL_RANDOM = GlobalRandom()
+
+
+def resolve(rng):
+    """The stream to draw from, GLOBAL_RANDOM for None"""
+    return GLOBAL_RANDOM if rng is None else rng
+
+
+def derive_seed(*keys):
+    """
+    A 64-bit seed determined by a sequence of non-negative integers
+    Trailing zero keys are not significant, so callers tag their streams
+    with distinct leading keys rather than appending zeros.
+    """
+    return int(np.random.SeedSequence(list(keys)).generate_state(1, dtype=np.uint64)[0])
+
+
+def deal_seeds(seed, games):
+    """
+    Seeds for a series of deals
+    Games played on the same deal seeds see the same shuffles and the same
+    opponent choices, so two agents can be compared on paired games.
+    """
+    return [derive_seed(seed, game) for game in range(games)]
+
+
+def choice(rng, seq):
+    """Pick an element of a non-empty sequence with either kind of rng"""
+    return seq[int(rng.random() * len(seq))]
+
+
+def deck_seed(deal_seed):
+    """Seed of the deck shuffles for a deal"""
+    return derive_seed(deal_seed, 1)
+
+
+def seat_seed(deal_seed, seat):
+    """Seed of the agent playing a seat in a deal"""
+    return derive_seed(deal_seed, 2, seat)
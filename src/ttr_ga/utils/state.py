@@ -1,56 +1,93 @@
+from ttr_ga.events import print_sink
+from ttr_ga.moves import legal_actions
+
+
 class GameState:
     """Represents the complete state of the game"""
-    def __init__(self, board, players, current_player_idx, deck):
+    def __init__(self, board, players, current_player_idx, deck, sink=print_sink):
         self.board = board
         self.players = players
         self.current_player_idx = current_player_idx
         self.deck = deck
+        self.sink = sink  # where engine messages go, None for silence
         self.game_over = False
         self.final_round = False
         self.final_round_trigger_player = None
-        
+        self.turn = 1
+        self._zobrist = None  # cached zobrist.state_hash, None when unknown
+
     def get_current_player(self):
         """Get the current player"""
         return self.players[self.current_player_idx]
+
+    def end_turn(self):
+        """
+        Finish the current player's turn and pass play on
+        The final round starts once a player is down to two or fewer trains;
+        every player, including that one, then gets one last turn.
+        """
+        if self.final_round:
+            if self.current_player_idx == self.final_round_trigger_player:
+                self.game_over = True
+        elif self.get_current_player().trains <= 2:
+            self.final_round = True
+            self.final_round_trigger_player = self.current_player_idx
+
+        self.current_player_idx = (self.current_player_idx + 1) % len(self.players)
+
+        # Increment turn number if we've looped through all players
+        if self.current_player_idx == 0:
+            self.turn += 1
+        self._zobrist = None
     
     def get_valid_actions(self):
-        """Return all valid actions for the current player"""
-        # This would be used by AI agents to know what moves are legal
-        valid_actions = []
-        
-        # Always valid to draw train cards or tickets
-        valid_actions.append({"action_type": "draw_train_cards"})
-        valid_actions.append({"action_type": "draw_tickets"})
-        
-        # Check for claimable routes
-        player = self.get_current_player()
-        
-        for u, v, data in self.board.graph.edges(data=True):
-            if 'claimed' not in data:  # Route not claimed
-                color = data['color']
-                length = data['length']
-                
-                # Check if player has enough cards
-                if player.hand.count(color) >= length:
-                    valid_actions.append({
-                        "action_type": "claim_route",
-                        "city1": u,
-                        "city2": v,
-                        "color": color
-                    })
-        
-        return valid_actions
+        """Return all valid actions for the current player, see moves.legal_actions"""
+        return legal_actions(self)
     
     def clone(self):
-        """Create a deep copy of the game state (useful for AI simulations)"""
-        # This is a placeholder - a real implementation would need deep copies
-        new_state = GameState(self.board, self.players, self.current_player_idx, self.deck)
+        """
+        Copy the game state (useful for AI simulations)
+        Only the mutable parts are copied: route ownership, hands, tickets
+        and the card piles. Static route data is shared with the original.
+        """
+        new_state = GameState.__new__(GameState)
+        new_state.board = self.board.copy()
+        new_state.players = [player.copy() for player in self.players]
+        new_state.current_player_idx = self.current_player_idx
+        new_state.deck = self.deck.copy()
+        new_state.sink = self.sink
         new_state.game_over = self.game_over
         new_state.final_round = self.final_round
         new_state.final_round_trigger_player = self.final_round_trigger_player
+        new_state.turn = self.turn
+        new_state._zobrist = None  # the copy is usually changed next
         return new_state
     
-    # TODO: apply valid action
     def apply_action(self, action):
-        # Apply action and return new state
-        pass
\ No newline at end of file
+        """
+        Return the state after the current player takes an action
+        This state is left untouched. Turn passing and the final round are
+        handled as in the game loop. If this state's hash is known, the new
+        state's hash is updated from it. Build the state without a sink for
+        rollouts, or every step will be reported.
+        """
+        from ttr_ga.game import execute_action
+        from ttr_ga.zobrist import update_hash
+
+        new_state = self.clone()
+        execute_action(new_state.get_current_player(), action, new_state)
+        new_state.end_turn()
+        if self._zobrist is not None:
+            new_state._zobrist = update_hash(self._zobrist, self, new_state, action)
+        return new_state
+
+    def zobrist_hash(self):
+        """
+        64-bit hash of the position, see zobrist.state_hash
+        Computed once, then updated incrementally by apply_action. Changing
+        the state in place (execute_action, end_turn) drops the cached hash.
+        """
+        if self._zobrist is None:
+            from ttr_ga.zobrist import state_hash
+            self._zobrist = state_hash(self)
+        return self._zobrist
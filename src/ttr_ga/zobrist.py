@@ -0,0 +1,180 @@
+"""Zobrist hashing of game states
+
+A position is hashed as the XOR of random 64-bit keys, one per fact:
+
+    route r owned by seat p
+    seat p holding n cards of color c
+    seat p holding ticket t
+    face-up slot i showing color c
+    n cards in the draw pile, n tickets left
+    n cards of color c in the discard pile
+    seat p to move, final round triggered by seat p
+
+Hands count cards per color and tickets are a set, so states that only
+differ in the order cards were drawn hash the same. The order of the
+hidden piles is left out: the hash identifies what the players can see
+plus their hands, which is what agents decide on. The discard pile is
+public and agents read its colors, so it is hashed by color.
+
+GameState.apply_action updates the hash from the parent's by XORing out
+the facts the action changed and XORing in their new values, instead of
+rehashing the whole position.
+"""
+import hashlib
+
+import numpy as np
+
+from ttr_ga.actions import CLAIM, action_space
+from ttr_ga.board import CompactBoard
+from ttr_ga.common import COLORS
+from ttr_ga.player import TICKETS, TRAIN_CARDS
+
+ZOBRIST_SEED = 0x7A0B
+MAX_SEATS = 5
+MAX_CARDS = len(TRAIN_CARDS) + 1  # card counts 0..110
+MAX_TICKETS = 4 * len(TICKETS)     # ticket pile sizes, larger counts share the last key
+FACE_UP_SLOTS = 5
+
+
+class ZobristKeys:
+    """The random keys for the routes of one table"""
+    def __init__(self, table, seed=ZOBRIST_SEED):
+        rng = np.random.default_rng(seed)
+
+        def keys(*shape):
+            return rng.integers(1, 2 ** 64, size=shape, dtype=np.uint64).tolist()
+
+        self.table = table
+        self.route = keys(len(table), MAX_SEATS)
+        self.hand = keys(MAX_SEATS, len(COLORS), MAX_CARDS)
+        self.face_up = keys(FACE_UP_SLOTS, len(COLORS))
+        self.pile = keys(MAX_CARDS)
+        self.discard = keys(len(COLORS), MAX_CARDS)
+        self.tickets_left = keys(MAX_TICKETS)
+        self.to_move = keys(MAX_SEATS)
+        self.final_round = keys(MAX_SEATS)
+        self._ticket = {}
+
+    def ticket(self, seat, ticket):
+        """Key of a ticket in a seat's hand, derived from its contents so any map works"""
+        key = self._ticket.get((seat, ticket))
+        if key is None:
+            digest = hashlib.blake2b(repr((seat, tuple(ticket))).encode(), digest_size=8).digest()
+            key = self._ticket[seat, ticket] = int.from_bytes(digest, "little")
+        return key
+
+    def player(self, seat, player):
+        """Hash of one seat's hand and tickets"""
+        hand = self.hand[seat]
+        cards = player.hand
+        h = 0
+        for color, name in enumerate(COLORS):
+            h ^= hand[color][cards.count(name)]
+        for ticket in player.tickets:
+            h ^= self.ticket(seat, ticket)
+        return h
+
+    def cards(self, state):
+        """Hash of the face-up layout, pile sizes, the seat to move and the final round"""
+        deck = state.deck
+        face_up = self.face_up
+        h = 0
+        for slot, card in enumerate(deck.face_up_cards):
+            h ^= face_up[slot][COLORS.index(card)]
+        h ^= self.pile[deck.train_cards_left]
+        h ^= self.discarded(deck.discard_codes)
+        h ^= self.tickets_left[min(len(deck.ticket_cards), MAX_TICKETS - 1)]
+        h ^= self.to_move[state.current_player_idx]
+        if state.final_round:
+            h ^= self.final_round[state.final_round_trigger_player]
+        return h
+
+
+    def discarded(self, codes):
+        """Hash of a discard pile, given as COLORS indices"""
+        discard = self.discard
+        h = 0
+        for color in range(len(COLORS)):
+            h ^= discard[color][codes.count(color)]
+        return h
+
+
+def zobrist_keys(table):
+    """The ZobristKeys shared by every board built on a table"""
+    keys = table.zobrist
+    if keys is None:
+        keys = table.zobrist = ZobristKeys(table)
+    return keys
+
+
+def state_hash(state):
+    """Hash a whole position from scratch"""
+    board = state.board
+    if not isinstance(board, CompactBoard):
+        board = CompactBoard.from_board(board)
+    keys = zobrist_keys(board.table)
+    seats = {player.name: seat for seat, player in enumerate(state.players)}
+    h = keys.cards(state)
+    for seat, player in enumerate(state.players):
+        h ^= keys.player(seat, player)
+    for route_id, owner in enumerate(board.owner):
+        if owner != board.UNCLAIMED:
+            h ^= keys.route[route_id][seats[board.names[owner]]]
+    return h
+
+
+def update_hash(h, parent, state, action):
+    """
+    Hash of state, reached from parent by action, given the parent's hash h
+    Only the facts that differ between the two are rehashed: the acting
+    seat's hand and tickets, the face-up slots, pile sizes and discard pile
+    that changed, the routes the action could have claimed and whose turn
+    it is.
+    """
+    if not isinstance(state.board, CompactBoard):
+        return state_hash(state)
+    keys = zobrist_keys(state.board.table)
+    seat = parent.current_player_idx
+
+    before, after = parent.players[seat], state.players[seat]
+    if before.hand != after.hand:
+        hand = keys.hand[seat]
+        for color, name in enumerate(COLORS):
+            old, new = before.hand.count(name), after.hand.count(name)
+            if old != new:
+                h ^= hand[color][old] ^ hand[color][new]
+    if before.tickets != after.tickets:
+        for ticket in set(before.tickets).symmetric_difference(after.tickets):
+            h ^= keys.ticket(seat, ticket)
+
+    old_deck, new_deck = parent.deck, state.deck
+    if old_deck.face_up_cards != new_deck.face_up_cards:
+        for slot, card in enumerate(old_deck.face_up_cards):
+            h ^= keys.face_up[slot][COLORS.index(card)]
+        for slot, card in enumerate(new_deck.face_up_cards):
+            h ^= keys.face_up[slot][COLORS.index(card)]
+    h ^= keys.pile[old_deck.train_cards_left] ^ keys.pile[new_deck.train_cards_left]
+    old_discard, new_discard = old_deck.discard_codes, new_deck.discard_codes
+    if old_discard is not new_discard and old_discard != new_discard:
+        h ^= keys.discarded(old_discard) ^ keys.discarded(new_discard)
+    h ^= (keys.tickets_left[min(len(old_deck.ticket_cards), MAX_TICKETS - 1)]
+          ^ keys.tickets_left[min(len(new_deck.ticket_cards), MAX_TICKETS - 1)])
+
+    h ^= keys.to_move[seat] ^ keys.to_move[state.current_player_idx]
+    if parent.final_round != state.final_round:
+        h ^= keys.final_round[state.final_round_trigger_player]
+
+    for route_id in _claimed_candidates(state.board.table, action):
+        if parent.board.owner[route_id] != state.board.owner[route_id]:
+            h ^= keys.route[route_id][seat]
+    return h
+
+
+def _claimed_candidates(table, action):
+    """Route ids an action dict or id may claim"""
+    if isinstance(action, dict):
+        if action["action_type"] == "claim_route":
+            return table.pair_routes.get((action["city1"], action["city2"]), ())
+        return ()
+    space = action_space(table)
+    return (int(space.arg0[action]),) if space.kind[action] == CLAIM else ()
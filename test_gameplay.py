@@ -4,7 +4,8 @@
 import os
 from ttr_ga.board import Board
 from ttr_ga.player import HumanPlayer, Deck
-from ttr_ga.game import game_loop, GameState, execute_action, check_tickets, longest_continuous_path
+from ttr_ga.game import game_loop, GameState, execute_action
+from ttr_ga.scoring import score_game
 
 def clear_screen():
     """Clear the console screen"""
@@ -295,22 +296,20 @@ def test_interactive_gameplay():
     clear_screen()
     print("\n=== Game Over! Final Scoring ===")
     
-    for player in players:
+    for player, result in zip(players, score_game(players, board)):
         print(f"\nScoring for {player.name}:")
-        print(f"Points from routes: {player.score}")
+        print(f"Points from routes: {result['route_points']}")
         
         # Score tickets
-        ticket_score = check_tickets(player, board)
+        ticket_score = result["ticket_points"]
         print(f"Points from tickets: {'+' if ticket_score >= 0 else ''}{ticket_score}")
         
         # Longest path bonus
-        longest_path_score = longest_continuous_path(player, board)
-        print(f"Longest continuous path bonus: +{longest_path_score}")
+        print(f"Longest continuous path: {result['longest_trail']} trains, bonus +{result['longest_bonus']}")
         
         # Update final score
-        final_score = player.score + ticket_score + longest_path_score
-        print(f"Final score: {final_score}")
-        player.score = final_score
+        player.score = result["total"]
+        print(f"Final score: {player.score}")
     
     # Determine winner
     winner = max(players, key=lambda p: p.score)
@@ -0,0 +1,101 @@
+import random
+
+import numpy as np
+import pytest
+
+from ttr_ga.actions import CLAIM, action_space, decode, encode
+from ttr_ga.agents.agent import RandomAgent
+from ttr_ga.board import Board
+from ttr_ga.game import execute_action
+from ttr_ga.simulator import Simulator
+
+
+def state_after(turns, seed):
+    """A silent two player game some random turns in"""
+    random.seed(seed)
+    state = Simulator([RandomAgent(0, "P1"), RandomAgent(1, "P2")]).new_game()
+    for _ in range(turns):
+        state = state.apply_action(random.choice(state.get_valid_actions()))
+    return state
+
+
+def snapshot(state):
+    return ([(p.hand, p.tickets, p.trains, p.score) for p in state.players],
+            list(state.board.owner), state.deck.face_up_cards, state.deck.train_cards, state.deck.ticket_cards)
+
+
+class TestActionSpace:
+    def test_round_trip(self):
+        space = action_space()
+        for action_id in range(space.size):
+            action = decode(action_id)
+            # The two tracks of a gray double route take the same cards, so a dict names the first free one
+            assert decode(encode(action)) == action
+            if space.kind[action_id] != CLAIM or not space.table.is_double[space.arg0[action_id]]:
+                assert encode(action) == action_id
+
+    def test_claims_cover_every_payment_color(self):
+        space = action_space()
+        seattle_portland = space.table.pair_routes[("Seattle", "Portland")][0]
+        assert (space.claim_index[seattle_portland] >= 0).all()  # gray takes all 9
+
+        seattle_helena = space.table.pair_routes[("Seattle", "Helena")][0]
+        assert (space.claim_index[seattle_helena] >= 0).sum() == 1
+
+    @pytest.mark.parametrize("seed", range(6))
+    def test_mask_matches_legal_actions(self, seed):
+        state = state_after(15, seed)
+        space = action_space()
+
+        legal = {encode(action) for action in state.get_valid_actions()}
+        masked = set(space.legal_ids(state).tolist())
+
+        tickets = set(range(space.tickets, space.size))
+        assert masked - tickets == legal - tickets
+        assert (legal & tickets) <= masked
+
+    @pytest.mark.parametrize("seed", range(6))
+    def test_id_execution_matches_dict_execution(self, seed):
+        state = state_after(10, seed)
+        space = action_space()
+
+        for action_id in space.legal_ids(state):
+            by_id = state.clone()
+            by_dict = state.clone()
+
+            random.seed(seed)
+            execute_action(by_id.get_current_player(), int(action_id), by_id)
+            random.seed(seed)
+            execute_action(by_dict.get_current_player(), decode(action_id), by_dict)
+
+            assert snapshot(by_id) == snapshot(by_dict)
+
+    def test_ticket_keep_subset(self):
+        state = state_after(0, 1)
+        player = state.get_current_player()
+        tickets = list(player.tickets)
+        upcoming = state.deck.ticket_cards[-3:][::-1]
+
+        new_state = state.apply_action(encode({"action_type": "draw_tickets", "keep": [0, 2]}))
+
+        kept = new_state.players[0].tickets[len(tickets):]
+        assert kept == [upcoming[0], upcoming[2]]
+        assert len(new_state.deck.ticket_cards) == len(state.deck.ticket_cards) - 2
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_mask_on_a_networkx_board(self, seed):
+        """A networkx Board is masked with the space's own route ids"""
+        state = state_after(30, seed)
+        space = action_space()
+        expected = space.mask(state)
+        compact = state.board
+
+        state.board = Board(sink=None)
+        state.board.graph = compact.to_networkx()
+        assert (space.mask(state) == expected).all()
+
+    def test_mask_is_fixed_size(self):
+        space = action_space()
+        mask = space.mask(state_after(5, 2))
+        assert mask.shape == (space.size,)
+        assert mask.dtype == np.bool_
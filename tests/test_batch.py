@@ -0,0 +1,113 @@
+from array import array
+
+import numpy as np
+import pytest
+
+from ttr_ga.actions import action_space
+from ttr_ga.batch import EMPTY, BatchGame, play_batch, random_policy, score_policy
+from ttr_ga.board import CompactBoard
+from ttr_ga.common import COLORS
+from ttr_ga.player import TICKETS, Deck, Player
+from ttr_ga.scoring import ROUTE_POINTS, score_game
+from ttr_ga.utils.state import GameState
+
+
+def to_game_state(batch, g):
+    """The object engine state of game g of a batch"""
+    players = []
+    for seat in range(batch.players):
+        player = Player(f"P{seat + 1}")
+        player.hand = [color for color, count in zip(COLORS, batch.hands[g, seat]) for _ in range(count)]
+        player.trains = int(batch.trains[g, seat])
+        player.score = int(batch.route_points[g, seat])
+        player.tickets = [ticket for ticket, holder in zip(TICKETS, batch.ticket_holder[g]) if holder == seat]
+        players.append(player)
+
+    board = CompactBoard(batch.table, sink=None)
+    for player in players:
+        board.seat(player.name)
+    board.owner = array('b', batch.owner[g].tolist())
+
+    deck = Deck(sink=None)
+    deck.train_cards = [COLORS[card] for card in batch.pile[g, :batch.top[g]]]
+    deck.discard([COLORS[color] for color, count in enumerate(batch.discard[g]) for _ in range(count)])
+    deck.face_up_cards = [COLORS[card] for card in batch.face_up[g] if card != EMPTY]
+    deck.ticket_cards = [ticket for ticket, holder in zip(TICKETS, batch.ticket_holder[g]) if holder == EMPTY]
+    return GameState(board, players, int(batch.current[g]), deck, sink=None)
+
+
+class TestBatchGame:
+    def test_deal(self):
+        batch = BatchGame(8, players=3, seed=0)
+
+        assert (batch.hands.sum(axis=2) == 4).all()
+        assert ((batch.ticket_holder >= 0).sum(axis=1) == 9).all()
+        assert (batch.top == 110 - 5 - 12).all()
+        assert ((batch.face_up == COLORS.index('wild')).sum(axis=1) < 3).all()
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_legal_mask_matches_action_space(self, seed):
+        batch = BatchGame(16, seed=seed)
+        policy = random_policy(seed)
+        space = action_space()
+        for _ in range(30):
+            mask = batch.legal_mask()
+            for g in np.flatnonzero(~batch.done & (batch.face_up != EMPTY).all(axis=1)):
+                assert (mask[g] == space.mask(to_game_state(batch, g))).all()
+            batch.step(policy(batch, mask))
+
+    def test_claim_pays_cards_and_scores(self):
+        batch = BatchGame(1, seed=0)
+        space = batch.space
+        route = int(np.flatnonzero(batch.req.length == 4)[0])
+        color = int(np.flatnonzero(batch.req.accepts[route])[0])
+        batch.hands[0, 0] = 0
+        batch.hands[0, 0, color] = 3
+        batch.hands[0, 0, COLORS.index('wild')] = 2
+
+        batch.step([space.claim_index[route, color]])
+
+        assert batch.owner[0, route] == 0
+        assert batch.hands[0, 0].tolist() == [0] * 8 + [1]
+        assert batch.trains[0, 0] == 41
+        assert batch.route_points[0, 0] == ROUTE_POINTS[4]
+        assert batch.discard[0, color] == 3 and batch.discard[0, COLORS.index('wild')] == 1
+        assert batch.current[0] == 1
+
+    def test_discard_pile_is_reshuffled(self):
+        batch = BatchGame(1, seed=0)
+        batch.top[0] = 0
+        batch.discard[0] = 0
+        batch.discard[0, 2] = 3
+
+        batch.step([batch.space.blind])
+
+        assert batch.hands[0, 0, 2] >= 2
+        assert batch.top[0] == 1 and batch.discard[0].sum() == 0
+
+    def test_scores_match_score_game(self):
+        batch = BatchGame(6, seed=4)
+        batch.play(random_policy(4))
+        scores = batch.scores()
+
+        for g in range(batch.size):
+            state = to_game_state(batch, g)
+            expected = score_game(state.players, state.board)
+            for key in ("route_points", "ticket_points", "longest_trail", "longest_bonus", "total"):
+                assert scores[key][g].tolist() == [row[key] for row in expected]
+
+    def test_seeded_batches_repeat(self):
+        first = play_batch(4, random_policy(1), seed=2)
+        second = play_batch(4, random_policy(1), seed=2)
+
+        assert (first["total"] == second["total"]).all()
+        assert first["finished"].all()
+
+    def test_score_policy_plays_preferred_action(self):
+        batch = BatchGame(3, seed=0)
+        preferences = np.zeros((2, batch.space.size))
+        preferences[:, batch.space.blind] = 1
+
+        actions = score_policy(preferences)(batch, batch.legal_mask())
+
+        assert (actions == batch.space.blind).all()
@@ -0,0 +1,216 @@
+import random
+
+import pytest
+
+from ttr_ga.board import Board, CompactBoard, RouteTable
+from ttr_ga.common import COLORS, ROUTES
+from ttr_ga.player import Deck, Player
+
+
+class TestCompactBoard:
+    @pytest.fixture
+    def table(self):
+        """A small table with a double route between New York and Washington"""
+        return RouteTable(["New York", "Washington", "Boston"], [
+            ("New York", "Boston", 2, "red"),
+            ("New York", "Washington", 2, "red", True),
+            ("New York", "Washington", 2, "blue", True),
+        ])
+
+    @pytest.fixture
+    def players(self):
+        """Create test players with predefined hands"""
+        player1 = Player("Test Player 1")
+        player2 = Player("Test Player 2")
+        player1.hand = ['red', 'red', 'red', 'blue', 'blue', 'green', 'wild', 'wild']
+        player2.hand = ['yellow', 'yellow', 'black', 'black', 'wild', 'wild']
+        return [player1, player2]
+
+    def test_table_partners(self, table):
+        """Parallel routes point at each other"""
+        assert table.partner[0] == -1
+        assert table.partner[1] == 2
+        assert table.partner[2] == 1
+        assert table.pair_routes[("Washington", "New York")] == (1, 2)
+
+    def test_claim_route_success(self, table, players):
+        board = CompactBoard(table)
+        player1 = players[0]
+
+        assert board.claim_route(player1, "New York", "Boston") is True
+        assert player1.hand.count('red') == 1
+        assert board.claimed_by(0) == player1.name
+        assert board.routes_of(player1.name) == [0]
+
+    def test_claim_route_discards_spent_cards(self, table, players):
+        board = CompactBoard(table, sink=None)
+        deck = Deck(sink=None)
+
+        board.claim_route(players[0], "New York", "Boston", deck=deck)
+
+        assert deck.discard_pile == ['red', 'red']
+
+    @pytest.mark.parametrize("player_count,expected_result", [
+        (2, False),
+        (4, True),
+    ])
+    def test_claim_route_double_route_player_count(self, table, players, player_count, expected_result):
+        board = CompactBoard(table)
+        player1, player2 = players
+
+        board.claim_route(player1, "New York", "Washington", player_count=player_count)
+        result = board.claim_route(player2, "New York", "Washington", player_count=player_count)
+        assert result is expected_result
+
+    def test_claim_route_player_cant_claim_both_routes(self, table, players):
+        board = CompactBoard(table)
+        player1 = players[0]
+
+        assert board.claim_route(player1, "New York", "Washington", player_count=4) is True
+        assert board.claim_route(player1, "New York", "Washington", player_count=4) is False
+
+    def test_claim_route_picks_parallel_route_by_color(self, table, players):
+        """Asking for blue claims the blue half of a double route"""
+        board = CompactBoard(table)
+        player1 = players[0]
+
+        assert board.claim_route(player1, "New York", "Washington", color='blue') is True
+        assert board.claimed_by(2) == player1.name
+        assert board.claimed_by(1) is None
+
+    def test_is_double_route(self):
+        board = CompactBoard.create_standard_board()
+        reference = Board.create_standard_board()
+        for city1, city2, *_ in ROUTES:
+            assert board.is_double_route(city1, city2) == reference.is_double_route(city1, city2)
+
+    def test_copy_is_independent(self, table, players):
+        board = CompactBoard(table)
+        copy = board.copy()
+        copy.claim_route(players[0], "New York", "Boston")
+
+        assert board.claimed_by(0) is None
+        assert copy.table is board.table
+
+    def test_to_networkx_round_trip(self, table, players):
+        board = CompactBoard(table)
+        board.claim_route(players[0], "New York", "Boston")
+
+        graph = board.to_networkx()
+        assert graph.number_of_edges() == 3
+        assert graph["New York"]["Boston"][0]["claimed"] == players[0].name
+
+        rebuilt = CompactBoard.from_board(_board_with_graph(graph))
+        assert rebuilt.claimed_by(0) == players[0].name
+
+    def test_from_board_onto_a_table(self, players):
+        """Claims land on the table's own route ids, matched by city pair and color"""
+        board = Board.create_standard_board(sink=None)
+        compact = CompactBoard(sink=None)
+        players[0].hand = ['blue'] * 6
+        for target in (board, compact):
+            target.claim_route(players[0].copy(), "New York", "Washington", 'blue', player_count=4)
+
+        rebuilt = CompactBoard.from_board(board, RouteTable.standard())
+        assert rebuilt.table is RouteTable.standard()
+        assert rebuilt.owner == compact.owner
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_board_on_random_claims(self, seed, capsys):
+        """Random claim sequences give identical results on both boards"""
+        rng = random.Random(seed)
+        board = Board.create_standard_board()
+        compact = CompactBoard.create_standard_board()
+        players = [Player(f"P{i}") for i in range(3)]
+        mirrors = [Player(f"P{i}") for i in range(3)]
+
+        for _ in range(300):
+            i = rng.randrange(3)
+            hand = [rng.choice(COLORS) for _ in range(rng.randint(0, 12))]
+            players[i].hand = list(hand)
+            mirrors[i].hand = list(hand)
+            city1, city2, *_ = rng.choice(ROUTES)
+            color = rng.choice(COLORS + [None])
+
+            expected = board.claim_route(players[i], city1, city2, color, player_count=3)
+            result = compact.claim_route(mirrors[i], city1, city2, color, player_count=3)
+
+            assert result == expected
+            assert mirrors[i].hand == players[i].hand
+            assert mirrors[i].score == players[i].score
+
+        assert nx_claims(board.graph) == nx_claims(compact.to_networkx())
+
+
+    @pytest.mark.parametrize("seed,player_count", [(0, 2), (1, 3), (2, 4), (3, 5)])
+    def test_claim_route_id_matches_claim_route(self, seed, player_count):
+        """Claiming a route id with a color does what claim_route does with the names"""
+        rng = random.Random(seed)
+        by_name = CompactBoard(sink=None)
+        by_id = CompactBoard(sink=None)
+        players = [Player(f"P{i}") for i in range(player_count)]
+        mirrors = [Player(f"P{i}") for i in range(player_count)]
+        decks = [Deck(sink=None, rng=random.Random(seed)) for _ in range(2)]
+        table = by_name.table
+
+        for _ in range(300):
+            i = rng.randrange(player_count)
+            hand = [rng.choice(COLORS) for _ in range(rng.randint(0, 12))]
+            players[i].hand = list(hand)
+            mirrors[i].hand = list(hand)
+            route_id = rng.randrange(len(table))
+            color_id = rng.randrange(len(COLORS))
+            if table.color[route_id] != table.GRAY:
+                color_id = table.color[route_id]
+            partner = table.partner[route_id]
+            if partner >= 0 and by_name.owner[partner] == CompactBoard.UNCLAIMED and (
+                    partner < route_id or by_name.owner[route_id] != CompactBoard.UNCLAIMED):
+                continue  # claim_route would take the other, free half
+            city1, city2 = table.endpoints(route_id)
+
+            expected = by_name.claim_route(players[i], city1, city2, COLORS[color_id], player_count, decks[0])
+            result = by_id.claim_route_id(mirrors[i], route_id, color_id, player_count, decks[1])
+
+            assert result == expected
+            assert mirrors[i].hand == players[i].hand
+            assert mirrors[i].trains == players[i].trains
+            assert mirrors[i].score == players[i].score
+
+        assert by_id.owner == by_name.owner
+        assert decks[1].discard_pile == decks[0].discard_pile
+
+    def test_claim_route_id_rejects_other_colors(self, table, players):
+        board = CompactBoard(table, sink=None)
+        player1 = players[0]
+
+        assert board.claim_route_id(player1, 0, COLORS.index('blue')) is False
+        assert board.claim_route_id(player1, 0, COLORS.index('wild')) is False
+        assert board.claim_route_id(player1, 0, COLORS.index('red')) is True
+        assert board.claim_route_id(player1, 0, COLORS.index('red')) is False
+        assert player1.hand == ['red', 'blue', 'blue', 'green', 'wild', 'wild']
+
+
+def _board_with_graph(graph):
+    board = Board()
+    board.graph = graph
+    return board
+
+
+def nx_claims(graph):
+    return sorted((tuple(sorted((u, v))), data['color'], data.get('claimed', ''))
+                  for u, v, data in graph.edges(data=True))
+
+
+def test_claim_route_updates_connections():
+    """Claims join the player's cities for ticket tracking"""
+    board = CompactBoard(sink=None)
+    player = Player("P1")
+    player.hand = ['red'] * 4 + ['wild'] * 4
+    player.tickets = [("Seattle", "Helena", 8)]
+
+    board.claim_route(player, "Seattle", "Calgary", 'red')
+    assert player.ticket_score() == -8
+
+    board.claim_route(player, "Calgary", "Helena", 'wild')
+    assert player.connections.connected("Seattle", "Helena")
+    assert player.ticket_score() == 8
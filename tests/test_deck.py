@@ -1,4 +1,8 @@
+import copy
 from importlib import import_module
+import pickle
+import random
+import numpy as np
 import pytest
 from ttr_ga.player import Deck
 
@@ -81,4 +85,81 @@ class TestDeck:
         
         # Check if replacement happened
         cards_changed = (deck.face_up_cards != original_cards)
-        assert cards_changed == expected_replacement
\ No newline at end of file
+        assert cards_changed == expected_replacement
+
+    def test_seeded_decks_deal_identically(self):
+        """Decks built from equally seeded rngs shuffle the same way"""
+        first = Deck(sink=None, rng=random.Random(4))
+        second = Deck(sink=None, rng=random.Random(4))
+
+        assert first.train_cards == second.train_cards
+        assert first.ticket_cards == second.ticket_cards
+
+    def test_numpy_generator_rng(self):
+        """A NumPy Generator can drive the deck too"""
+        deck = Deck(sink=None, rng=np.random.default_rng(4))
+        expected = list(deck.ticket_cards)
+        np.random.default_rng(9).shuffle(expected)
+
+        deck.rng = np.random.default_rng(9)
+        deck.shuffle_ticket_cards()
+
+        assert deck.ticket_cards == expected
+
+    def test_copy_keeps_rng_unless_given(self):
+        deck = Deck(sink=None, rng=random.Random(1))
+        rng = random.Random(2)
+
+        assert deck.copy().rng is deck.rng
+        assert deck.copy(rng).rng is rng
+
+    def test_discard_pile_is_reshuffled_when_deck_runs_out(self):
+        deck = Deck(sink=None, rng=random.Random(0))
+        deck.train_cards = ['red']
+        deck.discard(['blue', 'blue', 'wild'])
+
+        assert deck.draw_train_card() == 'red'
+        assert deck.train_cards_left == 3
+        assert sorted(deck.draw_train_card() for _ in range(3)) == ['blue', 'blue', 'wild']
+        assert deck.discard_pile == []
+        with pytest.raises(IndexError):
+            deck.draw_train_card()
+
+    def test_wild_layout_goes_to_discard(self):
+        deck = Deck(sink=None)
+        deck.train_cards = ['red', 'blue', 'green', 'yellow', 'black']
+        deck.face_up_cards = ['wild', 'wild', 'wild', 'red', 'blue']
+
+        deck.check_and_replace_wilds()
+
+        assert deck.face_up_cards == ['black', 'yellow', 'green', 'blue', 'red']
+        assert sorted(deck.discard_pile) == ['blue', 'red', 'wild', 'wild', 'wild']
+
+    def test_all_wild_deck_does_not_loop(self):
+        """With no way to get below 3 wilds the layout is left alone"""
+        deck = Deck(sink=None)
+        deck.train_cards = ['wild'] * 200
+        deck.face_up_cards = ['wild'] * 5
+
+        deck.check_and_replace_wilds()
+
+        assert deck.face_up_cards == ['wild'] * 5
+
+    def test_copy_is_independent(self):
+        deck = Deck(sink=None, rng=random.Random(3))
+        deck.discard(['red'])
+        clone = deck.copy()
+
+        clone.draw_train_card()
+        clone.discard(['blue'])
+
+        assert clone.train_cards == deck.train_cards[:-1]
+        assert deck.discard_pile == ['red']
+        assert clone.discard_pile == ['red', 'blue']
+
+    def test_default_deck_can_be_deep_copied_and_pickled(self):
+        """The global random stand-in survives copying, unlike the random module"""
+        deck = Deck(sink=None)
+
+        assert copy.deepcopy(deck).train_cards == deck.train_cards
+        assert pickle.loads(pickle.dumps(deck)).discard_pile == deck.discard_pile
@@ -0,0 +1,167 @@
+import json
+
+import numpy as np
+import pytest
+
+from ttr_ga.agents.agent import RandomAgent
+from ttr_ga.agents.ga import FEATURES, GeneticAgent, evaluate_genome, random_genome, task_seed
+from ttr_ga.utils.eval import (RacingEvaluator, Tournament, elo_ratings, gauntlet, pairwise_wins, race,
+                               rotations, round_robin)
+
+
+def noisy_play(true_means, noise=5.0, seed=0):
+    """A play function drawing margins around fixed means, recording every request"""
+    rng = np.random.default_rng(seed)
+    requests_seen = []
+
+    def play(requests):
+        requests_seen.extend(requests)
+        return [list(rng.normal(true_means[i], noise, len(games))) for i, games in requests]
+
+    return play, requests_seen
+
+
+class TestRace:
+    def test_selects_the_true_top_with_fewer_games(self):
+        true_means = np.arange(20.0) * 4
+        play, _ = noisy_play(true_means)
+
+        means, games = race(play, len(true_means), top=5, min_games=4, max_games=32)
+
+        assert set(np.argsort(-means)[:5]) == {15, 16, 17, 18, 19}
+        assert games.sum() < len(true_means) * 32 / 3
+        assert games.min() == 4 and games.max() <= 32
+
+    def test_games_go_to_the_cutoff(self):
+        true_means = np.array([0.0, 40.0, 49.0, 51.0, 60.0, 100.0])
+        play, _ = noisy_play(true_means, noise=10.0)
+
+        _, games = race(play, len(true_means), top=3, max_games=64)
+
+        assert games[2] > games[0] and games[3] > games[5]
+
+    def test_game_numbers_continue_the_series(self):
+        play, requests = noisy_play(np.zeros(3))
+
+        race(play, 3, top=1, min_games=2, max_games=6, batch=2)
+
+        for candidate in range(3):
+            played = [game for i, games in requests if i == candidate for game in games]
+            assert played == list(range(len(played)))
+
+    def test_no_cutoff_plays_min_games(self):
+        play, _ = noisy_play(np.zeros(4))
+        _, games = race(play, 4, top=4, min_games=3, max_games=10)
+        assert games.tolist() == [3, 3, 3, 3]
+
+
+class TestRacingEvaluator:
+    def test_matches_a_fixed_evaluation_when_not_racing(self):
+        rng = np.random.default_rng(0)
+        population = np.stack([random_genome(rng) for _ in range(2)])
+
+        with RacingEvaluator(min_games=2, max_games=2, workers=1, seed=3) as evaluator:
+            fitness = evaluator.evaluate(population, generation=1)
+
+        assert fitness.tolist() == [evaluate_genome(g, games=2, seed=task_seed(3, 1, 0)) for g in population]
+        assert evaluator.last_games.tolist() == [2, 2]
+        assert evaluator.games_played == 4
+
+    def test_stops_early_for_a_hopeless_genome(self):
+        strong = np.zeros(len(FEATURES), dtype=np.float32)
+        strong[FEATURES.index("claim")] = 1
+        strong[FEATURES.index("route_points")] = 1
+        hopeless = np.zeros(len(FEATURES), dtype=np.float32)
+        hopeless[FEATURES.index("ticket_draw")] = 1
+
+        with RacingEvaluator(min_games=3, max_games=12, top=1, workers=1) as evaluator:
+            fitness = evaluator.evaluate([strong, hopeless])
+
+        assert fitness[0] > fitness[1]
+        assert evaluator.last_games.tolist() == [3, 3]
+
+
+def greedy(player_id, name, rng=None):
+    weights = np.zeros(len(FEATURES), dtype=np.float32)
+    weights[FEATURES.index("claim")] = 1
+    weights[FEATURES.index("route_points")] = 1
+    return GeneticAgent(player_id, name, weights, rng=rng)
+
+
+class TestTournament:
+    def test_schedule_rotates_seats_on_shared_deals(self):
+        tournament = Tournament({"a": RandomAgent, "b": RandomAgent, "c": RandomAgent}, players=3, deals=2)
+        matches = tournament.schedule()
+
+        assert len(matches) == 1 * 2 * 3
+        assert [m[0] for m in matches] == list(range(6))
+        first_deal = [seats for _, seats, seed in matches if seed == matches[0][2]]
+        assert sorted(seats.index("a") for seats in first_deal) == [0, 1, 2]
+
+    def test_lineups(self):
+        assert round_robin("abc") == [("a", "b"), ("a", "c"), ("b", "c")]
+        assert gauntlet("x", ["a", "x", "b"], players=3) == [("x", "a", "b")]
+        assert rotations(("a", "b", "c")) == [("a", "b", "c"), ("b", "c", "a"), ("c", "a", "b")]
+        with pytest.raises(ValueError):
+            Tournament({"a": RandomAgent}, lineups=[("a", "b")])
+
+    def test_streams_and_resumes(self, tmp_path):
+        output = tmp_path / "results.jsonl"
+        entrants = {"random": RandomAgent, "greedy": greedy}
+        full = Tournament(entrants, deals=2, workers=1).run()
+
+        lines = []
+        with open(output, "w") as f:
+            for result in full[:3]:
+                f.write(json.dumps(result) + "\n")
+            f.write('{"match": 3, "sea')  # torn by a crash
+        tournament = Tournament(entrants, deals=2, workers=1, output=output)
+        tournament.run(callback=lines.append)
+
+        assert [result["match"] for result in lines] == [3]
+        assert tournament.results == full
+        assert [json.loads(line) for line in output.read_text().splitlines()] == full
+        with pytest.raises(ValueError):
+            Tournament(entrants, deals=2, seed=1, workers=1, output=output).run()
+
+    def test_results_recorded_twice_count_once(self, tmp_path):
+        output = tmp_path / "results.jsonl"
+        entrants = {"random": RandomAgent, "greedy": greedy}
+        full = Tournament(entrants, deals=1, workers=1).run()
+        output.write_text("".join(json.dumps(result) + "\n" for result in full + full[:1]))
+
+        tournament = Tournament(entrants, deals=1, workers=1, output=output)
+        assert tournament.run() == full
+        assert tournament.standings() == elo_ratings(full, list(entrants))
+
+    def test_pool_plays_the_same_matches(self):
+        entrants = {"random": RandomAgent, "greedy": greedy}
+        assert Tournament(entrants, deals=2, workers=2).run() == Tournament(entrants, deals=2, workers=1).run()
+
+
+class TestRatings:
+    def test_pairwise_wins_of_a_multiplayer_game(self):
+        wins, games = pairwise_wins([{"seats": ["a", "b", "c"], "scores": [10, 30, 10]}], ["a", "b", "c"])
+
+        assert wins.tolist() == [[0, 0, 0.5], [1, 0, 1], [0.5, 0, 0]]
+        assert (games == 1 - np.eye(3)).all()
+
+    def test_stronger_entrants_rate_higher_with_narrowing_intervals(self):
+        def results(games):
+            return [{"seats": ["strong", "weak"], "scores": [1, 0] if i % 4 else [0, 1]} for i in range(games)]
+
+        few = {entry["name"]: entry for entry in elo_ratings(results(8), ["weak", "strong"])}
+        many = {entry["name"]: entry for entry in elo_ratings(results(400), ["weak", "strong"])}
+
+        assert many["strong"]["rating"] > many["weak"]["rating"]
+        assert many["strong"]["low"] > many["weak"]["high"]
+        assert many["strong"]["rating"] + many["weak"]["rating"] == pytest.approx(3000)
+        # 75% wins is about 191 Elo points
+        assert many["strong"]["rating"] - many["weak"]["rating"] == pytest.approx(191, abs=5)
+        assert many["strong"]["error"] < few["strong"]["error"]
+        assert many["strong"]["win_share"] == 0.75
+
+    def test_unbeaten_entrant_has_a_finite_rating(self):
+        standings = elo_ratings([{"seats": ["a", "b"], "scores": [5, 1]}] * 5, ["a", "b"])
+        assert all(np.isfinite(entry["rating"]) for entry in standings)
+        assert standings[0]["name"] == "a"
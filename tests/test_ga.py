@@ -0,0 +1,248 @@
+from functools import partial
+
+import numpy as np
+import pytest
+
+from ttr_ga.actions import CLAIM, DRAW_TICKETS, action_space
+from ttr_ga.agents.agent import RandomAgent
+from ttr_ga.agents.ga import (FEATURES, STATIC_FEATURES, Evolution, FitnessEvaluator, GeneticAgent,
+                              action_features, crossover, evaluate_genome, main, mutate, next_generation,
+                              random_genome, state_features, task_seed, tournament_select)
+from ttr_ga.board import Board
+from ttr_ga.simulator import Simulator
+
+
+def genome(**weights):
+    return np.array([weights.get(name, 0.0) for name in FEATURES], dtype=np.float32)
+
+
+class TestGeneticAgent:
+    def test_features_describe_actions(self):
+        space = action_space()
+        features = action_features(space)
+
+        assert features.shape == (space.size, len(FEATURES))
+        claims = space.kind == CLAIM
+        assert (features[claims, FEATURES.index("claim")] == 1).all()
+        assert features[claims, FEATURES.index("route_points")].max() == 15
+        assert features[space.kind == DRAW_TICKETS, FEATURES.index("tickets_kept")].max() == 3
+
+    def test_plays_the_best_legal_action(self):
+        state = Simulator([RandomAgent(0, "P1"), RandomAgent(1, "P2")]).new_game()
+        agent = GeneticAgent(0, "P1", genome(ticket_draw=1, tickets_kept=1))
+
+        action_id = agent.choose_action(state)
+
+        assert action_id in action_space().legal_ids(state)
+        assert action_space().decode(action_id) == {"action_type": "draw_tickets", "keep": [0, 1, 2]}
+
+
+    def test_dynamic_weights_steer_the_agent(self):
+        state = Simulator([RandomAgent(0, "P1"), RandomAgent(1, "P2")]).new_game()
+        player = state.get_current_player()
+        player.hand = ["wild"] * 8
+        agent = GeneticAgent(0, "P1", genome(ticket_progress=1))
+        space = action_space()
+
+        action = space.decode(agent.choose_action(state))
+
+        assert action["action_type"] == "claim_route"
+        # the claim lies on a cheapest connection of an open ticket
+        assert state_features(state, np.array([agent.choose_action(state)]))[0, FEATURES.index("ticket_progress")] > 0
+
+    def test_plays_standard_ids_on_a_networkx_board(self):
+        state = Simulator([RandomAgent(0, "P1"), RandomAgent(1, "P2")]).new_game()
+        state.get_current_player().hand = ["white"] * 6
+        agent = GeneticAgent(0, "P1", genome(claim=1, route_points=1))
+        expected = agent.choose_action(state)
+
+        state.board, compact = Board(sink=None), state.board
+        state.board.graph = compact.to_networkx()
+
+        assert agent.choose_action(state) == expected
+
+
+class TestStateFeatures:
+    @pytest.fixture
+    def state(self):
+        state = Simulator([RandomAgent(0, "P1"), RandomAgent(1, "P2")]).new_game(3)
+        state.get_current_player().hand = ["red"] * 4 + ["wild"] * 2
+        return state
+
+    def test_static_columns_match_the_action_table(self, state):
+        legal = action_space().legal_ids(state)
+        features = state_features(state, legal)
+
+        assert features.shape == (len(legal), len(FEATURES))
+        assert features.dtype == np.float32
+        np.testing.assert_array_equal(features[:, :STATIC_FEATURES], action_features(action_space())[legal, :STATIC_FEATURES])
+
+    def test_ticket_progress_follows_the_open_tickets(self, state):
+        space = action_space()
+        legal = space.legal_ids(state)
+        player = state.get_current_player()
+        features = state_features(state, legal)
+        progress = features[:, FEATURES.index("ticket_progress")]
+
+        assert (progress[space.kind[legal] != CLAIM] == 0).all()
+        assert progress.max() > 0
+        player.tickets = []
+        assert state_features(state, legal)[:, FEATURES.index("ticket_progress")].max() == 0
+
+    def test_path_gain_and_blocking_follow_the_network(self, state):
+        space = action_space()
+        board = state.board
+        table = board.table
+        player = state.get_current_player()
+        opponent = state.players[1 - state.current_player_idx]
+        board.owner[table.pair_routes["Seattle", "Portland"][0]] = board.seat(opponent.name)
+        board.owner[table.pair_routes["Denver", "Omaha"][0]] = board.seat(player.name)
+
+        legal = space.legal_ids(state)
+        features = state_features(state, legal)
+        for action_id, row in zip(legal[space.kind[legal] == CLAIM], features):
+            route = space.arg0[action_id]
+            cities = set(table.endpoints(route))
+            gain = row[FEATURES.index("longest_path_gain")]
+            assert gain == (table.length[route] if cities & {"Denver", "Omaha"} else 0)
+            if not cities & {"Seattle", "Portland"}:
+                assert row[FEATURES.index("blocking")] == 0
+        assert features[:, FEATURES.index("blocking")].max() > 0
+
+    def test_ticket_draws_see_the_trains_left(self, state):
+        space = action_space()
+        legal = space.legal_ids(state)
+        tickets = space.kind[legal] == DRAW_TICKETS
+        state.get_current_player().trains = 9
+
+        features = state_features(state, legal)
+
+        assert np.allclose(features[tickets, FEATURES.index("ticket_draw_trains")], 9 / 45)
+        assert (features[~tickets, FEATURES.index("ticket_draw_trains")] == 0).all()
+
+
+class TestFitness:
+    def test_evaluation_is_reproducible(self):
+        g = random_genome(np.random.default_rng(0))
+
+        assert evaluate_genome(g, games=2, seed=5) == evaluate_genome(g, games=2, seed=5)
+
+    def test_opponent_pool_takes_factories(self):
+        rival = partial(GeneticAgent, genome=genome(claim=1, route_points=1))
+
+        fitness = evaluate_genome(genome(blind_draw=1), opponents=[rival, RandomAgent], games=2, seed=1)
+
+        assert np.isfinite(fitness)
+
+    def test_task_seeds_differ_per_genome_and_generation(self):
+        seeds = {task_seed(0, generation, index) for generation in range(3) for index in range(3)}
+
+        assert len(seeds) == 9
+        assert task_seed(0, 1, 2) == task_seed(0, 1, 2)
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_fitness_does_not_depend_on_workers(self, workers):
+        rng = np.random.default_rng(3)
+        population = np.stack([random_genome(rng) for _ in range(3)])
+        expected = [evaluate_genome(g, games=1, seed=task_seed(7, 1, 0)) for g in population]
+
+        with FitnessEvaluator(games=1, workers=workers, seed=7) as evaluator:
+            fitness = evaluator.evaluate(population, generation=1)
+
+        assert fitness.tolist() == expected
+
+    def test_paired_evaluation_plays_the_same_deals(self):
+        g = random_genome(np.random.default_rng(0))
+
+        with FitnessEvaluator(games=2, workers=1, paired=True) as evaluator:
+            paired = evaluator.evaluate([g, g])
+        with FitnessEvaluator(games=2, workers=1, paired=False) as evaluator:
+            unpaired = evaluator.evaluate([g, g])
+
+        assert paired[0] == paired[1]
+        assert unpaired[0] != unpaired[1]
+
+
+class TestOperators:
+    def test_tournament_prefers_the_fit(self):
+        fitness = np.arange(10.0)
+        winners = tournament_select(fitness, 1000, np.random.default_rng(0), size=3)
+
+        assert winners.shape == (1000,)
+        assert winners.mean() > 6  # the mean of the best of three draws from 0..9 is about 6.8
+
+    def test_crossover_mixes_parent_weights(self):
+        rng = np.random.default_rng(0)
+        ones, zeros = np.ones((50, len(FEATURES))), np.zeros((50, len(FEATURES)))
+
+        children = crossover(ones, zeros, rng, rate=1.0)
+        assert set(np.unique(children)) == {0.0, 1.0}
+        assert (crossover(ones, zeros, rng, rate=0.0) == ones).all()
+
+    def test_mutation_rate(self):
+        population = np.zeros((100, len(FEATURES)), dtype=np.float32)
+        mutated = mutate(population, np.random.default_rng(0), rate=0.2)
+
+        assert mutated.dtype == np.float32
+        assert 0.15 < (mutated != 0).mean() < 0.25
+
+    def test_elites_survive_unchanged(self):
+        rng = np.random.default_rng(0)
+        population = rng.standard_normal((8, len(FEATURES))).astype(np.float32)
+        fitness = np.array([3.0, 9.0, 1.0, 7.0, 0.0, 2.0, 5.0, 4.0])
+
+        children = next_generation(population, fitness, rng, elite=2)
+
+        assert children.shape == population.shape
+        assert (children[0] == population[1]).all() and (children[1] == population[3]).all()
+
+
+class FakeEvaluator:
+    """Fitness as a fixed function of the genome, so runs are fast and deterministic"""
+    def evaluate(self, population, generation=0):
+        return np.asarray(population, dtype=np.float64) @ np.linspace(-1, 1, len(FEATURES))
+
+
+class TestEvolution:
+    def test_fitness_improves(self):
+        evolution = Evolution(FakeEvaluator(), population_size=16, seed=0)
+        history = evolution.run(15)
+
+        assert [stats["generation"] for stats in history] == list(range(15))
+        assert history[-1]["mean"] > history[0]["mean"]
+        assert evolution.best_fitness == max(stats["best"] for stats in history)
+
+    def test_resumed_run_matches_an_uninterrupted_one(self, tmp_path):
+        checkpoint = tmp_path / "run.pickle"
+        streamed = []
+        Evolution(FakeEvaluator(), population_size=10, seed=4, checkpoint=checkpoint,
+                  metadata={"games": 3}).run(3, callback=streamed.append)
+        resumed = Evolution.resume(checkpoint, FakeEvaluator())
+        resumed.run(6)
+        straight = Evolution(FakeEvaluator(), population_size=10, seed=4)
+        straight.run(6)
+
+        assert len(streamed) == 3
+        assert resumed.metadata == {"games": 3}
+        assert (resumed.population == straight.population).all()
+        assert [s["best"] for s in resumed.history] == [s["best"] for s in straight.history]
+        assert (resumed.best_genome == straight.best_genome).all()
+        assert list(tmp_path.iterdir()) == [checkpoint]  # no staging files left behind
+
+    def test_checkpoints_every_generation(self, tmp_path):
+        checkpoint = tmp_path / "run.pickle"
+        evolution = Evolution(FakeEvaluator(), population_size=6, checkpoint=checkpoint)
+        evolution.step()
+        assert Evolution.resume(checkpoint, FakeEvaluator()).generation == 1
+        evolution.step()
+        assert Evolution.resume(checkpoint, FakeEvaluator()).generation == 2
+
+    def test_cli_needs_a_generation(self, capsys):
+        with pytest.raises(SystemExit):
+            main(["--generations", "0"])
+        assert "--generations must be at least 1" in capsys.readouterr().err
+
+    def test_with_games(self):
+        with FitnessEvaluator(games=1, workers=1) as evaluator:
+            stats = Evolution(evaluator, population_size=4, elite=1).step()
+        assert np.isfinite(stats["best"]) and stats["best"] >= stats["mean"] >= stats["worst"]
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from ttr_ga.board import RouteTable
+from ttr_ga.index import BoardIndex, board_index, map_hash
+from ttr_ga.player import TICKETS
+
+
+@pytest.fixture
+def index():
+    return BoardIndex.build(RouteTable.standard(), TICKETS)
+
+
+class TestBoardIndex:
+    def test_distances(self, index):
+        assert (index.distance == index.distance.T).all()
+        assert (np.diag(index.distance) == 0).all()
+        assert index.distance_between("Seattle", "Portland") == 1
+        assert index.distance_between("Seattle", "New York") == 20
+
+    def test_ticket_costs(self, index):
+        assert index.ticket_difficulty(("Denver", "El Paso", 4)) == 4
+        assert (index.ticket_cost <= index.ticket_values * 2).all()
+
+    def test_cheapest_path_connects_the_ticket(self, index):
+        table = index.table
+        for ticket in TICKETS:
+            path = index.cheapest_path(ticket)
+            assert sum(int(index.length[route_id]) for route_id in path) == index.ticket_difficulty(ticket)
+            assert index.ticket_routes[index.ticket_id(ticket), path].all()
+
+            city = ticket[0]
+            for route_id in path:
+                city1, city2 = table.endpoints(route_id)
+                city = city2 if city == city1 else city1
+            assert city == ticket[1]
+
+    def test_long_paths_widen_the_path_array(self):
+        chain = [f"c{i}" for i in range(21)]
+        table = RouteTable(chain, [(c1, c2, 1, "gray") for c1, c2 in zip(chain, chain[1:])])
+        index = BoardIndex.build(table, [("c0", "c20", 20), ("c0", "c1", 1)])
+
+        assert index.ticket_path.shape == (2, 20)
+        assert index.cheapest_path(("c0", "c20", 20)) == list(range(20))
+        assert index.cheapest_path(("c0", "c1", 1)) == [0]
+
+    def test_route_columns(self, index):
+        table = index.table
+        assert index.points[index.length == 6].tolist() == [15] * int((index.length == 6).sum())
+        assert index.partner.tolist() == list(table.partner)
+
+    def test_disk_cache_is_memory_mapped(self, tmp_path):
+        table = RouteTable.standard()
+        built = BoardIndex.load(table, TICKETS, cache=tmp_path)
+        loaded = BoardIndex.load(table, TICKETS, cache=tmp_path)
+
+        assert (tmp_path / f"index-{map_hash(table, TICKETS)}").is_dir()
+        assert isinstance(loaded.distance, np.memmap)
+        assert (loaded.ticket_routes == built.ticket_routes).all()
+
+    def test_cache_key_follows_the_map(self):
+        table = RouteTable.standard()
+        assert map_hash(table, TICKETS) != map_hash(table, TICKETS[:-1])
+
+    def test_unwritable_cache_still_builds(self, tmp_path):
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        index = BoardIndex.load(RouteTable.standard(), TICKETS, cache=blocker)
+        assert index.distance_between("Seattle", "Portland") == 1
+
+    def test_standard_index_is_shared(self):
+        assert board_index() is board_index()
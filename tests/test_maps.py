@@ -0,0 +1,130 @@
+import json
+import pickle
+import random
+
+import pytest
+
+from ttr_ga.board import RouteTable
+from ttr_ga.common import CITIES, ROUTES
+from ttr_ga import maps
+from ttr_ga.maps import MAPS_DIR, GameMap, MapError, load_map, validate
+from ttr_ga.player import TICKETS, TRAIN_CARDS, Deck
+from ttr_ga.zobrist import zobrist_keys
+
+
+@pytest.fixture
+def usa():
+    with open(MAPS_DIR / "usa.json") as f:
+        return json.load(f)
+
+
+class TestValidate:
+    def test_usa_map_is_valid(self, usa):
+        assert validate(usa) == []
+
+    def test_unknown_ticket_city(self, usa):
+        usa["tickets"].append(["Dnever", "El Paso", 4])
+        assert validate(usa) == ["ticket ['Dnever', 'El Paso', 4] names an unknown city"]
+
+    def test_empty_city_name(self, usa):
+        usa["cities"].append("")
+        problems = validate(usa)
+        assert "invalid city name ''" in problems
+
+    def test_city_without_routes(self, usa):
+        usa["cities"].append("Atlantis")
+        assert validate(usa) == ["city 'Atlantis' has no routes"]
+
+    def test_bad_color_and_length(self, usa):
+        usa["routes"][usa["routes"].index(["Seattle", "Calgary", 4, "gray"])] = ["Seattle", "Calgary", 8, "purple"]
+        problems = validate(usa)
+        assert len(problems) == 2
+        assert "length must be 1 to 6" in problems[0]
+        assert "color 'purple'" in problems[1]
+
+    def test_unpaired_double_route(self, usa):
+        usa["routes"] = [route for route in usa["routes"] if route[:4] != ["Boston", "Montreal", 2, "gray"]]
+        usa["routes"].append(["Boston", "Montreal", 2, "gray", True])
+        assert "double route Boston - Montreal" in validate(usa)[0]
+
+    def test_parallel_routes_must_be_marked_double(self, usa):
+        usa["routes"].append(["Seattle", "Helena", 6, "red"])
+        assert validate(usa) == ["2 routes between Helena and Seattle are not marked double"]
+
+    def test_unreachable_ticket(self, usa):
+        usa["cities"] += ["Honolulu", "Hilo"]
+        usa["routes"].append(["Honolulu", "Hilo", 2, "gray"])
+        usa["tickets"].append(["Seattle", "Hilo", 30])
+        assert validate(usa) == ["ticket ['Seattle', 'Hilo', 30] can never be completed"]
+
+    def test_unsupported_rules(self, usa):
+        usa["rules"] = ["tunnels", "stations"]
+        assert validate(usa) == ["rule 'tunnels' is not supported by the engine",
+                                 "rule 'stations' is not supported by the engine"]
+
+    def test_error_lists_every_problem(self, usa):
+        usa["tickets"].append(["Dnever", "El Paso", 0])
+        with pytest.raises(MapError) as error:
+            GameMap.from_definition(usa)
+        assert len(error.value.problems) == 2
+        assert str(error.value).startswith("Invalid map USA: ")
+
+
+class TestLoadMap:
+    def test_usa_map_matches_the_standard_data(self):
+        game_map = load_map("usa")
+        assert game_map.cities == CITIES
+        assert game_map.routes == ROUTES
+        assert game_map.tickets == TICKETS and game_map.tickets is not TICKETS
+        assert game_map.deck_cards() == TRAIN_CARDS
+        assert RouteTable.standard() is game_map.table
+
+    def test_compiled_map_is_cached_on_disk(self, tmp_path, usa, monkeypatch):
+        path = tmp_path / "small.json"
+        usa["tickets"] = usa["tickets"][:3]
+        path.write_text(json.dumps(usa))
+
+        game_map = load_map(path, cache=tmp_path)
+        assert len(list(tmp_path.glob("map-*.json"))) == 1
+        assert len(game_map.tickets) == 3
+
+        monkeypatch.setattr(maps, "_LOADED", {})
+        cached = load_map(path, cache=tmp_path)
+        assert cached is not game_map
+        assert cached.routes == game_map.routes
+        assert len(cached.table) == len(game_map.table)
+
+    def test_cache_holds_no_pickles(self, tmp_path, usa, monkeypatch):
+        """A cached map is plain JSON, and an unreadable one is recompiled"""
+        path = tmp_path / "plain.json"
+        path.write_text(json.dumps(usa))
+        game_map = load_map(path, cache=tmp_path)
+        cached, = tmp_path.glob("map-*.json")
+        assert json.loads(cached.read_text())["cities"] == game_map.cities
+
+        cached.write_bytes(pickle.dumps(game_map))
+        monkeypatch.setattr(maps, "_LOADED", {})
+        assert load_map(path, cache=tmp_path).routes == game_map.routes
+        assert json.loads(cached.read_text())["routes"] == [list(route) for route in game_map.routes]
+
+    def test_pickled_table_drops_lazy_structures(self):
+        table = RouteTable.standard()
+        zobrist_keys(table)
+        copy = pickle.loads(pickle.dumps(table))
+        assert copy.zobrist is None and copy.action_space is None
+        assert list(copy.length) == list(table.length)
+
+    def test_edited_map_is_recompiled(self, tmp_path, usa):
+        path = tmp_path / "edited.json"
+        path.write_text(json.dumps(usa))
+        load_map(path, cache=tmp_path)
+        usa["tickets"].append(["Dnever", "El Paso", 4])
+        path.write_text(json.dumps(usa))
+        with pytest.raises(MapError):
+            load_map(path, cache=tmp_path)
+
+    def test_deck_from_map(self):
+        game_map = load_map("usa")
+        deck = Deck(sink=None, rng=random.Random(0), game_map=game_map)
+        assert deck.train_cards_left + len(deck.face_up_cards) == len(TRAIN_CARDS)
+        assert sorted(deck.ticket_cards) == sorted(TICKETS)
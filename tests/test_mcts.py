@@ -0,0 +1,117 @@
+import random
+import time
+from collections import Counter
+
+import pytest
+
+from ttr_ga.actions import action_space
+from ttr_ga.agents.agent import RandomAgent
+from ttr_ga.agents.mcts import MCTSAgent, determinize, search
+from ttr_ga.agents.transposition import TranspositionCache
+from ttr_ga.board import Board, CompactBoard, RouteTable
+from ttr_ga.game import execute_action, setup_game
+from ttr_ga.player import Deck, Player
+from ttr_ga.simulator import Simulator
+from ttr_ga.utils.state import GameState
+
+
+@pytest.fixture
+def state():
+    """A two player game a few turns in"""
+    rng = random.Random(0)
+    agents = [RandomAgent(i, f"P{i + 1}", rng=random.Random(i)) for i in range(2)]
+    state = Simulator(agents).new_game(4)
+    for _ in range(6):
+        state = state.apply_action(rng.choice(state.get_valid_actions()))
+    return state
+
+
+class TestDeterminize:
+    def test_resamples_only_hidden_information(self, state):
+        observer = state.current_player_idx
+        opponent = 1 - observer
+        game = determinize(state, observer, random.Random(1))
+
+        assert game.players[observer].hand == state.players[observer].hand
+        assert game.players[observer].tickets == state.players[observer].tickets
+        assert game.deck.face_up_cards == state.deck.face_up_cards
+        assert list(game.board.owner) == list(state.board.owner)
+        assert len(game.players[opponent].hand) == len(state.players[opponent].hand)
+        assert len(game.players[opponent].tickets) == len(state.players[opponent].tickets)
+
+        unseen = Counter(state.deck.train_cards + state.players[opponent].hand)
+        assert Counter(game.deck.train_cards + game.players[opponent].hand) == unseen
+        assert game.players[opponent].tickets != state.players[opponent].tickets
+
+    def test_original_state_is_untouched(self, state):
+        before = (list(state.players[1].hand), state.deck.train_cards)
+        determinize(state, 0, random.Random(1))
+        assert (state.players[1].hand, state.deck.train_cards) == before
+
+
+class TestSearch:
+    def test_root_statistics(self, state):
+        stats, done = search(state, state.current_player_idx, iterations=50, seed=3)
+        legal = set(action_space().legal_ids(state).tolist())
+
+        assert done == 50
+        assert sum(visits for visits, _ in stats.values()) == 50
+        assert set(stats) <= legal
+        assert all(0 <= reward <= visits for visits, reward in stats.values())
+
+    def test_seeded_search_is_reproducible(self, state):
+        observer = state.current_player_idx
+        assert search(state, observer, iterations=30, seed=5) == search(state, observer, iterations=30, seed=5)
+
+    def test_time_budget(self, state):
+        start = time.perf_counter()
+        _, done = search(state, state.current_player_idx, time_limit=0.2, seed=0)
+        assert done > 0
+        assert time.perf_counter() - start < 1.0
+
+
+class TestMCTSAgent:
+    def test_plays_a_full_game(self):
+        agent = MCTSAgent(0, "MCTS", iterations=5, rollout_plies=4, rng=random.Random(0))
+        result = Simulator([agent, RandomAgent(1, "Random", rng=random.Random(1))]).play_game(7)
+
+        assert result["finished"]
+        assert agent.playouts > 0
+        assert agent.playouts_per_second > 0
+
+    def test_plays_on_a_networkx_board(self):
+        """Moves found on the compact copy are ids of the standard table, which the Board plays"""
+        players = [Player("MCTS"), Player("Random")]
+        deck = Deck(sink=None, rng=random.Random(2))
+        setup_game(players, deck, sink=None)
+        state = GameState(Board.create_standard_board(sink=None), players, 0, deck, sink=None)
+        agents = [MCTSAgent(0, "MCTS", iterations=5, rollout_plies=4, rng=random.Random(0)),
+                  RandomAgent(1, "Random", rng=random.Random(1))]
+
+        claims = 0
+        for _ in range(40):
+            seat = state.current_player_idx
+            action = agents[seat].choose_action(state)
+            if seat == 0:
+                compact = CompactBoard.from_board(state.board, RouteTable.standard())
+                assert action in action_space().legal_ids(GameState(compact, players, seat, deck))
+            claimed = execute_action(players[seat], action, state)
+            if seat == 0 and action < action_space().blind:
+                assert claimed
+                claims += 1
+            state.end_turn()
+        assert claims > 0
+
+    def test_cache_answers_repeated_positions(self, state):
+        agent = MCTSAgent(state.current_player_idx, "MCTS", iterations=5, rng=random.Random(0),
+                          cache=TranspositionCache())
+        action = agent.choose_action(state)
+        assert agent.choose_action(state.clone()) == action
+        assert agent.cache.hits == 1 and agent.playouts == 5
+
+    def test_root_parallel_search(self, state):
+        with MCTSAgent(state.current_player_idx, "MCTS", iterations=10, workers=2,
+                       rng=random.Random(0)) as agent:
+            action = agent.choose_action(state)
+        assert action in action_space().legal_ids(state)
+        assert agent.last_search["iterations"] == 20
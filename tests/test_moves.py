@@ -0,0 +1,116 @@
+import random
+
+import numpy as np
+import pytest
+
+from ttr_ga.board import Board, CompactBoard
+from ttr_ga.common import COLORS
+from ttr_ga.moves import claim_mask, draw_actions, hand_counts, legal_actions
+from ttr_ga.player import Deck, Player
+from ttr_ga.utils.state import GameState
+
+
+def random_state(seed):
+    """A board with random owners and a current player with a random hand"""
+    rng = random.Random(seed)
+    players = [Player(f"P{i}") for i in range(rng.randint(2, 5))]
+    board = CompactBoard(sink=None)
+    for route_id in rng.sample(range(len(board.table)), rng.randint(0, 60)):
+        board.owner[route_id] = board.seat(rng.choice(players).name)
+
+    player = players[0]
+    player.hand = [rng.choice(COLORS) for _ in range(rng.randint(0, 20))]
+    player.trains = rng.randint(0, 45)
+    return board, players
+
+
+def successful_claims(board, players):
+    """Every (city1, city2, color) that Board.claim_route accepts"""
+    player = players[0]
+    graph = board.to_networkx()
+    claims = set()
+    for city1, city2 in {tuple(sorted(pair)) for pair in board.table.pair_routes}:
+        for color in COLORS:
+            reference = Board(sink=None)
+            reference.graph = graph.copy()
+            trial = player.copy()
+            if reference.claim_route(trial, city1, city2, color, player_count=len(players)):
+                claims.add((city1, city2, color))
+    return claims
+
+
+class TestMoves:
+    def test_hand_counts(self):
+        counts = hand_counts(['red', 'wild', 'red', 'pink'])
+        assert counts[COLORS.index('red')] == 2
+        assert counts[COLORS.index('pink')] == 1
+        assert counts[COLORS.index('wild')] == 1
+        assert counts.sum() == 4
+
+    @pytest.mark.parametrize("seed", range(8))
+    def test_claims_agree_with_board(self, seed):
+        board, players = random_state(seed)
+        player = players[0]
+
+        mask = claim_mask(board, player, len(players))
+        generated = set()
+        for route_id, color in zip(*np.nonzero(mask)):
+            city1, city2 = sorted(board.table.endpoints(route_id))
+            generated.add((city1, city2, COLORS[color]))
+
+        expected = successful_claims(board, players)
+        assert generated <= expected
+
+        # Anything left out is a gray route paid with wilds under another color name
+        counts = hand_counts(player.hand)
+        for city1, city2, color in expected - generated:
+            assert counts[COLORS.index(color)] == 0
+            assert (city1, city2, 'wild') in generated
+
+    def test_generated_claims_claim_their_route(self):
+        board, players = random_state(3)
+        players[0].hand = ['wild'] * 12 + ['red'] * 6
+        players[0].trains = 45
+        mask = claim_mask(board, players[0], len(players))
+
+        for route_id, color in zip(*np.nonzero(mask)):
+            trial_board = board.copy()
+            trial_board.sink = None
+            city1, city2 = board.table.endpoints(route_id)
+            assert trial_board.claim_route(players[0].copy(), city1, city2, COLORS[color], len(players))
+            assert trial_board.claimed_by(route_id) == players[0].name
+
+    def test_draw_actions(self):
+        deck = Deck(sink=None)
+        deck.face_up_cards = ['wild', 'red', 'blue', 'wild', 'green']
+        actions = draw_actions(deck)
+
+        assert {"action_type": "draw_train_cards", "method": "face_up", "count": 1,
+                "face_up_indices": [0]} in actions
+        pairs = [a["face_up_indices"] for a in actions if a["method"] == "face_up" and a["count"] == 2]
+        assert [1, 1] in pairs and [1, 2] in pairs
+        assert [1, 0] not in pairs  # the second card can't be a wild
+        assert all(a["face_up_indices"][0] not in (0, 3) for a in actions if a["method"] == "mixed")
+
+    def test_legal_actions_on_networkx_board(self):
+        """Plain Boards are compiled on the fly and give the same actions"""
+        board, players = random_state(5)
+        deck = Deck(sink=None)
+        reference = Board(sink=None)
+        reference.graph = board.to_networkx()
+
+        compact_actions = legal_actions(GameState(board, players, 0, deck, sink=None))
+        board_actions = legal_actions(GameState(reference, players, 0, deck, sink=None))
+
+        assert _as_set(compact_actions) == _as_set(board_actions)
+
+
+def _as_set(actions):
+    """Actions with route endpoints in a fixed order, for comparing boards"""
+    result = set()
+    for action in actions:
+        action = dict(action)
+        if action["action_type"] == "claim_route":
+            action["city1"], action["city2"] = sorted((action["city1"], action["city2"]))
+        result.add(tuple(sorted((key, str(value)) for key, value in action.items())))
+    return result
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from ttr_ga.agents.agent import RandomAgent
+from ttr_ga.board import Board
+from ttr_ga.index import board_index
+from ttr_ga.observation import MAX_SEATS, SEAT_FEATURES, ObservationEncoder, encode_observation
+from ttr_ga.simulator import Simulator
+
+
+@pytest.fixture
+def encoder():
+    return ObservationEncoder()
+
+
+@pytest.fixture
+def state():
+    state = Simulator([RandomAgent(0, "P1"), RandomAgent(1, "P2")]).new_game(0)
+    state.players[0].hand = ["red", "red", "wild"]
+    return state
+
+
+def block(encoder, observation, name):
+    return observation[encoder.layout[name]]
+
+
+class TestObservationEncoder:
+    def test_layout_covers_the_vector(self, encoder, state):
+        slices = sorted(encoder.layout.values(), key=lambda s: s.start)
+        assert slices[0].start == 0 and slices[-1].stop == encoder.size
+        assert all(a.stop == b.start for a, b in zip(slices, slices[1:]))
+
+        observation = encoder.encode(state)
+        assert observation.shape == (encoder.size,) and observation.dtype == np.float32
+
+    def test_route_ownership_is_one_hot_from_the_viewer(self, encoder, state):
+        table = state.board.table
+        mine, theirs = table.pair_routes["Seattle", "Portland"][0], table.pair_routes["Denver", "Omaha"][0]
+        state.board.owner[mine] = state.board.seat("P1")
+        state.board.owner[theirs] = state.board.seat("P2")
+
+        owner = block(encoder, encoder.encode(state, 0), "owner").reshape(-1, MAX_SEATS)
+        assert owner[mine].tolist() == [1, 0, 0, 0, 0]
+        assert owner[theirs].tolist() == [0, 1, 0, 0, 0]
+        assert owner.sum() == 2
+        owner = block(encoder, encoder.encode(state, 1), "owner").reshape(-1, MAX_SEATS)
+        assert owner[mine, 1] == 1 and owner[theirs, 0] == 1
+
+    def test_cards_and_seats(self, encoder, state):
+        state.players[1].trains = 30
+        observation = encoder.encode(state, 0)
+
+        hand = block(encoder, observation, "hand")
+        assert hand[0] == pytest.approx(2 / 12)   # red
+        assert hand[-1] == pytest.approx(1 / 14)  # wild
+        assert block(encoder, observation, "face_up").sum() == pytest.approx(1)
+        seats = block(encoder, observation, "seats").reshape(MAX_SEATS, SEAT_FEATURES)
+        assert seats[:, 0].tolist() == [1, 1, 0, 0, 0]
+        assert seats[1, 1] == pytest.approx(30 / 45)
+        assert seats[0, 2] == pytest.approx(3 / 12)
+
+    def test_ticket_progress(self, encoder, state):
+        index = board_index()
+        player = state.players[0]
+        open_ticket, done_ticket = player.tickets[:2]
+        path = index.cheapest_path(open_ticket)
+        state.board.owner[path[0]] = state.board.seat(player.name)
+        player.connections.union(done_ticket[0], done_ticket[1])
+
+        tickets = block(encoder, encoder.encode(state, 0), "tickets").reshape(-1, 2)
+        held = np.flatnonzero(tickets[:, 0])
+        assert sorted(held) == sorted(index.ticket_id(t) for t in player.tickets)
+        share = index.length[path[0]] / sum(index.length[r] for r in path)
+        assert tickets[index.ticket_id(open_ticket), 1] == pytest.approx(share)
+        assert tickets[index.ticket_id(done_ticket), 1] == 1
+
+    def test_writes_in_place(self, encoder, state):
+        out = np.full(encoder.size, 9, dtype=np.float32)
+        assert encoder.encode(state, out=out) is out
+        assert (out == encoder.encode(state)).all()
+
+    def test_batch_matches_single_encodings(self, encoder, state):
+        other = state.clone()
+        other.end_turn()
+        states = [state, other, state]
+        out = np.empty((3, encoder.size), dtype=np.float32)
+
+        assert encoder.encode_batch(states, out=out) is out
+        for row, s in zip(out, states):
+            assert (row == encoder.encode(s)).all()
+        assert (encoder.encode_batch(states, seats=[1, 1, 1])[0] == encoder.encode(state, 1)).all()
+        assert (encoder.encode_batch(states[:1]) == out[:1]).all()  # smaller batches reuse the scratch
+
+    def test_networkx_boards_map_onto_the_table(self, encoder, state):
+        board = Board.create_standard_board(sink=None)
+        board.graph.add_edge("Seattle", "Portland", length=1, color="gray", claimed="P2")
+        networkx_state = state.clone()
+        networkx_state.board = board
+        state.board.owner[state.board.table.pair_routes["Seattle", "Portland"][0]] = state.board.seat("P2")
+
+        assert (encode_observation(networkx_state) == encoder.encode(state)).all()
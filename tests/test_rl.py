@@ -0,0 +1,142 @@
+import random
+
+import numpy as np
+import pytest
+
+from ttr_ga.actions import action_space
+from ttr_ga.agents.agent import Agent, RandomAgent
+from ttr_ga.agents.rl import PolicyAgent, SyncVectorEnv, TicketToRideEnv, make_vector_env
+from ttr_ga.observation import observation_encoder
+from ttr_ga.simulator import Simulator
+
+
+def random_actions(masks, rng):
+    return [int(rng.choice(np.flatnonzero(mask))) for mask in masks]
+
+
+def first_legal(observation, mask):
+    return int(np.flatnonzero(mask)[0])
+
+
+class TestTicketToRideEnv:
+    def test_reset_stops_at_the_learners_turn(self):
+        env = TicketToRideEnv(players=3, seat=2)
+        state = env.reset()
+
+        assert state.current_player_idx == 2
+        assert state.players[2].name == "Learner"
+        assert (env.mask == action_space().mask(state)).all()
+
+    def test_score_rewards_add_up_to_the_final_score(self):
+        env = TicketToRideEnv(seed=3)
+        env.reset()
+        rng = random.Random(0)
+        total, done = 0.0, False
+        while not done:
+            reward, done, info = env.step(rng.choice(np.flatnonzero(env.mask)))
+            total += reward
+
+        assert total == info["scores"][env.seat]
+        assert info["margin"] == info["scores"][env.seat] - info["scores"][1 - env.seat]
+
+    def test_margin_reward_is_terminal(self):
+        env = TicketToRideEnv(reward="margin", seed=3)
+        env.reset()
+        rewards = []
+        done = False
+        while not done:
+            reward, done, info = env.step(np.flatnonzero(env.mask)[0])
+            rewards.append(reward)
+
+        assert rewards[:-1] == [0] * (len(rewards) - 1)
+        assert rewards[-1] == info["margin"]
+
+    def test_games_over_before_the_learners_turn_are_dealt_again(self):
+        class Ender(Agent):
+            def choose_action(self, game_state):
+                game_state.game_over = True
+
+        env = TicketToRideEnv(opponents=(Ender, RandomAgent), seat=1)
+        state = env.reset()
+
+        assert not env.done and env.mask.any()
+        assert env.games == 2 and state.current_player_idx == 1
+        env.step(np.flatnonzero(env.mask)[0])
+
+    def test_rejects_too_few_turns(self):
+        with pytest.raises(ValueError):
+            TicketToRideEnv(max_turns=0)
+
+    def test_rejects_illegal_actions(self):
+        env = TicketToRideEnv()
+        env.reset()
+        with pytest.raises(ValueError):
+            env.step(np.flatnonzero(~env.mask)[0])
+
+    def test_learner_rotates_seats(self):
+        env = TicketToRideEnv(players=3)
+        seats = []
+        for _ in range(3):
+            env.reset()
+            seats.append(env.seat)
+        assert sorted(seats) == [0, 1, 2]
+
+
+class TestVectorEnv:
+    def test_reset_stacks_observations_and_masks(self):
+        env = SyncVectorEnv(3, seed=1)
+        observations, masks = env.reset()
+        encoder = observation_encoder()
+
+        assert observations.shape == (3, encoder.size) and observations.dtype == np.float32
+        assert masks.shape == (3, action_space().size) and masks.dtype == bool
+        for i, game in enumerate(env.envs):
+            assert (observations[i] == encoder.encode(game.state, game.seat)).all()
+            assert (masks[i] == game.mask).all()
+
+    def test_finished_games_reset_automatically(self):
+        env = SyncVectorEnv(2, seed=5, max_turns=3)
+        _, masks = env.reset()
+        rng = random.Random(0)
+        finished = []
+        for _ in range(20):
+            observations, rewards, dones, masks, infos = env.step(random_actions(masks, rng))
+            assert rewards.dtype == np.float32 and dones.dtype == bool
+            for i in np.flatnonzero(dones):
+                finished.append(infos[i])
+                assert infos[i]["final_observation"].shape == (env.observation_size,)
+            assert masks.any(axis=1).all()  # every env is at a learner decision again
+
+        assert finished and all(info["turns"] > 3 for info in finished)
+        assert min(game.games for game in env.envs) > 1
+
+    def test_backends_play_the_same_games(self):
+        def play(backend):
+            rng = random.Random(0)
+            with make_vector_env(3, backend=backend, workers=2, seed=2, max_turns=5) as env:
+                observations, masks = env.reset()
+                trace = [observations]
+                for _ in range(15):
+                    observations, rewards, dones, masks, infos = env.step(random_actions(masks, rng))
+                    trace += [observations, rewards, dones, masks]
+            return trace
+
+        for sync, subprocess in zip(play("sync"), play("subprocess")):
+            assert (sync == subprocess).all()
+
+    def test_worker_errors_reach_the_caller(self):
+        with make_vector_env(2, backend="subprocess", workers=2) as env:
+            _, masks = env.reset()
+            with pytest.raises(ValueError):
+                env.step([int(np.flatnonzero(~mask)[0]) for mask in masks])
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            make_vector_env(1, backend="threads")
+
+
+class TestPolicyAgent:
+    def test_plays_ordinary_games(self):
+        agents = [PolicyAgent(0, "Policy", first_legal), RandomAgent(1, "Random", rng=random.Random(0))]
+        result = Simulator(agents, max_turns=50).play_game(0)
+        assert result["turns"] > 1
@@ -1,7 +1,11 @@
+import itertools
+import random
+
 import pytest
-from ttr_ga.board import Board
+from ttr_ga.board import Board, CompactBoard
 from ttr_ga.player import Player
 from ttr_ga.game import check_tickets, longest_continuous_path 
+from ttr_ga.scoring import CityUnionFind, longest_trail, score_game, trail_cache
 
 
 
@@ -59,11 +63,167 @@ class TestScoring:
         score = check_tickets(player, board_with_routes)
         assert score == expected_score
     
+    def test_check_tickets_ignores_other_players_routes(self, board_with_routes, player):
+        """Routes claimed by someone else don't connect a player's tickets"""
+        board_with_routes.graph.add_edge("D", "F", color='red', length=1, claimed="Someone Else")
+        player.tickets = [("A", "G", 15)]
+
+        assert check_tickets(player, board_with_routes) == -15
+
+    @pytest.mark.parametrize("tickets,expected_score", [
+        ([("A", "D", 10), ("A", "E", 5)], 15),
+        ([("A", "D", 10), ("F", "G", 15)], 10 + 15),
+        ([("A", "D", 10), ("A", "F", 15)], 10 - 15),
+        ([("F", "G", 8)], 8),
+    ])
+    def test_running_ticket_score_matches_check_tickets(self, board_with_routes, player, tickets, expected_score):
+        """Claiming the fixture routes one by one gives the end-of-game ticket score"""
+        player.tickets = tickets
+        for city1, city2, _ in board_with_routes.claimed_routes(player.name):
+            player.connections.union(city1, city2)
+
+        assert player.ticket_score() == expected_score == check_tickets(player, board_with_routes)
+
+    def test_ticket_score_updates_as_routes_are_claimed(self, player):
+        player.tickets = [("A", "C", 7)]
+        assert player.ticket_score() == -7
+
+        player.connections.union("A", "B")
+        assert player.ticket_score() == -7
+
+        player.connections.union("C", "B")
+        assert player.ticket_score() == 7
+
+    def test_union_find_from_routes(self, board_with_routes, player):
+        network = CityUnionFind.from_routes(board_with_routes.claimed_routes(player.name))
+
+        assert network.connected("A", "E")
+        assert network.connected("G", "F")
+        assert not network.connected("A", "G")
+        assert not network.connected("A", "Nowhere")
+
     def test_longest_continuous_path(self, board_with_routes, player):
         """Test longest continuous path calculation"""
         score = longest_continuous_path(player, board_with_routes)
         
         # The longest path is A-B-C-D with length 2+3+1 = 6
-        # This should give a score based on the game's scoring table
-        expected_score = 13 
-        assert score == expected_score
\ No newline at end of file
+        expected_score = 6
+        assert score == expected_score
+
+def _reference_longest_trail(routes):
+    """Try every ordering of every subset of routes; only for tiny inputs"""
+    best = 0
+    for size in range(1, len(routes) + 1):
+        for order in itertools.permutations(range(len(routes)), size):
+            for start in routes[order[0]][:2]:
+                city, total = start, 0
+                for edge in order:
+                    city1, city2, length = routes[edge]
+                    if city == city1:
+                        city = city2
+                    elif city == city2:
+                        city = city1
+                    else:
+                        break
+                    total += length
+                else:
+                    best = max(best, total)
+    return best
+
+
+class TestScoreGame:
+    @pytest.fixture
+    def players(self):
+        players = [Player("P1"), Player("P2"), Player("P3")]
+        for player in players:
+            player.score = 20
+        return players
+
+    def _board(self, claims):
+        board = Board()
+        for city1, city2, length, name in claims:
+            board.graph.add_edge(city1, city2, color='red', length=length, claimed=name)
+        return board
+
+    def test_bonus_goes_to_leader_only(self, players):
+        board = self._board([("A", "B", 4, "P1"), ("B", "C", 3, "P1"), ("C", "D", 5, "P2")])
+
+        breakdown = score_game(players, board)
+
+        assert [b["longest_trail"] for b in breakdown] == [7, 5, 0]
+        assert [b["longest_bonus"] for b in breakdown] == [10, 0, 0]
+        assert breakdown[0]["total"] == 20 + 10
+
+    def test_bonus_shared_on_tie(self, players):
+        board = self._board([("A", "B", 4, "P1"), ("C", "D", 4, "P2")])
+
+        breakdown = score_game(players, board)
+
+        assert [b["longest_bonus"] for b in breakdown] == [10, 10, 0]
+
+    def test_no_bonus_without_routes(self, players):
+        breakdown = score_game(players, Board())
+        assert [b["total"] for b in breakdown] == [20, 20, 20]
+
+    def test_tickets_in_breakdown(self, players):
+        board = self._board([("A", "B", 4, "P1"), ("B", "C", 3, "P2")])
+        players[0].tickets = [("A", "B", 5)]
+        players[1].tickets = [("A", "C", 9)]
+
+        breakdown = score_game(players, board)
+
+        assert breakdown[0]["ticket_points"] == 5
+        assert breakdown[1]["ticket_points"] == -9
+        assert players[0].score == 20  # players are left alone
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_compact_board_matches_networkx_board(self, players, seed):
+        rng = random.Random(seed)
+        board = CompactBoard(sink=None)
+        for route_id in rng.sample(range(len(board.table)), 30):
+            board.owner[route_id] = board.seat(rng.choice(players).name)
+        for player in players:
+            player.tickets = [(*rng.sample(board.table.cities[:36], 2), rng.randint(4, 20)) for _ in range(3)]
+
+        reference = Board()
+        reference.graph = board.to_networkx()
+
+        assert score_game(players, board) == score_game(players, reference)
+
+
+class TestLongestTrail:
+    def test_empty(self):
+        assert longest_trail([]) == 0
+
+    def test_trail_can_revisit_a_city(self):
+        """A loop with a tail is walked completely: E-B-C-D-B-A"""
+        routes = [("A", "B", 2), ("B", "C", 3), ("C", "D", 1), ("D", "B", 2), ("B", "E", 4)]
+        assert longest_trail(routes) == 12
+
+    def test_parallel_routes_count_separately(self):
+        routes = [("A", "B", 3), ("A", "B", 3), ("B", "C", 1)]
+        assert longest_trail(routes) == 7
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_matches_reference(self, seed):
+        rng = random.Random(seed)
+        cities = "ABCDE"
+        routes = [(*rng.sample(cities, 2), rng.randint(1, 6)) for _ in range(rng.randint(1, 6))]
+        assert longest_trail(routes) == _reference_longest_trail(routes)
+
+    def test_compact_board_uses_cache(self):
+        board = CompactBoard(sink=None)
+        player = Player("P1")
+        for city1, city2 in [("Seattle", "Calgary"), ("Calgary", "Helena"), ("Helena", "Denver")]:
+            player.hand = ['wild'] * 4 + ['green'] * 4
+            assert board.claim_route(player, city1, city2, 'green')
+
+        cache = trail_cache(board.table)
+        hits = cache.hits
+        assert longest_continuous_path(player, board) == 12
+        assert longest_continuous_path(player, board) == 12
+        assert cache.hits == hits + 1
+
+        reference = Board()
+        reference.graph = board.to_networkx()
+        assert longest_continuous_path(player, reference) == 12
@@ -0,0 +1,172 @@
+import random
+
+import pytest
+
+from ttr_ga.agents.agent import RandomAgent
+from ttr_ga.board import CompactBoard
+from ttr_ga.events import EventLog
+from ttr_ga.game import execute_action, game_loop
+from ttr_ga.player import Deck, Player
+from ttr_ga.simulator import Simulator
+from ttr_ga.utils.profiling import Instrumentation
+from ttr_ga.utils.state import GameState
+
+
+class TestSimulator:
+    @pytest.fixture
+    def agents(self):
+        return [RandomAgent(0, "Random 1"), RandomAgent(1, "Random 2")]
+
+    @pytest.fixture
+    def game_state(self):
+        """A quiet two player game with known face-up cards"""
+        deck = Deck(sink=None)
+        deck.train_cards = ['red', 'blue', 'green', 'yellow', 'black']
+        deck.face_up_cards = ['red', 'wild', 'green', 'yellow', 'black']
+        players = [Player("P1"), Player("P2")]
+        return GameState(CompactBoard(sink=None), players, 0, deck, sink=None)
+
+    def test_game_runs_without_console_io(self, agents, capsys, monkeypatch):
+        """A full game neither prints nor asks for input"""
+        random.seed(0)
+        monkeypatch.setattr("builtins.input", lambda *args: pytest.fail("input() called"))
+
+        result = Simulator(agents).play_game()
+
+        assert capsys.readouterr().out == ""
+        assert len(result["scores"]) == 2
+        assert result["winner"] in (0, 1)
+        assert result["finished"]
+
+    def test_event_sink_receives_actions(self, agents):
+        random.seed(1)
+        log = EventLog()
+
+        Simulator(agents, sink=log).play_game()
+
+        assert "action" in log.kinds()
+        assert log.kinds()[-1] == "game_over"
+
+    def test_run_reports_rate(self, agents):
+        random.seed(2)
+        report = Simulator(agents).run(2)
+
+        assert len(report["results"]) == 2
+        assert report["games_per_second"] > 0
+
+    def test_run_rate_counts_games_played(self, agents):
+        """Fewer deal seeds than games means fewer games, and the rate says so"""
+        report = Simulator(agents).run(5, deal_seeds=[1])
+
+        assert len(report["results"]) == 1
+        assert report["games_per_second"] == pytest.approx(1 / report["seconds"])
+
+    def test_face_up_choices_from_action(self, game_state):
+        player = game_state.players[0]
+        action = {"action_type": "draw_train_cards", "method": "face_up", "count": 2,
+                  "face_up_indices": [0, 2]}
+
+        execute_action(player, action, game_state)
+
+        assert player.hand == ['red', 'green']
+
+    def test_face_up_wild_ends_draw(self, game_state):
+        player = game_state.players[0]
+        action = {"action_type": "draw_train_cards", "method": "face_up", "count": 2,
+                  "face_up_indices": [1, 2]}
+
+        execute_action(player, action, game_state)
+
+        assert player.hand == ['wild']
+
+    def test_second_face_up_card_cannot_be_wild(self, game_state):
+        player = game_state.players[0]
+        action = {"action_type": "draw_train_cards", "method": "mixed", "blind_count": 1,
+                  "face_up_indices": [1]}
+
+        execute_action(player, action, game_state)
+
+        assert player.hand == ['black']  # only the blind card
+
+    def test_final_round_gives_everyone_one_more_turn(self, game_state):
+        players = game_state.players
+        players[1].trains = 2
+
+        game_state.current_player_idx = 1
+        game_state.end_turn()   # P2 triggers the final round
+        assert game_state.final_round and not game_state.game_over
+
+        game_state.end_turn()   # P1's last turn
+        assert not game_state.game_over
+
+        game_state.end_turn()   # P2's last turn
+        assert game_state.game_over
+
+    def test_stalled_game_stops_after_a_round_of_passes(self):
+        class Passer(RandomAgent):
+            def choose_action(self, game_state):
+                return None
+
+        result = Simulator([Passer(0, "P1"), Passer(1, "P2")]).play_game()
+
+        assert not result["finished"]
+        assert result["turns"] == 2
+
+    def test_deal_seed_replays_a_game(self):
+        def play(deal_seed):
+            agents = [RandomAgent(i, f"Random {i + 1}", rng=random.Random(i)) for i in range(2)]
+            return Simulator(agents).play_game(deal_seed)
+
+        assert play(11) == play(11)
+        assert play(11)["breakdown"] != play(12)["breakdown"]
+
+    def test_seeded_simulator_ignores_global_random(self):
+        def run():
+            random.seed()  # the engine must not draw from here
+            agents = [RandomAgent(i, f"Random {i + 1}", rng=random.Random(i)) for i in range(2)]
+            return [r["scores"] for r in Simulator(agents, seed=3).run(2)["results"]]
+
+        assert run() == run()
+
+    def test_instrumentation_counts_phases(self):
+        def play(instruments=None):
+            agents = [RandomAgent(i, f"Random {i + 1}", rng=random.Random(i)) for i in range(2)]
+            return Simulator(agents, seed=5, instruments=instruments).run(3)["results"]
+
+        instruments = Instrumentation()
+        results = play(instruments)
+
+        assert [r["scores"] for r in results] == [r["scores"] for r in play()]
+        rounds = sum(r["turns"] for r in results)
+        assert instruments.calls["game"] == 3
+        assert 2 * (rounds - 3) <= instruments.calls["choose_action"] <= 2 * rounds
+        assert instruments.calls["execute_action"] == instruments.calls["choose_action"]
+        assert instruments.calls["final_scoring"] == 3
+        assert instruments.calls["check_tickets"] == instruments.calls["longest_continuous_path"] == 6
+        assert 0 < instruments.seconds["choose_action"] < instruments.seconds["game"]
+        assert "choose_action" in instruments.table()
+
+    def test_game_loop_restores_deck_sink(self):
+        """Instrumenting a game_loop only wraps the deck's sink while it runs"""
+        class Quitter(Player):
+            def choose_action(self, game_state):
+                raise KeyboardInterrupt
+
+        log = EventLog()
+        deck = Deck(sink=log, rng=random.Random(0))
+        with pytest.raises(KeyboardInterrupt):
+            game_loop([Quitter("P1"), Quitter("P2")], CompactBoard(sink=None), deck, sink=None,
+                      instruments=Instrumentation())
+
+        assert deck.sink is log
+
+    def test_instrumentation_counts_deck_events(self):
+        instruments = Instrumentation()
+        log = EventLog()
+        deck = Deck(sink=instruments.sink(log), rng=random.Random(0))
+        deck.train_cards = []
+        deck.discard(['red', 'blue'])
+        deck.draw_train_card()
+
+        assert instruments.calls["deck_reshuffle"] == 1
+        assert log.kinds() == ["reshuffle"]
@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from ttr_ga.agents.agent import RandomAgent
+from ttr_ga.board import Board
+from ttr_ga.player import Deck, Player
+from ttr_ga.simulator import Simulator
+from ttr_ga.utils.state import GameState
+
+
+class TestGameState:
+    @pytest.fixture
+    def game_state(self):
+        """A freshly dealt, silent two player game"""
+        random.seed(0)
+        agents = [RandomAgent(0, "P1"), RandomAgent(1, "P2")]
+        return Simulator(agents).new_game()
+
+    def test_clone_is_independent(self, game_state):
+        clone = game_state.clone()
+        clone.players[0].hand.append('wild')
+        clone.deck.draw_train_card()
+        clone.board.owner[0] = 1
+
+        assert game_state.players[0].hand != clone.players[0].hand
+        assert len(game_state.deck.train_cards) == len(clone.deck.train_cards) + 1
+        assert game_state.board.owner[0] == -1
+        assert clone.board.table is game_state.board.table
+
+    def test_clone_networkx_board(self):
+        players = [Player("P1"), Player("P2")]
+        state = GameState(Board.create_standard_board(sink=None), players, 0, Deck(sink=None), sink=None)
+        players[0].hand = ['red'] * 4
+
+        clone = state.clone()
+        clone.board.claim_route(clone.players[0], "Seattle", "Calgary", 'red')
+
+        assert 'claimed' not in state.board.graph["Seattle"]["Calgary"][0]
+        assert state.players[0].hand == ['red'] * 4
+
+    def test_apply_action_leaves_state_untouched(self, game_state):
+        hand = list(game_state.players[0].hand)
+        action = {"action_type": "draw_train_cards", "method": "blind", "count": 2}
+
+        new_state = game_state.apply_action(action)
+
+        assert game_state.players[0].hand == hand
+        assert game_state.current_player_idx == 0
+        assert len(new_state.players[0].hand) == len(hand) + 2
+        assert new_state.current_player_idx == 1
+
+    def test_apply_action_claims_route(self, game_state):
+        game_state.players[0].hand = ['red'] * 4
+        action = {"action_type": "claim_route", "city1": "Seattle", "city2": "Calgary", "color": 'red'}
+
+        new_state = game_state.apply_action(action)
+
+        assert list(new_state.board.routes_of("P1")) == [new_state.board.table.pair_routes[("Seattle", "Calgary")][0]]
+        assert new_state.players[0].trains == 41
+        assert game_state.board.routes_of("P1") == []
+
+    def test_apply_random_actions_until_game_over(self, game_state):
+        rng = random.Random(3)
+        state = game_state
+        for _ in range(1000):
+            if state.game_over:
+                break
+            state = state.apply_action(rng.choice(state.get_valid_actions()))
+        assert state.game_over
@@ -0,0 +1,108 @@
+import random
+
+import numpy as np
+import pytest
+
+from ttr_ga.actions import action_space
+from ttr_ga.agents.agent import RandomAgent
+from ttr_ga.simulator import Simulator
+from ttr_ga.observation import observation_encoder
+from ttr_ga.trajectory import HEADER_SIZE, TERMINAL, TrajectoryReader, TrajectoryWriter, record_dtype
+
+
+def write_games(directory, games, moves=5, features=3, **kwargs):
+    with TrajectoryWriter(directory, **kwargs) as writer:
+        for _ in range(games):
+            game = writer.begin_game()
+            for step in range(moves):
+                writer.record(game, step, step % 2, np.full(features, game + step / 10), step, reward=step)
+    return writer
+
+
+class TestFormat:
+    def test_fixed_width_records(self):
+        dtype = record_dtype(10)
+        assert dtype.itemsize == 20 + 4 * 10
+        assert dtype.fields["features"][1] % 4 == 0
+
+    def test_round_trip_across_chunks(self, tmp_path):
+        write_games(tmp_path, games=4, chunk_records=6, buffer_records=4)
+        reader = TrajectoryReader(tmp_path)
+
+        assert len(reader) == 20
+        assert [len(chunk) for chunk in reader.chunks] == [6, 6, 6, 2]
+        games = np.concatenate(reader.field("game"))
+        assert games.tolist() == [game for game in range(4) for _ in range(5)]
+        assert reader[7]["step"] == 2 and reader[7]["features"][0] == pytest.approx(1.2)
+        assert reader[-1]["reward"] == 4
+
+    def test_fields_are_views_of_the_files(self, tmp_path):
+        write_games(tmp_path, games=2)
+        reader = TrajectoryReader(tmp_path)
+        features = reader.field("features")[0]
+
+        assert isinstance(reader.chunks[0], np.memmap)
+        assert np.shares_memory(features, reader.chunks[0])
+        with pytest.raises(ValueError):
+            features[0, 0] = 1  # read only
+
+    def test_reopening_appends(self, tmp_path):
+        write_games(tmp_path, games=2)
+        writer = write_games(tmp_path, games=1)
+
+        reader = TrajectoryReader(tmp_path)
+        assert len(reader) == 15
+        assert writer.begin_game() == 3
+        assert np.concatenate(reader.field("game"))[-1] == 2
+
+    def test_torn_record_is_ignored(self, tmp_path):
+        write_games(tmp_path, games=1)
+        chunk = next(tmp_path.iterdir())
+        with open(chunk, "ab") as f:
+            f.write(b"\1" * 7)
+
+        assert len(TrajectoryReader(tmp_path)) == 5
+
+    def test_rejects_mixed_feature_counts(self, tmp_path):
+        write_games(tmp_path, games=1, features=3)
+        write_games(tmp_path / "other", games=1, features=4)
+        (tmp_path / "other" / "chunk-000000.traj").rename(tmp_path / "chunk-000001.traj")
+
+        with pytest.raises(ValueError):
+            TrajectoryReader(tmp_path)
+
+    def test_rejects_other_files(self, tmp_path):
+        (tmp_path / "chunk-000000.traj").write_bytes(b"x" * HEADER_SIZE)
+        with pytest.raises(ValueError):
+            TrajectoryReader(tmp_path)
+
+    def test_sample(self, tmp_path):
+        write_games(tmp_path, games=3, chunk_records=4)
+        reader = TrajectoryReader(tmp_path)
+
+        batch = reader.sample(50, rng=0)
+        assert batch.dtype == reader.dtype and len(batch) == 50
+        for record in batch[:10]:
+            assert record["features"][0] == pytest.approx(record["game"] + record["step"] / 10)
+
+
+class TestRecording:
+    def test_simulator_logs_every_move(self, tmp_path):
+        agents = [RandomAgent(i, f"P{i + 1}", rng=random.Random(i)) for i in range(3)]
+        with TrajectoryWriter(tmp_path) as writer:
+            results = Simulator(agents, recorder=writer).run(2, deal_seeds=[1, 2])["results"]
+        reader = TrajectoryReader(tmp_path)
+        records = np.concatenate(reader.chunks)
+        space = action_space()
+        assert reader.dtype["features"].shape == (observation_encoder().size,)
+
+        for game, result in enumerate(results):
+            moves = records[records["game"] == game]
+            terminal = moves[moves["done"] == 1]
+            assert terminal["seat"].tolist() == [0, 1, 2]
+            assert (terminal["action"] == TERMINAL).all()
+            played = moves[moves["done"] == 0]
+            assert played["step"].tolist() == list(range(len(played)))
+            assert ((played["action"] >= 0) & (played["action"] < space.size)).all()
+            for seat, score in enumerate(result["scores"]):
+                assert moves[moves["seat"] == seat]["reward"].sum() == score
@@ -0,0 +1,120 @@
+import random
+
+import numpy as np
+import pytest
+
+from ttr_ga.actions import action_space
+from ttr_ga.agents.agent import RandomAgent
+from ttr_ga.agents.ga import FEATURES, GeneticAgent
+from ttr_ga.agents.transposition import TranspositionCache
+from ttr_ga.board import Board, CompactBoard
+from ttr_ga.simulator import Simulator
+from ttr_ga.zobrist import state_hash
+
+
+def new_game(deal_seed=0, board_factory=CompactBoard):
+    agents = [RandomAgent(0, "P1"), RandomAgent(1, "P2")]
+    return Simulator(agents, board_factory=board_factory).new_game(deal_seed)
+
+
+class TestZobristHash:
+    @pytest.mark.parametrize("seed", range(3))
+    def test_incremental_hash_matches_full_hash(self, seed):
+        rng = random.Random(seed)
+        space = action_space()
+        state = new_game(seed)
+        state.zobrist_hash()
+        for step in range(300):
+            if state.game_over:
+                break
+            if step % 2:
+                actions = state.get_valid_actions()
+                action = rng.choice(actions) if actions else None
+            else:
+                legal = space.legal_ids(state)
+                action = int(rng.choice(legal)) if len(legal) else None
+            if action is None:
+                break
+            parent_hash = state.zobrist_hash()
+            state = state.apply_action(action)
+            assert state._zobrist is not None
+            assert state._zobrist == state_hash(state)
+            assert state._zobrist != parent_hash
+
+    def test_hand_order_does_not_matter(self):
+        state = new_game()
+        other = state.clone()
+        other.players[0].hand.reverse()
+        assert state.zobrist_hash() == other.zobrist_hash()
+
+    def test_discard_colors_are_hashed(self):
+        """The discard pile is public, so piles of the same size but other colors differ"""
+        red, blue = new_game(), new_game()
+        red.deck.discard(['red'] * 8)
+        blue.deck.discard(['blue'] * 8)
+        assert red.zobrist_hash() != blue.zobrist_hash()
+
+    def test_in_place_changes_drop_the_cached_hash(self):
+        state = new_game()
+        before = state.zobrist_hash()
+        state.end_turn()
+        assert state.zobrist_hash() != before
+
+    def test_networkx_board_is_hashed_from_scratch(self):
+        state = new_game(board_factory=Board)
+        state.players[0].hand.append("red")
+        before = state.zobrist_hash()
+        claim = {"action_type": "claim_route", "city1": "Seattle", "city2": "Portland", "color": "red"}
+        after = state.apply_action(claim)
+        assert after.zobrist_hash() == state_hash(after) != before
+
+
+class TestTranspositionCache:
+    def test_lru_eviction_and_stats(self):
+        cache = TranspositionCache(maxsize=2)
+        cache.put(1, "a")
+        cache.put(2, "b")
+        assert cache.get(1) == "a"
+        cache.put(3, "c")  # evicts 2, the least recently used
+        assert 2 not in cache
+        assert cache.get(2) is None
+        assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 1, "misses": 1, "evictions": 1, "hit_rate": 0.5}
+
+    def test_lookup_computes_once(self):
+        cache = TranspositionCache()
+        calls = []
+        for _ in range(3):
+            assert cache.lookup(7, lambda: calls.append(1) or 42) == 42
+        assert len(calls) == 1
+        assert cache.hits == 2
+
+    def test_cached_agent_plays_the_same_games(self):
+        genome = np.random.default_rng(0).standard_normal(len(FEATURES))
+
+        def play(cache):
+            agents = [GeneticAgent(i, f"Genome {i + 1}", genome, cache=cache) for i in range(2)]
+            return [Simulator(agents).play_game(seed)["scores"] for seed in (1, 1, 2)]
+
+        cache = TranspositionCache()
+        assert play(cache) == play(None)
+        assert cache.hits > 0  # the repeated deal replays every position
+
+    def test_cached_agent_sees_the_discard_pile(self):
+        """Positions that only differ in discarded colors are not answered from each other's entries"""
+        genome = np.zeros(len(FEATURES))
+        genome[FEATURES.index("color_scarcity")] = 1
+        space = action_space()
+
+        def position(color):
+            state = new_game()
+            state.players[0].hand = ['red'] * 4 + ['blue'] * 4
+            state.deck.discard([color] * 8)
+            return state
+
+        def paid_with(agent, state):
+            return space.decode(agent.choose_action(state))["color"]
+
+        plain = GeneticAgent(0, "P1", genome)
+        assert [paid_with(plain, position(color)) for color in ("red", "blue")] == ["red", "blue"]
+        cached = GeneticAgent(0, "P1", genome, cache=TranspositionCache())
+        assert [paid_with(cached, position(color)) for color in ("red", "blue")] == ["red", "blue"]